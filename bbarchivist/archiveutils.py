@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 """This module is used to operate with archives."""
 
+import collections  # deque
+import concurrent.futures  # parallel deflate
 import os  # filesystem read
+import struct  # zip headers
 import tarfile  # txz/tbz/tgz/tar compression
 import zipfile  # zip compresssion
+import time  # zip timestamps
+import zlib  # raw deflate
 
 from bbarchivist import barutils  # zip tester
 from bbarchivist import bbconstants  # premade stuff
+from bbarchivist import compat  # cpu count
 from bbarchivist import decorators  # timer
 from bbarchivist import iniconfig  # config parsing
 from bbarchivist import sevenziputils  # 7z
@@ -16,6 +22,12 @@ __author__ = "Thurask"
 __license__ = "WTFPL v2"
 __copyright__ = "2015-2019 Thurask"
 
+DEFLATE_BLOCK = 4 * 1024 * 1024  # bytes per independently deflated block
+DEFLATE_WINDOW = 32 * 1024  # deflate history, primed into each block
+ZIP_LOCAL = struct.Struct("<4s5H3L2H")  # local file header
+ZIP_CENTRAL = struct.Struct("<4s2B5H3L5H2L")  # central directory entry
+ZIP_MAX = 0xFFFFFFFF  # 32-bit field placeholder for Zip64 values
+
 
 def smart_is_tarfile(filepath):
     """
@@ -604,7 +616,270 @@ def pack_tclloader(dirname, filename):
         pack_tclloader_zip(dirname, filename)
 
 
-def pack_tclloader_zip(dirname, filename):
+def deflate_block(data, zdict=None, last=True, level=zlib.Z_DEFAULT_COMPRESSION):
+    """
+    Raw deflate one block of a file, pigz-style.
+
+    Blocks other than the last end with a sync flush, so deflated blocks can be concatenated into one stream.
+
+    :param data: Uncompressed block.
+    :type data: bytes
+
+    :param zdict: Tail of the previous block, to prime the compressor with. Default is None.
+    :type zdict: bytes
+
+    :param last: If this is the file's final block. Default is True.
+    :type last: bool
+
+    :param level: Compression level. Default is zlib's default.
+    :type level: int
+    """
+    comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    if zdict:
+        try:
+            comp = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, zlib.Z_DEFAULT_STRATEGY, zdict)
+        except TypeError:  # 3.2, no priming
+            pass
+    return comp.compress(data) + comp.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+
+def deflate_jobs(infile, xec, block=DEFLATE_BLOCK):
+    """
+    Read a file block by block, submitting each block for deflating. Yield futures, then the file's (CRC32, size).
+
+    :param infile: Path to file.
+    :type infile: str
+
+    :param xec: Executor to deflate blocks with.
+    :type xec: concurrent.futures.Executor
+
+    :param block: Block size. Default is DEFLATE_BLOCK.
+    :type block: int
+    """
+    crc = 0
+    size = 0
+    zdict = None
+    with open(infile, "rb") as afile:
+        data = afile.read(block)
+        while True:
+            nextdata = afile.read(block)
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+            yield xec.submit(deflate_block, data, zdict, not nextdata)
+            if not nextdata:
+                break
+            zdict = data[-DEFLATE_WINDOW:]
+            data = nextdata
+    yield crc & 0xFFFFFFFF, size
+
+
+def zip_dostime(mtime):
+    """
+    Convert a timestamp to zip (DOS) time and date fields.
+
+    :param mtime: Timestamp, in seconds.
+    :type mtime: float
+    """
+    year, month, day, hour, minute, second = time.localtime(mtime)[:6]
+    if year < 1980:
+        year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+    return hour << 11 | minute << 5 | second // 2, (year - 1980) << 9 | month << 5 | day
+
+
+class ZipWriter(object):
+    """
+    Deflated zip writer for members compressed elsewhere, one at a time.
+    Local headers are written with placeholders, then rewritten once CRC and sizes are known.
+    """
+
+    def __init__(self, zipf):
+        """
+        Open output file.
+
+        :param zipf: Path to output zip.
+        :type zipf: str
+        """
+        self.file = open(zipf, "wb")
+        self.members = []
+        self.current = None
+
+    def __enter__(self):
+        """
+        Use as context manager.
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Finish archive, or just close it if something went wrong.
+        """
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+    def begin(self, infile, arcname):
+        """
+        Start a member: write its local header, with placeholder CRC and sizes.
+        Members that might not fit in 4GB get Zip64 extensions.
+
+        :param infile: Path to file.
+        :type infile: str
+
+        :param arcname: Name inside the archive.
+        :type arcname: str
+        """
+        stat = os.stat(infile)
+        name = arcname.replace(os.sep, "/")
+        try:
+            name.encode("ascii")
+        except UnicodeEncodeError:
+            flags = 0x800  # UTF-8 filename
+        else:
+            flags = 0
+        self.current = {"name": name.encode("utf-8"), "flags": flags, "dostime": zip_dostime(stat.st_mtime), "mode": stat.st_mode & 0xFFFF, "offset": self.file.tell(), "zip64": stat.st_size * 1.05 > zipfile.ZIP64_LIMIT, "crc": 0, "size": 0, "csize": 0}
+        self.file.write(self.local_header(self.current))
+
+    def block(self, data):
+        """
+        Append deflated data to the current member.
+
+        :param data: Deflated block.
+        :type data: bytes
+        """
+        self.file.write(data)
+        self.current["csize"] += len(data)
+
+    def end(self, crc, size):
+        """
+        Finish the current member: rewrite its local header with real CRC and sizes.
+
+        :param crc: CRC32 of uncompressed member.
+        :type crc: int
+
+        :param size: Uncompressed size.
+        :type size: int
+        """
+        member = self.current
+        member["crc"], member["size"] = crc, size
+        if not member["zip64"] and max(size, member["csize"]) > zipfile.ZIP64_LIMIT:
+            raise RuntimeError("File size unexpectedly exceeded ZIP64 limit")
+        self.file.seek(member["offset"])
+        self.file.write(self.local_header(member))
+        self.file.seek(0, os.SEEK_END)
+        self.members.append(member)
+        self.current = None
+
+    @staticmethod
+    def local_header(member):
+        """
+        Pack a member's local header.
+
+        :param member: Member, from :meth:`begin`.
+        :type member: dict
+        """
+        if member["zip64"]:
+            extra = struct.pack("<2H2Q", 1, 16, member["size"], member["csize"])
+            csize, size, version = ZIP_MAX, ZIP_MAX, 45
+        else:
+            extra = b""
+            csize, size, version = member["csize"], member["size"], 20
+        header = ZIP_LOCAL.pack(b"PK\x03\x04", version, member["flags"], zipfile.ZIP_DEFLATED, member["dostime"][0], member["dostime"][1], member["crc"], csize, size, len(member["name"]), len(extra))
+        return header + member["name"] + extra
+
+    @staticmethod
+    def central_header(member):
+        """
+        Pack a member's central directory entry.
+
+        :param member: Member, from :meth:`begin`.
+        :type member: dict
+        """
+        if member["zip64"] or member["offset"] > zipfile.ZIP64_LIMIT:
+            extra = struct.pack("<2H3Q", 1, 24, member["size"], member["csize"], member["offset"])
+            csize, size, offset, version = ZIP_MAX, ZIP_MAX, ZIP_MAX, 45
+        else:
+            extra = b""
+            csize, size, offset, version = member["csize"], member["size"], member["offset"], 20
+        system = 0 if os.name == "nt" else 3
+        header = ZIP_CENTRAL.pack(b"PK\x01\x02", version, system, version, member["flags"], zipfile.ZIP_DEFLATED, member["dostime"][0], member["dostime"][1], member["crc"], csize, size, len(member["name"]), len(extra), 0, 0, 0, member["mode"] << 16, offset)
+        return header + member["name"] + extra
+
+    def close(self):
+        """
+        Write central directory and end records, with Zip64 records if needed, and close file.
+        """
+        start = self.file.tell()
+        for member in self.members:
+            self.file.write(self.central_header(member))
+        end = self.file.tell()
+        count, size = len(self.members), end - start
+        if count > 0xFFFF or size > zipfile.ZIP64_LIMIT or start > zipfile.ZIP64_LIMIT:
+            self.file.write(struct.pack("<4sQ2H2L4Q", b"PK\x06\x06", 44, 45, 45, 0, 0, count, count, size, start))
+            self.file.write(struct.pack("<4sLQL", b"PK\x06\x07", 0, end, 1))
+            count, size, start = min(count, 0xFFFF), min(size, ZIP_MAX), min(start, ZIP_MAX)
+        self.file.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, count, count, size, start, 0))
+        self.file.close()
+
+
+def pzip_drain(zfile, pending, limit):
+    """
+    Write finished work from the front of the queue, until at most limit items are pending.
+
+    :param zfile: Zip writer.
+    :type zfile: ZipWriter
+
+    :param pending: Queue of (action, args) tuples, in archive order.
+    :type pending: collections.deque
+
+    :param limit: Number of items to leave pending.
+    :type limit: int
+    """
+    while len(pending) > limit:
+        action, args = pending.popleft()
+        if action == "begin":
+            zfile.begin(*args)
+        elif action == "block":
+            zfile.block(args[0].result())
+        else:
+            zfile.end(*args)
+
+
+def pack_zip_parallel(zipf, members, workers=None, block=DEFLATE_BLOCK):
+    """
+    Write a standard deflated zip, compressing blocks of every member concurrently.
+
+    Members are read in order; large ones are split into blocks deflated on their own and joined with sync flushes.
+
+    :param zipf: Path to output zip.
+    :type zipf: str
+
+    :param members: List of (path to file, name inside archive) tuples.
+    :type members: list(tuple(str, str))
+
+    :param workers: Number of compression threads. Default is CPU count.
+    :type workers: int
+
+    :param block: Block size. Default is DEFLATE_BLOCK.
+    :type block: int
+    """
+    workers = compat.enum_cpus() if workers is None else workers
+    pending = collections.deque()
+    with ZipWriter(zipf) as zfile:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as xec:
+            for infile, arcname in members:
+                print("ZIPPING: {0}".format(utilities.stripper(os.path.basename(infile))))
+                pending.append(("begin", (infile, arcname)))
+                for job in deflate_jobs(infile, xec, block):
+                    if isinstance(job, tuple):
+                        pending.append(("end", job))
+                    else:
+                        pending.append(("block", (job,)))
+                        pzip_drain(zfile, pending, workers * 2)
+            pzip_drain(zfile, pending, 0)
+
+
+def pack_tclloader_zip(dirname, filename, workers=None):
     """
     Compress Android autoloader folder into a zip file.
 
@@ -613,13 +888,16 @@ def pack_tclloader_zip(dirname, filename):
 
     :param filename: File title, without extension.
     :type filename: str
+
+    :param workers: Number of compression threads. Default is CPU count.
+    :type workers: int
     """
     zipf = "{0}.zip".format(filename)
-    with zipfile.ZipFile(zipf, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as zfile:
-        for root, dirs, files in os.walk(dirname):
-            del dirs
-            for file in files:
-                print("ZIPPING: {0}".format(utilities.stripper(file)))
-                abs_filename = os.path.join(root, file)
-                abs_arcname = abs_filename.replace("{0}{1}".format(dirname, os.sep), "")
-                zfile.write(abs_filename, abs_arcname)
+    members = []
+    for root, dirs, files in os.walk(dirname):
+        del dirs
+        for file in files:
+            abs_filename = os.path.join(root, file)
+            abs_arcname = abs_filename.replace("{0}{1}".format(dirname, os.sep), "")
+            members.append((abs_filename, abs_arcname))
+    pack_zip_parallel(zipf, members, workers)
@@ -53,6 +53,44 @@ def positive_integer(input_int):
     return int(input_int)
 
 
+def bandwidth_rate(rate):
+    """
+    Convert bandwidth limit (bytes/sec, with optional k/M/G suffix) to bytes/sec.
+    Raise argparse error if invalid.
+
+    :param rate: Rate to check, ex. 512k or 5M. 0 is unlimited.
+    :type rate: str
+    """
+    suffixes = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    number = str(rate).strip().lower()
+    mult = suffixes.get(number[-1:], 1)
+    number = number[:-1] if number[-1:] in suffixes else number
+    try:
+        final = int(float(number) * mult)
+    except ValueError:
+        final = -1
+    if final < 0:
+        raise argparse.ArgumentError(argument=None, message="Invalid bandwidth {0}.".format(rate))
+    return final
+
+
+def shard_spec(shard):
+    """
+    Convert shard spec (i/n, 1-indexed) to (i, n) tuple.
+    Raise argparse error if invalid.
+
+    :param shard: Shard to check, ex. 2/4.
+    :type shard: str
+    """
+    try:
+        index, count = (int(part) for part in str(shard).split("/"))
+    except ValueError:
+        index, count = 0, 0
+    if not 1 <= index <= count:
+        raise argparse.ArgumentError(argument=None, message="Invalid shard {0}.".format(shard))
+    return index, count
+
+
 def valid_method_poptxz(methodlist):
     """
     Remove .tar.xz support if system is too old.
@@ -247,6 +285,8 @@ def default_parser_flags(parser, flags=None):
     if flags is not None:
         parser = dpf_flags_folder(parser, flags)
         parser = dpf_flags_osr(parser, flags)
+        parser = dpf_flags_bandwidth(parser, flags)
+        parser = dpf_flags_workers(parser, flags)
     return parser
 
 
@@ -295,6 +335,45 @@ def dpf_flags_osr(parser, flags=None):
     return parser
 
 
+def dpf_flags_bandwidth(parser, flags=None):
+    """
+    Add generic download bandwidth limit flag to parser.
+
+    :param parser: Parser to modify.
+    :type parser: argparse.ArgumentParser
+
+    :param flags: Tuple of sections to add.
+    :type flags: tuple(str)
+    """
+    if "bandwidth" in flags:
+        parser.add_argument("--bandwidth",
+                            dest="bandwidth",
+                            help="Download bandwidth limit, ex. 512k or 5M; 0 = unlimited",
+                            default=None,
+                            metavar="RATE",
+                            type=bandwidth_rate)
+    return parser
+
+
+def dpf_flags_workers(parser, flags=None):
+    """
+    Add generic download worker tuning flag to parser.
+
+    :param parser: Parser to modify.
+    :type parser: argparse.ArgumentParser
+
+    :param flags: Tuple of sections to add.
+    :type flags: tuple(str)
+    """
+    if "workers" in flags:
+        parser.add_argument("--auto-workers",
+                            dest="autoworkers",
+                            help="Tune download worker count from throughput",
+                            action="store_true",
+                            default=False)
+    return parser
+
+
 def default_parser(name=None, desc=None, flags=None, vers=None):
     """
     A generic form of argparse's ArgumentParser.
@@ -9,6 +9,7 @@ import zipfile  # zip extract, zip compresssion
 
 from bbarchivist import bbconstants  # premade stuff
 from bbarchivist import exceptions  # exception handling
+from bbarchivist import hashutils  # hashing reads
 from bbarchivist import utilities  # platform determination
 
 __author__ = "Thurask"
@@ -129,12 +130,7 @@ def verify_sha512(filename, inithash):
     :type inithash: bytes
     """
     sha512 = hashlib.sha512()
-    with open(filename, 'rb') as file:
-        while True:
-            data = file.read(16 * 1024 * 1024)
-            if not data:
-                break
-            sha512.update(data)
+    hashutils.hashfunc_reader(filename, sha512)
     rawdigest = sha512.digest()  # must be bytestring, not hexadecimalized str
     b64h = base64.b64encode(rawdigest, altchars=b"-_")  # replace some chars
     b64h = b64h.strip(b"==")  # remove padding
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """This module is used for backwards compatibility for older Python 3."""
 
+import os  # file replacement, terminal size
+
 __author__ = "Thurask"
 __license__ = "WTFPL v2"
 __copyright__ = "2015-2019 Thurask"
@@ -46,3 +48,63 @@ def where_which(path):
     finally:
         thepath = which(path)
     return thepath
+
+
+def replace_file(src, dst):
+    """
+    Backwards compatibility wrapper for renaming a file over another.
+
+    :param src: File to rename.
+    :type src: str
+
+    :param dst: File to replace.
+    :type dst: str
+    """
+    try:
+        from os import replace
+    except ImportError:  # 3.2
+        replace = replace_legacy
+    finally:
+        replace(src, dst)
+
+
+def replace_legacy(src, dst):
+    """
+    Rename a file over another without os.replace: atomic on POSIX, remove first on Windows.
+
+    :param src: File to rename.
+    :type src: str
+
+    :param dst: File to replace.
+    :type dst: str
+    """
+    if os.name == "nt" and os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
+
+def stat_mtime_ns(stat):
+    """
+    Backwards compatibility wrapper for modification time in nanoseconds.
+
+    :param stat: Result of os.stat.
+    :type stat: os.stat_result
+    """
+    try:
+        mtime = stat.st_mtime_ns
+    except AttributeError:  # 3.2
+        mtime = int(stat.st_mtime * 1e9)
+    return mtime
+
+
+def terminal_columns():
+    """
+    Backwards compatibility wrapper for terminal width.
+    """
+    try:
+        from shutil import get_terminal_size
+    except ImportError:  # 3.2
+        columns = int(os.environ.get("COLUMNS", 80))
+    else:
+        columns = get_terminal_size().columns
+    return columns
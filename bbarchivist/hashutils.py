@@ -4,10 +4,16 @@
 import concurrent.futures  # parallelization
 import hashlib  # all other hashes
 import hmac  # escreens is a hmac, news at 11
+import importlib  # checksum backends
+import json  # hash cache
+import mmap  # mapped reads
 import os  # path work
+import threading  # hash cache lock
+import time  # racy mtimes
 import zlib  # crc32/adler32
 
 from bbarchivist import bbconstants  # premade stuff
+from bbarchivist import compat  # backwards compat
 from bbarchivist import exceptions  # exceptions
 from bbarchivist import iniconfig  # config parsing
 from bbarchivist import utilities  # cores
@@ -16,6 +22,27 @@ __author__ = "Thurask"
 __license__ = "WTFPL v2"
 __copyright__ = "2015-2019 Thurask"
 
+#: Files at least this big (bytes) are mapped instead of read.
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+#: Block sizes tried by :func:`calibrate_blocksize`.
+CALIBRATE_SIZES = (64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024)
+
+#: CRC32/Adler32 providers, fastest first: (name, module with crc32/adler32).
+CHECKSUM_BACKENDS = (("zlib-ng", "zlib_ng.zlib_ng"), ("isa-l", "isal.isal_zlib"), ("zlib", "zlib"))
+
+#: Chosen provider: (name, module), found on first use.
+CHECKSUM_BACKEND = []
+
+#: Hash types, in .cksum file order.
+HASH_ORDER = ("adler32", "crc32", "md4", "md5", "sha0", "sha1", "sha224", "sha256", "sha384", "sha512", "ripemd160", "whirlpool", "sha3224", "sha3256", "sha3384", "sha3512", "blake2b", "blake2s", "blake3", "xxh3", "xxh128")
+
+#: Hash types needing Python 3.6+.
+HASH_NEW = ("sha3224", "sha3256", "sha3384", "sha3512", "blake2b", "blake2s")
+
+#: Digests from optional packages: hash type: (module, constructor).
+OPTIONAL_ENGINES = {"blake3": ("blake3", "blake3"), "xxh3": ("xxhash", "xxh3_64"), "xxh128": ("xxhash", "xxh3_128")}
+
 
 def zlib_hash(filepath, method, blocksize=16 * 1024 * 1024):
     """
@@ -31,9 +58,8 @@ def zlib_hash(filepath, method, blocksize=16 * 1024 * 1024):
     :type blocksize: int
     """
     hashfunc, seed = zlib_handler(method)
-    with open(filepath, 'rb') as file:
-        for chunk in iter(lambda: file.read(blocksize), b''):
-            seed = hashfunc(chunk, seed)
+    for chunk in file_blocks(filepath, blocksize):
+        seed = hashfunc(chunk, seed)
     final = format(seed & 0xFFFFFFFF, "08x")
     return final
 
@@ -45,11 +71,316 @@ def zlib_handler(method):
     :param method: "crc32" or "adler32".
     :type method: str
     """
-    hashfunc = zlib.crc32 if method == "crc32" else zlib.adler32
+    backend = checksum_backend()[1]
+    hashfunc = backend.crc32 if method == "crc32" else backend.adler32
     seed = 0 if method == "crc32" else 1
     return hashfunc, seed
 
 
+def checksum_valid(module):
+    """
+    Check that a module's CRC32/Adler32 match zlib's, including chained seeds.
+
+    :param module: Module with crc32 and adler32 functions.
+    :type module: module
+    """
+    samples = (b"", b"Jackdaws love my big sphinx of quartz", bytes(range(256)) * 1031)
+    try:
+        for sample in samples:
+            if module.crc32(sample) & 0xFFFFFFFF != zlib.crc32(sample) & 0xFFFFFFFF:
+                return False
+            if module.adler32(sample) & 0xFFFFFFFF != zlib.adler32(sample) & 0xFFFFFFFF:
+                return False
+            if module.crc32(sample, 12345) & 0xFFFFFFFF != zlib.crc32(sample, 12345) & 0xFFFFFFFF:
+                return False
+            if module.adler32(sample, 12345) & 0xFFFFFFFF != zlib.adler32(sample, 12345) & 0xFFFFFFFF:
+                return False
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return True
+
+
+def checksum_available():
+    """
+    Get every CRC32/Adler32 provider that imports and matches zlib, fastest first. Return list of (name, module).
+    """
+    found = []
+    for name, modname in CHECKSUM_BACKENDS:
+        try:
+            module = importlib.import_module(modname)
+        except ImportError:
+            continue
+        if checksum_valid(module):
+            found.append((name, module))
+    return found
+
+
+def checksum_backend():
+    """
+    Get the fastest working CRC32/Adler32 provider, as (name, module). Falls back to zlib.
+    """
+    if not CHECKSUM_BACKEND:
+        found = checksum_available()
+        CHECKSUM_BACKEND.append(found[0] if found else ("zlib", zlib))
+    return CHECKSUM_BACKEND[0]
+
+
+def checksum_benchmark(size=64 * 1024 * 1024):
+    """
+    Time CRC32 and Adler32 for every working provider. Return dict of name: (CRC32 GB/s, Adler32 GB/s).
+
+    :param size: Bytes to checksum per run. Default is 64MB.
+    :type size: int
+    """
+    data = memoryview(os.urandom(size))
+    results = {}
+    for name, module in checksum_available():
+        speeds = []
+        for func in (module.crc32, module.adler32):
+            start = compat.perf_clock()
+            func(data)
+            speeds.append(size / max(compat.perf_clock() - start, 1e-9) / (1024 ** 3))
+        results[name] = tuple(speeds)
+    return results
+
+
+def digest_benchmark(hashtypes=HASH_ORDER, size=64 * 1024 * 1024):
+    """
+    Time every available hash type on the same data. Return dict of hash type: MB/s.
+
+    :param hashtypes: Hash types to try. Default is all of them.
+    :type hashtypes: list(str)
+
+    :param size: Bytes to hash per run. Default is 64MB.
+    :type size: int
+    """
+    data = memoryview(os.urandom(size))
+    results = {}
+    for hashtype in hashtypes:
+        try:
+            engine = get_multi_engine(hashtype)
+        except (KeyError, ValueError):
+            continue
+        start = compat.perf_clock()
+        engine.update(data)
+        engine.hexdigest()
+        results[hashtype] = size / max(compat.perf_clock() - start, 1e-9) / (1024 * 1024)
+    return results
+
+
+def digest_report(results):
+    """
+    Print digest benchmark, fastest first.
+
+    :param results: Dict of hash type: MB/s.
+    :type results: dict(str: float)
+    """
+    for hashtype, speed in sorted(results.items(), key=lambda item: item[1], reverse=True):
+        print("{0:>10}: {1:.1f} MB/s".format(hashtype.upper(), speed))
+
+
+def checksum_report(results):
+    """
+    Print checksum benchmark, marking the provider in use.
+
+    :param results: Dict of name: (CRC32 GB/s, Adler32 GB/s).
+    :type results: dict(str: tuple(float, float))
+    """
+    current = checksum_backend()[0]
+    for name, (crcspeed, adlerspeed) in results.items():
+        marker = " (IN USE)" if name == current else ""
+        print("{0}{1}: CRC32 {2:.2f} GB/s, ADLER32 {3:.2f} GB/s".format(name.upper(), marker, crcspeed, adlerspeed))
+
+
+class ZlibEngine(object):
+    """
+    CRC32/Adler32 checksum, with the same update/hexdigest interface as hashlib.
+    """
+
+    def __init__(self, method):
+        """
+        Prepare hash function and seed.
+
+        :param method: "crc32" or "adler32".
+        :type method: str
+        """
+        self.hashfunc, self.seed = zlib_handler(method)
+
+    def update(self, data):
+        """
+        Update checksum with data.
+
+        :param data: Block of file.
+        :type data: bytes
+        """
+        self.seed = self.hashfunc(data, self.seed)
+
+    def hexdigest(self):
+        """
+        Return checksum as lowercase hex.
+        """
+        return format(self.seed & 0xFFFFFFFF, "08x")
+
+
+class HashCache(object):
+    """
+    Persistent digests of files, keyed on device and inode.
+    Entries are only trusted while size and mtime still match.
+    """
+
+    #: Files modified this recently (seconds) aren't cached, since mtime might not change on the next write.
+    RACY = 2.0
+
+    def __init__(self, enabled=True, homepath=None):
+        """
+        Prepare lock and settings.
+
+        :param enabled: If the cache is consulted. Default is True.
+        :type enabled: bool
+
+        :param homepath: Cache folder. Default is user cache directory.
+        :type homepath: str
+        """
+        self.lock = threading.Lock()
+        self.reset(enabled, homepath)
+
+    def reset(self, enabled=True, homepath=None):
+        """
+        Forget loaded entries and change settings.
+
+        :param enabled: If the cache is consulted. Default is True.
+        :type enabled: bool
+
+        :param homepath: Cache folder. Default is user cache directory.
+        :type homepath: str
+        """
+        with self.lock:
+            self.enabled = enabled
+            self.homepath = homepath
+            self.entries = None
+            self.fresh = {}
+
+    def location(self):
+        """
+        Get path of cache file.
+        """
+        return os.path.join(iniconfig.config_homepath(self.homepath, cachepath=True), "hashes.json")
+
+    def read(self):
+        """
+        Read cache file: {"dev:ino": {"path": str, "size": int, "mtime": int, "digests": dict}}.
+        """
+        try:
+            with open(self.location(), "r") as afile:
+                entries = json.load(afile)
+        except (OSError, IOError, ValueError):
+            entries = {}
+        return entries
+
+    @staticmethod
+    def identity(filepath):
+        """
+        Get cache key and validators of a file.
+
+        :param filepath: File to look up.
+        :type filepath: str
+        """
+        stat = os.stat(filepath)
+        return "{0}:{1}".format(stat.st_dev, stat.st_ino), stat.st_size, compat.stat_mtime_ns(stat)
+
+    def lookup(self, filepath, hashtypes):
+        """
+        Return dict of cached hash type: hash for a file, only for still-valid entries.
+
+        :param filepath: File to look up.
+        :type filepath: str
+
+        :param hashtypes: Hash types wanted.
+        :type hashtypes: list(str)
+        """
+        if not self.enabled:
+            return {}
+        key, size, mtime = self.identity(filepath)
+        with self.lock:
+            if self.entries is None:
+                self.entries = self.read()
+            entry = self.fresh.get(key, self.entries.get(key))
+        if entry is None or entry["size"] != size or entry["mtime"] != mtime:
+            return {}
+        return {hashtype: entry["digests"][hashtype] for hashtype in hashtypes if hashtype in entry["digests"]}
+
+    def remember(self, filepath, digests):
+        """
+        Add digests of a file, unless it was modified too recently to trust its mtime.
+
+        :param filepath: File that was hashed.
+        :type filepath: str
+
+        :param digests: Dict of hash type: hash.
+        :type digests: dict(str: str)
+        """
+        if not self.enabled or not digests:
+            return
+        key, size, mtime = self.identity(filepath)
+        if time.time() - mtime / 1e9 < self.RACY:
+            return
+        with self.lock:
+            entry = self.fresh.get(key, (self.entries or {}).get(key))
+            merged = dict(entry["digests"]) if entry and entry["size"] == size and entry["mtime"] == mtime else {}
+            merged.update(digests)
+            self.fresh[key] = {"path": os.path.abspath(filepath), "size": size, "mtime": mtime, "digests": merged}
+
+    @staticmethod
+    def valid(key, entry):
+        """
+        Check if an entry still describes the file at its path.
+
+        :param key: Cache key, "dev:ino".
+        :type key: str
+
+        :param entry: Cache entry.
+        :type entry: dict
+        """
+        try:
+            current = HashCache.identity(entry["path"])
+        except (OSError, IOError):
+            return False
+        return current == (key, entry["size"], entry["mtime"])
+
+    def save(self):
+        """
+        Merge new entries into the cache file, pruning entries for deleted or changed files.
+        """
+        if not self.enabled:
+            return
+        with self.lock:
+            entries = self.read()
+            entries.update(self.fresh)
+            entries = {key: entry for key, entry in entries.items() if self.valid(key, entry)}
+            location = self.location()
+            with open(location + ".tmp", "w") as afile:
+                json.dump(entries, afile)
+            compat.replace_file(location + ".tmp", location)
+            self.entries = entries
+            self.fresh = {}
+
+
+HASHCACHE = HashCache()
+
+
+def hashcache_setup(enabled=True, homepath=None):
+    """
+    Enable or bypass the persistent hash cache.
+
+    :param enabled: If the cache is consulted. Default is True.
+    :type enabled: bool
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    HASHCACHE.reset(enabled, homepath)
+
+
 def hashlib_hash(filepath, engine, blocksize=16 * 1024 * 1024):
     """
     Return MD5/SHA-1/SHA-2/SHA-3 hash of a file.
@@ -77,15 +408,166 @@ def hashfunc_reader(filepath, engine, blocksize=16 * 1024 * 1024):
     :param engine: Hash object to update with file contents.
     :type engine: _hashlib.HASH
 
+    :param blocksize: How much of file to read at once. Default is 16MB.
+    :type blocksize: int
+    """
+    for chunk in file_blocks(filepath, blocksize):
+        engine.update(chunk)
+
+
+def file_blocks(filepath, blocksize=16 * 1024 * 1024):
+    """
+    Yield a file's contents as memoryviews, without allocating a new buffer per block.
+    Big files are mapped and read sequentially, others are read into one reused buffer.
+    Each block is only valid until the next one is requested.
+
+    :param filepath: File you wish to read.
+    :type filepath: str
+
     :param blocksize: How much of file to read at once. Default is 16MB.
     :type blocksize: int
     """
     with open(filepath, 'rb') as file:
-        while True:
-            data = file.read(blocksize)
-            if not data:
-                break
-            engine.update(data)
+        size = os.fstat(file.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            for chunk in mapped_blocks(file, size, blocksize):
+                yield chunk
+        else:
+            for chunk in read_blocks(file, blocksize):
+                yield chunk
+
+
+def read_blocks(file, blocksize=16 * 1024 * 1024):
+    """
+    Yield an open file's contents as memoryviews of one reused buffer.
+
+    :param file: Open file.
+    :type file: file
+
+    :param blocksize: How much of file to read at once. Default is 16MB.
+    :type blocksize: int
+    """
+    buf = bytearray(blocksize)
+    with memoryview(buf) as view:
+        for count in iter(lambda: file.readinto(buf), 0):
+            with view[:count] as chunk:
+                yield chunk
+
+
+def mapped_blocks(file, size, blocksize=16 * 1024 * 1024):
+    """
+    Yield a mapped file's contents as memoryviews, advising the kernel of sequential access.
+
+    :param file: Open file.
+    :type file: file
+
+    :param size: File size.
+    :type size: int
+
+    :param blocksize: How much of file to yield at once. Default is 16MB.
+    :type blocksize: int
+    """
+    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if hasattr(mapped, "madvise"):  # 3.8+, Unix
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mapped) as view:
+            for offset in range(0, size, blocksize):
+                with view[offset:offset + blocksize] as chunk:
+                    yield chunk
+    finally:
+        mapped.close()
+
+
+def calibrate_blocksize(filepath, sizes=CALIBRATE_SIZES):
+    """
+    Time reading and checksumming a file at several block sizes. Return dict of block size: MB/s.
+    Always times buffered reads, since mapped reads of big files don't depend on block size.
+    The file's cached pages are dropped before each pass, where the OS allows it.
+
+    :param filepath: Sample file, ideally at least a few hundred MB.
+    :type filepath: str
+
+    :param sizes: Block sizes to try. Default is CALIBRATE_SIZES.
+    :type sizes: tuple(int)
+    """
+    fsize = os.path.getsize(filepath)
+    results = {}
+    for size in sizes:
+        calibrate_dropcache(filepath)
+        start = compat.perf_clock()
+        with open(filepath, 'rb') as file:
+            engine = ZlibEngine("adler32")
+            for chunk in read_blocks(file, size):
+                engine.update(chunk)
+        elapsed = max(compat.perf_clock() - start, 1e-9)
+        results[size] = fsize / elapsed / (1024 * 1024)
+    return results
+
+
+def calibrate_dropcache(filepath):
+    """
+    Ask the OS to drop a file's cached pages, so reads come from storage.
+
+    :param filepath: File to drop.
+    :type filepath: str
+    """
+    if hasattr(os, "posix_fadvise"):
+        with open(filepath, 'rb') as file:
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def calibrate_sample(folder, size=256 * 1024 * 1024):
+    """
+    Get the biggest file in a folder to calibrate with, or write a random sample file if there's none big enough.
+    Return path and whether it's a temporary file.
+
+    :param folder: Folder on the storage to calibrate.
+    :type folder: str
+
+    :param size: Minimum sample size. Default is 256MB.
+    :type size: int
+    """
+    files = [os.path.join(folder, x) for x in os.listdir(folder) if os.path.isfile(os.path.join(folder, x))]
+    biggest = max(files, key=os.path.getsize) if files else None
+    if biggest is not None and os.path.getsize(biggest) >= size:
+        return biggest, False
+    sample = os.path.join(folder, "bbarchivist_calibrate.bin")
+    with open(sample, 'wb') as file:
+        for _ in range(size // (16 * 1024 * 1024)):
+            file.write(os.urandom(16 * 1024 * 1024))
+        file.flush()
+        os.fsync(file.fileno())
+    calibrate_dropcache(sample)
+    return sample, True
+
+
+def calibrate_main(folder, homepath=None):
+    """
+    Benchmark block sizes on the storage a folder lives on, print results and store the fastest in hash settings.
+
+    :param folder: Folder on the storage to calibrate.
+    :type folder: str
+
+    :param homepath: Folder containing ini file. Default is user directory.
+    :type homepath: str
+    """
+    sample, temporary = calibrate_sample(folder)
+    try:
+        results = calibrate_blocksize(sample)
+    finally:
+        if temporary:
+            os.remove(sample)
+    for size, speed in sorted(results.items()):
+        print("{0:>10}: {1:.1f} MB/s".format(utilities.fsizer(size), speed))
+    best = max(results, key=results.get)
+    print("BEST BLOCK SIZE: {0}".format(utilities.fsizer(best)))
+    checksum_report(checksum_benchmark())
+    digest_report(digest_benchmark())
+    hashdict = verifier_config_loader(homepath)
+    hashdict["blocksize"] = best
+    verifier_config_writer(hashdict, homepath)
+    return best
 
 
 def ssl_hash(filepath, method, blocksize=16 * 1024 * 1024):
@@ -110,6 +592,45 @@ def ssl_hash(filepath, method, blocksize=16 * 1024 * 1024):
         exceptions.handle_exception(exc, msg, None)
 
 
+def get_optional_engine(hashtype):
+    """
+    Get engine from an optional package. Raise ValueError if it isn't installed, or is too old to have it.
+
+    :param hashtype: Hash type, in :data:`OPTIONAL_ENGINES`.
+    :type hashtype: str
+    """
+    modname, constructor = OPTIONAL_ENGINES[hashtype]
+    try:
+        module = importlib.import_module(modname)
+    except ImportError:
+        raise ValueError("{0} is not installed".format(modname))
+    if not hasattr(module, constructor):
+        raise ValueError("{0} is too old".format(modname))
+    return getattr(module, constructor)()
+
+
+def optional_hash(filepath, method, blocksize=16 * 1024 * 1024):
+    """
+    Return hash of a file from an optional package, i.e. BLAKE3/xxHash.
+
+    :param filepath: File you wish to verify.
+    :type filepath: str
+
+    :param method: Method to use: "blake3", "xxh3" or "xxh128".
+    :type method: str
+
+    :param blocksize: How much of file to read at once. Default is 16MB.
+    :type blocksize: int
+    """
+    try:
+        engine = get_optional_engine(method)
+        hashfunc_reader(filepath, engine, blocksize)
+        return engine.hexdigest()
+    except ValueError as exc:
+        msg = "{0} HASH FAILED".format(method.upper())
+        exceptions.handle_exception(exc, msg, None)
+
+
 def calculate_escreens(pin, app, uptime, duration=30):
     """
     Calculate key for the Engineering Screens based on input.
@@ -167,7 +688,12 @@ def get_hashfunc(hashtype):
                  "sha3224": hashlib_hash,
                  "sha3256": hashlib_hash,
                  "sha3384": hashlib_hash,
-                 "sha3512": hashlib_hash}
+                 "sha3512": hashlib_hash,
+                 "blake2b": hashlib_hash,
+                 "blake2s": hashlib_hash,
+                 "blake3": optional_hash,
+                 "xxh3": optional_hash,
+                 "xxh128": optional_hash}
     return hashfuncs[hashtype]
 
 
@@ -188,10 +714,110 @@ def get_engine(hashtype):
         hashengines.update({"sha3224": hashlib.sha3_224(),
                             "sha3256": hashlib.sha3_256(),
                             "sha3384": hashlib.sha3_384(),
-                            "sha3512": hashlib.sha3_512()})
+                            "sha3512": hashlib.sha3_512(),
+                            "blake2b": hashlib.blake2b(),
+                            "blake2s": hashlib.blake2s()})
     return hashengines[hashtype]
 
 
+def get_multi_engine(hashtype):
+    """
+    Get updatable engine from any hash type: zlib, hashlib, SSL library or optional package.
+
+    :param hashtype: Hash type.
+    :type hashtype: str
+    """
+    hashfunc = get_hashfunc(hashtype)
+    if hashfunc == zlib_hash:
+        engine = ZlibEngine(hashtype)
+    elif hashfunc == ssl_hash:
+        engine = hashlib.new("sha" if hashtype == "sha0" else hashtype)
+    elif hashfunc == optional_hash:
+        engine = get_optional_engine(hashtype)
+    else:
+        engine = get_engine(hashtype)
+    return engine
+
+
+def multi_engines(hashtypes):
+    """
+    Get engines for several hash types, skipping any the SSL library or installed packages lack.
+
+    :param hashtypes: Hash types.
+    :type hashtypes: list(str)
+    """
+    engines = {}
+    for hashtype in hashtypes:
+        try:
+            engines[hashtype] = get_multi_engine(hashtype)
+        except ValueError as exc:
+            msg = "{0} HASH FAILED".format(hashtype.upper())
+            exceptions.handle_exception(exc, msg, None)
+    return engines
+
+
+def multi_hash(filepath, hashtypes, blocksize=16 * 1024 * 1024, cache=True, workers=None):
+    """
+    Return dict of hash type: hash of a file, reading it only once.
+    Each block is fed to every engine, concurrently if there are several.
+    Digests in the persistent cache aren't recalculated.
+
+    :param filepath: File you wish to verify.
+    :type filepath: str
+
+    :param hashtypes: Hash types.
+    :type hashtypes: list(str)
+
+    :param blocksize: How much of file to read at once. Default is 16MB.
+    :type blocksize: int
+
+    :param cache: If the persistent cache is consulted. Default is True.
+    :type cache: bool
+
+    :param workers: Threads feeding engines. Default is one per engine, up to CPU count.
+    :type workers: int
+    """
+    cached = HASHCACHE.lookup(filepath, hashtypes) if cache else {}
+    missing = [hashtype for hashtype in hashtypes if hashtype not in cached]
+    if not missing:
+        return cached
+    results = multi_read(filepath, missing, blocksize, workers)
+    if cache:
+        HASHCACHE.remember(filepath, results)
+    results.update(cached)
+    return results
+
+
+def multi_read(filepath, hashtypes, blocksize=16 * 1024 * 1024, workers=None):
+    """
+    Read a file once, feeding each block to every engine. Return dict of hash type: hash.
+
+    :param filepath: File you wish to verify.
+    :type filepath: str
+
+    :param hashtypes: Hash types.
+    :type hashtypes: list(str)
+
+    :param blocksize: How much of file to read at once. Default is 16MB.
+    :type blocksize: int
+
+    :param workers: Threads feeding engines. Default is one per engine, up to CPU count.
+    :type workers: int
+    """
+    engines = multi_engines(hashtypes)
+    if workers is None:
+        workers = utilities.cpu_workers(list(engines)) if engines else 1
+    if workers < 2:
+        for chunk in file_blocks(filepath, blocksize):
+            for engine in engines.values():
+                engine.update(chunk)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as xec:
+            for chunk in file_blocks(filepath, blocksize):
+                list(xec.map(lambda engine, data=chunk: engine.update(data), engines.values()))
+    return {hashtype: engine.hexdigest() for hashtype, engine in engines.items()}
+
+
 def hash_get(filename, hashfunc, hashtype, workingdir, blocksize=16777216):
     """
     Generate and pretty format the hash result for a file.
@@ -249,7 +875,7 @@ def base_hash(hashtype, source, workingdir, block, target, kwargs=None):
         target.write("\n".join(hash_generic))
 
 
-def hash_writer(source, dest, workingdir, kwargs=None):
+def hash_writer(source, dest, workingdir, kwargs=None, workers=None):
     """
     Write per-file hashes.
 
@@ -264,26 +890,19 @@ def hash_writer(source, dest, workingdir, kwargs=None):
 
     :param kwargs: Values. Refer to `:func:verifier_config_loader`.
     :type kwargs: dict
+
+    :param workers: Threads feeding engines. Default is one per engine, up to CPU count.
+    :type workers: int
     """
     block = int(kwargs['blocksize'])
+    hashtypes = [hashtype for hashtype in HASH_ORDER if kwargs.get(hashtype)]
+    if not utilities.new_enough(3, 6):
+        hashtypes = [hashtype for hashtype in hashtypes if hashtype not in HASH_NEW]
+    results = multi_hash(os.path.join(workingdir, source), hashtypes, block, workers=workers)
     with open(dest, 'w') as target:
-        base_hash("adler32", source, workingdir, block, target, kwargs)
-        base_hash("crc32", source, workingdir, block, target, kwargs)
-        base_hash("md4", source, workingdir, block, target, kwargs)
-        base_hash("md5", source, workingdir, block, target, kwargs)
-        base_hash("sha0", source, workingdir, block, target, kwargs)
-        base_hash("sha1", source, workingdir, block, target, kwargs)
-        base_hash("sha224", source, workingdir, block, target, kwargs)
-        base_hash("sha256", source, workingdir, block, target, kwargs)
-        base_hash("sha384", source, workingdir, block, target, kwargs)
-        base_hash("sha512", source, workingdir, block, target, kwargs)
-        base_hash("ripemd160", source, workingdir, block, target, kwargs)
-        base_hash("whirlpool", source, workingdir, block, target, kwargs)
-        if utilities.new_enough(3, 6):
-            base_hash("sha3224", source, workingdir, block, target, kwargs)
-            base_hash("sha3256", source, workingdir, block, target, kwargs)
-            base_hash("sha3384", source, workingdir, block, target, kwargs)
-            base_hash("sha3512", source, workingdir, block, target, kwargs)
+        for hashtype in hashtypes:
+            if hashtype in results:
+                target.write("{0}\n{1} {2}\n".format(hashtype.upper(), results[hashtype].upper(), os.path.basename(source)))
 
 
 def filefilter(file, workingdir, extras=()):
@@ -328,17 +947,89 @@ def verifier(ldir, kwargs=None, selective=False):
     :param kwargs: Values. Refer to `:func:verifier_config_loader`.
     :type kwargs: dict
 
+    :param selective: Filtering filenames/extensions. Default is false.
+    :type selective: bool
+    """
+    verifier_bulk([ldir], kwargs, selective)
+
+
+def verifier_jobs(ldirs, selective=False):
+    """
+    Collect files from several directories, largest first. Return list of (size, directory, file).
+
+    :param ldirs: Paths containing files you wish to verify.
+    :type ldirs: list(str)
+
+    :param selective: Filtering filenames/extensions. Default is false.
+    :type selective: bool
+    """
+    jobs = []
+    for ldir in sorted(set(ldirs), key=ldirs.index):
+        jobs.extend((os.path.getsize(file), ldir, file) for file in prep_verifier(ldir, selective))
+    return sorted(jobs, key=lambda job: job[0], reverse=True)
+
+
+def verifier_engines(size, total, cpus):
+    """
+    Decide how many threads feed one file's engines.
+    Files big enough to outlast the rest of the queue on one core get every core; others get one, since files already run in parallel.
+
+    :param size: File size.
+    :type size: int
+
+    :param total: Size of all queued files.
+    :type total: int
+
+    :param cpus: Number of workers.
+    :type cpus: int
+    """
+    return None if size * cpus > total else 1
+
+
+def verifier_bulk(ldirs, kwargs=None, selective=False):
+    """
+    For all files in several directories, perform various hash/checksum functions on one shared pool, largest files first.
+    Take dict to define hashes, write output to individual .cksum files, then report throughput.
+
+    :param ldirs: Paths containing files you wish to verify.
+    :type ldirs: list(str)
+
+    :param kwargs: Values. Refer to `:func:verifier_config_loader`.
+    :type kwargs: dict
+
     :param selective: Filtering filenames/extensions. Default is false.
     :type selective: bool
     """
     kwargs = verifier_config_loader() if kwargs is None else kwargs
-    fxs = prep_verifier(ldir, selective)
-    with concurrent.futures.ThreadPoolExecutor(max_workers=utilities.cpu_workers(fxs)) as xec:
-        for file in fxs:
-            verifier_individual(xec, ldir, file, kwargs)
+    jobs = verifier_jobs(ldirs, selective)
+    total = sum(job[0] for job in jobs)
+    cpus = utilities.cpu_workers(jobs) if jobs else 1
+    start = compat.perf_clock()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=cpus) as xec:
+        for size, ldir, file in jobs:
+            verifier_individual(xec, ldir, file, kwargs, verifier_engines(size, total, cpus))
+    HASHCACHE.save()
+    verifier_report(len(jobs), total, compat.perf_clock() - start)
+
+
+def verifier_report(count, total, elapsed):
+    """
+    Print number of files hashed, and throughput.
+
+    :param count: Number of files.
+    :type count: int
+
+    :param total: Size of all files.
+    :type total: int
+
+    :param elapsed: Seconds taken.
+    :type elapsed: float
+    """
+    speed = total / max(elapsed, 1e-9)
+    print("HASHED {0} FILES, {1} IN {2:.2f}s ({3}/s)".format(count, utilities.fsizer(total), elapsed, utilities.fsizer(speed)))
 
 
-def verifier_individual(xec, ldir, file, kwargs):
+def verifier_individual(xec, ldir, file, kwargs, workers=None):
     """
     Individually verify files through a ThreadPoolExecutor.
 
@@ -353,16 +1044,153 @@ def verifier_individual(xec, ldir, file, kwargs):
 
     :param kwargs: Values. Refer to `:func:verifier_config_loader`.
     :type kwargs: dict
+
+    :param workers: Threads feeding this file's engines. Default is one per engine, up to CPU count.
+    :type workers: int
     """
     print("HASHING:", os.path.basename(file))
     basename = file + ".cksum"
     targetname = os.path.join(ldir, basename)
     try:
-        xec.submit(hash_writer, file, targetname, ldir, kwargs)
+        xec.submit(hash_writer, file, targetname, ldir, kwargs, workers)
     except Exception as exc:
         exceptions.handle_exception(exc)
 
 
+def cksum_parse(cksumfile):
+    """
+    Read a .cksum file. Return dict of lowercase hash type: (uppercase hash, filename).
+
+    :param cksumfile: Path to .cksum file.
+    :type cksumfile: str
+    """
+    with open(cksumfile, "r") as afile:
+        lines = [line.strip() for line in afile if line.strip()]
+    expected = {}
+    for hashtype, hashline in zip(lines[0::2], lines[1::2]):
+        digest, _, filename = hashline.partition(" ")
+        expected[hashtype.lower()] = (digest.upper(), filename)
+    return expected
+
+
+def hash_supported(hashtype):
+    """
+    Check if a hash type can be calculated here: known, and provided by the SSL library or installed packages.
+
+    :param hashtype: Hash type.
+    :type hashtype: str
+    """
+    if hashtype not in HASH_ORDER:
+        return False
+    try:
+        get_multi_engine(hashtype)
+    except (KeyError, ValueError):
+        return False
+    return True
+
+
+def cksum_check(cksumfile, blocksize=16 * 1024 * 1024):
+    """
+    Re-hash the file a .cksum file describes, with only the supported algorithms it lists.
+    Return lists of (failed, skipped, checked) hash types; failed is ["MISSING"] if the file is gone.
+    Always reads the file, never the hash cache.
+
+    :param cksumfile: Path to .cksum file.
+    :type cksumfile: str
+
+    :param blocksize: How much of file to read at once. Default is 16MB.
+    :type blocksize: int
+    """
+    expected = cksum_parse(cksumfile)
+    supported = [hashtype for hashtype in expected if hash_supported(hashtype)]
+    skipped = [hashtype.upper() for hashtype in expected if hashtype not in supported]
+    if not supported:
+        return [], skipped, []
+    filename = list(expected.values())[0][1]
+    filepath = os.path.join(os.path.dirname(cksumfile), filename)
+    if not os.path.exists(filepath):
+        return ["MISSING"], skipped, []
+    results = multi_hash(filepath, supported, blocksize, cache=False, workers=1)
+    failed = [hashtype.upper() for hashtype in supported if results[hashtype].upper() != expected[hashtype][0]]
+    return failed, skipped, [hashtype.upper() for hashtype in supported]
+
+
+def cksum_jobs(ldirs):
+    """
+    Collect .cksum files under several directories, largest described file first.
+
+    :param ldirs: Paths to search.
+    :type ldirs: list(str)
+    """
+    found = set()
+    for ldir in ldirs:
+        for root, _, files in os.walk(ldir):
+            found.update(os.path.join(root, file) for file in files if file.endswith(".cksum"))
+    sizes = {cksum: os.path.getsize(cksum[:-6]) if os.path.exists(cksum[:-6]) else 0 for cksum in found}
+    return sorted(found, key=lambda cksum: (-sizes[cksum], cksum))
+
+
+def cksum_verify(ldirs, failfast=False, blocksize=16 * 1024 * 1024):
+    """
+    Check every .cksum file under several directories, in parallel. Return dict of failed .cksum file: failed hash types.
+    Only digests that were actually calculated can fail; files with none are reported as unverified.
+
+    :param ldirs: Paths to search.
+    :type ldirs: list(str)
+
+    :param failfast: Stop at the first mismatch. Default is False.
+    :type failfast: bool
+
+    :param blocksize: How much of file to read at once. Default is 16MB.
+    :type blocksize: int
+    """
+    jobs = cksum_jobs(ldirs)
+    failures = {}
+    unverified = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=utilities.cpu_workers(jobs) if jobs else 1) as xec:
+        futures = {xec.submit(cksum_check, cksum, blocksize): cksum for cksum in jobs}
+        for future in concurrent.futures.as_completed(futures):
+            failed, skipped, checked = future.result()
+            cksum = futures[future]
+            cksum_printer(cksum, failed, skipped, checked)
+            if not failed and not checked:
+                unverified += 1
+            if failed:
+                failures[cksum] = failed
+                if failfast:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+    print("CHECKED {0} FILES, {1} FAILED, {2} UNVERIFIED".format(len(jobs), len(failures), unverified))
+    return failures
+
+
+def cksum_printer(cksum, failed, skipped=(), checked=()):
+    """
+    Print result of checking one .cksum file.
+
+    :param cksum: Path to .cksum file.
+    :type cksum: str
+
+    :param failed: Failed hash types.
+    :type failed: list(str)
+
+    :param skipped: Hash types that can't be calculated here.
+    :type skipped: list(str)
+
+    :param checked: Hash types that were calculated.
+    :type checked: list(str)
+    """
+    name = os.path.basename(cksum[:-6])
+    extra = " [SKIPPED: {0}]".format(", ".join(skipped)) if skipped else ""
+    if failed:
+        print("FAILED: {0} ({1}){2}".format(name, ", ".join(failed), extra))
+    elif not checked:
+        print("UNVERIFIED: {0} (NO SUPPORTED HASHES){1}".format(name, extra))
+    else:
+        print("OK: {0}{1}".format(name, extra))
+
+
 def verifier_config_loader(homepath=None):
     """
     Read a ConfigParser file to get hash preferences.
@@ -389,6 +1217,11 @@ def verifier_config_loader(homepath=None):
     results['sha3256'] = bool(ini.getboolean('sha3256', fallback=False))
     results['sha3384'] = bool(ini.getboolean('sha3384', fallback=False))
     results['sha3512'] = bool(ini.getboolean('sha3512', fallback=False))
+    results['blake2b'] = bool(ini.getboolean('blake2b', fallback=False))
+    results['blake2s'] = bool(ini.getboolean('blake2s', fallback=False))
+    results['blake3'] = bool(ini.getboolean('blake3', fallback=False))
+    results['xxh3'] = bool(ini.getboolean('xxh3', fallback=False))
+    results['xxh128'] = bool(ini.getboolean('xxh128', fallback=False))
     return results
 
 
@@ -2,16 +2,156 @@
 """This module is used for creation of TCL autoloaders."""
 
 import os  # path work
+import posixpath  # zip member paths
 import shutil  # file copying
+import zipfile  # streaming extraction
 
 from bbarchivist import bbconstants  # versions/constants
+from bbarchivist import compat  # file replacement
+
+try:
+    import fcntl  # reflinks
+except ImportError:  # Windows
+    fcntl = None
 
 __author__ = "Thurask"
 __license__ = "WTFPL v2"
 __copyright__ = "2018-2019 Thurask"
 
+FICLONE = 0x40049409  # linux/fs.h
+
+
+def stage_link(infile, outfile):
+    """
+    Hardlink a file, if both paths are on the same filesystem. Return True if linked.
+
+    :param infile: Path to source file.
+    :type infile: str
+
+    :param outfile: Path to destination file.
+    :type outfile: str
+    """
+    if os.stat(infile).st_dev != os.stat(os.path.dirname(os.path.abspath(outfile))).st_dev:
+        return False
+    try:
+        os.link(infile, outfile)
+    except (AttributeError, OSError):
+        return False
+    return True
+
+
+def stage_clone(src, dst):
+    """
+    Share a file's extents with a reflink. Return True if cloned.
+
+    :param src: Open source file.
+    :type src: file
+
+    :param dst: Open destination file.
+    :type dst: file
+    """
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    except OSError:
+        return False
+    return True
+
+
+def stage_range(src, dst):
+    """
+    Copy a file inside the kernel, with copy_file_range. Return True if copied.
+
+    :param src: Open source file.
+    :type src: file
+
+    :param dst: Open destination file.
+    :type dst: file
+    """
+    if not hasattr(os, "copy_file_range"):
+        return False
+    remaining = os.fstat(src.fileno()).st_size
+    offset = 0
+    try:
+        while remaining > 0:
+            done = os.copy_file_range(src.fileno(), dst.fileno(), remaining, offset, offset)
+            if not done:
+                break
+            offset += done
+            remaining -= done
+    except OSError:
+        if offset:
+            raise
+        return False
+    return remaining <= 0
+
+
+def stage_copy(infile, outfile, stage=True):
+    """
+    Copy a file to a path that doesn't exist yet, with a reflink or in-kernel copy where possible.
+
+    :param infile: Path to source file.
+    :type infile: str
+
+    :param outfile: Path to new destination file.
+    :type outfile: str
+
+    :param stage: Try a reflink and in-kernel copy before a plain copy. Default is True.
+    :type stage: bool
+    """
+    staged = False
+    if stage:
+        with open(infile, "rb") as src, open(outfile, "wb") as dst:
+            staged = stage_clone(src, dst) or stage_range(src, dst)
+    if staged:
+        shutil.copymode(infile, outfile)
+    else:
+        shutil.copy(infile, outfile)
+
+
+def stage_discard(filename):
+    """
+    Unlink a file if it exists. Unlinking never truncates other links to the same data.
+
+    :param filename: Path to file.
+    :type filename: str
+    """
+    if os.path.lexists(filename):
+        os.remove(filename)
+
+
+def stage_file(infile, outfile, stage=True):
+    """
+    Arrange a file at a new path without duplicating its data where possible.
+
+    Try a hardlink, then a reflink, then an in-kernel copy, then a plain copy.
+    Work happens on a temporary name that then replaces the destination,
+    so an existing destination (maybe a hardlink to the source) is never written to.
+
+    :param infile: Path to source file.
+    :type infile: str
+
+    :param outfile: Path to destination file.
+    :type outfile: str
 
-def point_point_copy(inpath, outpath, filename):
+    :param stage: Link/clone instead of copying, where possible. Default is True.
+    :type stage: bool
+    """
+    if stage and os.path.exists(outfile) and os.path.samefile(infile, outfile):
+        return
+    temp = "{0}.staging".format(outfile)
+    stage_discard(temp)
+    try:
+        if not (stage and stage_link(infile, temp)):
+            stage_copy(infile, temp, stage)
+        compat.replace_file(temp, outfile)
+    except Exception:
+        stage_discard(temp)
+        raise
+
+
+def point_point_copy(inpath, outpath, filename, stage=True):
     """
     Copy a file from one absolute path to another.
 
@@ -23,15 +163,18 @@ def point_point_copy(inpath, outpath, filename):
 
     :param filename: Filename.
     :type filename: str
+
+    :param stage: Link/clone instead of copying, where possible. Default is True.
+    :type stage: bool
     """
     if os.sep in filename:
         filex = os.path.basename(filename)
     else:
         filex = filename
-    shutil.copy(os.path.join(inpath, filename), os.path.join(outpath, filex))
+    stage_file(os.path.join(inpath, filename), os.path.join(outpath, filex), stage)
 
 
-def point_point_bulk(inpath, outpath, files):
+def point_point_bulk(inpath, outpath, files, stage=True):
     """
     Copy a list of files from one absolute path to another.
 
@@ -43,9 +186,12 @@ def point_point_bulk(inpath, outpath, files):
 
     :param files: List of filenames.
     :type files: list(str)
+
+    :param stage: Link/clone instead of copying, where possible. Default is True.
+    :type stage: bool
     """
     for file in files:
-        point_point_copy(inpath, outpath, file)
+        point_point_copy(inpath, outpath, file, stage)
 
 
 def generate_tclloader_script(dirname, batchfile, shfile, wipe=True):
@@ -188,7 +334,7 @@ def generate_tclloader_carriter(sigin, sigout, prods):
         generate_tclloader_csig(sigin, sigout, carr)
 
 
-def generate_tclloader_mbn(mbnin, mbnout, platform):
+def generate_tclloader_mbn(mbnin, mbnout, platform, stage=True):
     """
     Generate mbn files.
 
@@ -200,9 +346,12 @@ def generate_tclloader_mbn(mbnin, mbnout, platform):
 
     :param platform: Platform type (i.e. subdirectory of target/product).
     :type platform: str
+
+    :param stage: Link/clone instead of copying, where possible. Default is True.
+    :type stage: bool
     """
     files = generate_tclloader_platmbn(platform)
-    point_point_bulk(mbnin, mbnout, files)
+    point_point_bulk(mbnin, mbnout, files, stage)
 
 
 def generate_tclloader_omniset(omnin, omnilist, prefix, suffix, filt):
@@ -392,7 +541,7 @@ def generate_tclloader_platother(platform):
     return others
 
 
-def generate_tclloader_img(imgin, imgout, platform):
+def generate_tclloader_img(imgin, imgout, platform, stage=True):
     """
     Generate partition images and radios.
 
@@ -404,16 +553,19 @@ def generate_tclloader_img(imgin, imgout, platform):
 
     :param platform: Platform type (i.e. subdirectory of target/product).
     :type platform: str
+
+    :param stage: Link/clone instead of copying, where possible. Default is True.
+    :type stage: bool
     """
     imgs = generate_tclloader_platimg(platform)
-    point_point_bulk(imgin, imgout, ["{0}.img".format(img) for img in imgs])
+    point_point_bulk(imgin, imgout, ["{0}.img".format(img) for img in imgs], stage)
     oems, radios = generate_tclloader_deps(platform)
     oems = generate_tclloader_oemfilt(imgin, oems)
-    point_point_bulk(imgin, imgout, ["{0}.img".format(oem) for oem in oems])
+    point_point_bulk(imgin, imgout, ["{0}.img".format(oem) for oem in oems], stage)
     radios = generate_tclloader_radfilt(imgin, radios)
-    point_point_bulk(imgin, imgout, ["NON-HLOS-{0}.bin".format(rad) for rad in radios])
+    point_point_bulk(imgin, imgout, ["NON-HLOS-{0}.bin".format(rad) for rad in radios], stage)
     others = generate_tclloader_platother(platform)
-    point_point_bulk(imgin, imgout, others)
+    point_point_bulk(imgin, imgout, others, stage)
     generate_tclloader_looseends(imgout, platform)
 
 
@@ -433,7 +585,7 @@ def generate_tclloader_scripttype(platform):
     return scripts
 
 
-def generate_tclloader(localdir, dirname, platform, localtools=False, wipe=True):
+def generate_tclloader(localdir, dirname, platform, localtools=False, wipe=True, stage=True):
     """
     Generate Android loader from extracted template files.
 
@@ -451,6 +603,9 @@ def generate_tclloader(localdir, dirname, platform, localtools=False, wipe=True)
 
     :param wipe: If the final loader wipes userdata. Default is True.
     :type wipe: bool
+
+    :param stage: Link/clone images instead of copying, where possible. Default is True.
+    :type stage: bool
     """
     if not os.path.exists(dirname):
         os.makedirs(dirname)
@@ -467,9 +622,133 @@ def generate_tclloader(localdir, dirname, platform, localtools=False, wipe=True)
         platdir = "plattools"
         generate_google_host(platdir, hostdir)
     pdir = os.path.join(localdir, "target", "product", platform)
-    generate_tclloader_img(pdir, imgdir, platform)
+    generate_tclloader_img(pdir, imgdir, platform, stage)
     sdir = os.path.join(pdir, "sig")
     generate_tclloader_sig(sdir, imgdir)
     generate_tclloader_carriers(sdir, imgdir)
     qdir = os.path.join(pdir, "qcbc")
-    generate_tclloader_mbn(qdir, imgdir, platform)
+    generate_tclloader_mbn(qdir, imgdir, platform, stage)
+
+
+def stream_platform(names):
+    """
+    Get platform type from the member names of a loader template zip.
+
+    :param names: Zip member names.
+    :type names: list(str)
+    """
+    prods = sorted(set(name.split("/")[2] for name in names if name.startswith("target/product/") and name.count("/") > 2))
+    return prods[0]
+
+
+def stream_layout_host(names):
+    """
+    Map host files in a loader template zip to their loader paths.
+
+    :param names: Zip member names.
+    :type names: set(str)
+    """
+    winx = ["AdbWinApi.dll", "AdbWinUsbApi.dll", "fastboot.exe"]
+    hosts = ["windows-x86/bin/{0}".format(x) for x in winx] + ["linux-x86/bin/fastboot", "darwin-x86/bin/fastboot"]
+    return {"host/{0}".format(host): posixpath.join("host", posixpath.basename(host)) for host in hosts if "host/{0}".format(host) in names}
+
+
+def stream_layout_sig(names, pdir):
+    """
+    Map signature files in a loader template zip to their loader paths.
+
+    :param names: Zip member names.
+    :type names: set(str)
+
+    :param pdir: Platform directory inside the zip.
+    :type pdir: str
+    """
+    sdir = posixpath.join(pdir, "sig")
+    sigs = {posixpath.join(sdir, "{0}.img.production.sig".format(entry)): "img/{0}.img.sig".format(entry) for entry in ("boot", "recovery")}
+    prods = set(posixpath.basename(x).split("-")[-1].split(".")[0] for x in names if x.startswith(sdir + "/") and "production-" in x) - {"boot", "recovery"}
+    for carr in prods:
+        for entry in ("boot", "recovery"):
+            sigs[posixpath.join(sdir, "{1}.img.production-{0}.sig".format(carr, entry))] = "img/{1}.img{0}.sig".format(carr, entry)
+    return sigs
+
+
+def stream_layout(names, platform, localtools=False):
+    """
+    Map members of a loader template zip to their loader paths, following the same rules as :func:`generate_tclloader`.
+
+    :param names: Zip member names.
+    :type names: list(str)
+
+    :param platform: Platform type (i.e. subdirectory of target/product).
+    :type platform: str
+
+    :param localtools: If host files will be copied from the template. Default is False.
+    :type localtools: bool
+    """
+    names = set(names)
+    pdir = "target/product/{0}".format(platform)
+    oems, radios = generate_tclloader_deps(platform)
+    files = ["{0}.img".format(img) for img in generate_tclloader_platimg(platform)]
+    files += ["{0}.img".format(oem) for oem in oems]
+    files += ["NON-HLOS-{0}.bin".format(rad) for rad in radios]
+    files += [other for other in generate_tclloader_platother(platform) if other is not None]
+    layout = {posixpath.join(pdir, filex): posixpath.join("img", filex) for filex in files}
+    mbns = [mbn for mbn in generate_tclloader_platmbn(platform) if mbn is not None]
+    layout.update({posixpath.join(pdir, "qcbc", mbn.replace(os.sep, "/")): posixpath.join("img", posixpath.basename(mbn.replace(os.sep, "/"))) for mbn in mbns})
+    layout.update(stream_layout_sig(names, pdir))
+    if localtools:
+        layout.update(stream_layout_host(names))
+    return {member: dest for member, dest in layout.items() if member in names}
+
+
+def stream_members(zipf, layout, dirname):
+    """
+    Write each needed zip member straight to its loader path.
+
+    :param zipf: Open loader template zip.
+    :type zipf: zipfile.ZipFile
+
+    :param layout: Dictionary of member: loader path.
+    :type layout: dict(str: str)
+
+    :param dirname: Name for final directory and loader.
+    :type dirname: str
+    """
+    for member, dest in layout.items():
+        outfile = os.path.join(dirname, *dest.split("/"))
+        os.makedirs(os.path.dirname(outfile), exist_ok=True)
+        with zipf.open(member) as src, open(outfile, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def generate_tclloader_stream(loaderfile, dirname, platform, localtools=False, wipe=True):
+    """
+    Generate Android loader straight from a template zip, without extracting it first.
+
+    :param loaderfile: Path to loader template zip.
+    :type loaderfile: str
+
+    :param dirname: Name for final directory and loader.
+    :type dirname: str
+
+    :param platform: Platform type (i.e. subdirectory of target/product).
+    :type platform: str
+
+    :param localtools: If host files will be copied from the template rather than a download. Default is False.
+    :type localtools: bool
+
+    :param wipe: If the final loader wipes userdata. Default is True.
+    :type wipe: bool
+    """
+    hostdir = os.path.join(dirname, "host")
+    imgdir = os.path.join(dirname, "img")
+    os.makedirs(hostdir)
+    os.makedirs(imgdir)
+    platscripts = generate_tclloader_scripttype(platform)
+    generate_tclloader_script(dirname, platscripts[0], platscripts[1], wipe)
+    if not localtools:
+        generate_google_host("plattools", hostdir)
+    with zipfile.ZipFile(loaderfile) as zipf:
+        layout = stream_layout(zipf.namelist(), platform, localtools)
+        stream_members(zipf, layout, dirname)
+    generate_tclloader_looseends(imgdir, platform)
@@ -3,11 +3,19 @@
 
 import concurrent.futures  # multiprocessing/threading
 import glob  # pem file lookup
+import hashlib  # cache keys
+import json  # cache metadata
 import os  # filesystem read
 import re  # regexes
+import threading  # request coalescing
+import time  # throttling
+import urllib.parse  # hostnames
 
 import requests  # downloading
 import user_agent  # user agent
+from bbarchivist import argutils  # bandwidth suffixes
+from bbarchivist import compat  # clock
+from bbarchivist import iniconfig  # config parsing
 from bbarchivist import utilities  # parse filesize
 from bbarchivist import xmlutils  # xml work
 from bbarchivist.bbconstants import SERVERS  # lookup servers
@@ -71,6 +79,567 @@ def try_try_again(method):
     return wrapper
 
 
+class Flight(object):
+    """
+    A single in-flight call, shared by everyone asking for the same thing.
+    """
+
+    def __init__(self):
+        """
+        Prepare completion event and result slots.
+        """
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """
+        Block until the call is complete, then return its result or raise its error.
+        """
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight(object):
+    """
+    Coalesce identical concurrent calls into one, memoizing results while a run is active.
+    """
+
+    def __init__(self):
+        """
+        Prepare lock, in-flight calls and memoized results.
+        """
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.results = {}
+        self.depth = 0
+
+    def begin(self):
+        """
+        Start memoizing completed results.
+        """
+        with self.lock:
+            self.depth += 1
+
+    def end(self):
+        """
+        Stop memoizing once the outermost run is over, and forget results.
+        """
+        with self.lock:
+            self.depth = max(self.depth - 1, 0)
+            if not self.depth:
+                self.results = {}
+
+    def do(self, key, method, *args, **kwargs):
+        """
+        Call method, unless an identical call is running or memoized.
+
+        :param key: Call identity.
+        :type key: tuple
+
+        :param method: Method to use.
+        :type method: function
+        """
+        with self.lock:
+            if key in self.results:
+                return self.results[key]
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = Flight()
+                self.inflight[key] = flight
+        if not leader:
+            return flight.wait()
+        return self.lead(key, flight, method, *args, **kwargs)
+
+    def lead(self, key, flight, method, *args, **kwargs):
+        """
+        Make the actual call on behalf of everyone waiting on it.
+
+        :param key: Call identity.
+        :type key: tuple
+
+        :param flight: Flight to complete.
+        :type flight: Flight
+
+        :param method: Method to use.
+        :type method: function
+        """
+        try:
+            flight.result = method(*args, **kwargs)
+        except BaseException as exc:  # interrupts too, so they're never memoized
+            flight.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.inflight[key]
+                if flight.error is None and self.depth:
+                    self.results[key] = flight.result
+            flight.done.set()
+        return flight.result
+
+
+#: Shared request coalescer.
+FLIGHTS = SingleFlight()
+
+
+def singleflight(method):
+    """
+    Decorator to share identical concurrent requests for one URL.
+
+    :param method: Method to use, with the URL as its first argument.
+    :type method: function
+    """
+    def wrapper(*args, **kwargs):
+        """
+        Key call on method name and URL, ignoring session.
+        """
+        url = args[0] if args else kwargs.get("url")
+        return FLIGHTS.do((method.__name__, url), method, *args, **kwargs)
+    return wrapper
+
+
+def memoize_run(method):
+    """
+    Decorator to memoize coalesced request results for the duration of a run.
+
+    :param method: Method to use.
+    :type method: function
+    """
+    def wrapper(*args, **kwargs):
+        """
+        Memoize requests while function runs, then forget them.
+        """
+        FLIGHTS.begin()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            FLIGHTS.end()
+    return wrapper
+
+
+class TokenBucket(object):
+    """
+    Token bucket bandwidth limiter, shared between download threads.
+    """
+
+    def __init__(self, rate=0, burst=None):
+        """
+        Prepare lock and bucket.
+
+        :param rate: Bytes per second, 0 for unlimited. Default is 0.
+        :type rate: int
+
+        :param burst: Bucket size in bytes. Default is one second at rate.
+        :type burst: int
+        """
+        self.lock = threading.Lock()
+        self.set_rate(rate, burst)
+
+    def set_rate(self, rate=0, burst=None):
+        """
+        Change rate, refill bucket.
+
+        :param rate: Bytes per second, 0 for unlimited. Default is 0.
+        :type rate: int
+
+        :param burst: Bucket size in bytes. Default is one second at rate.
+        :type burst: int
+        """
+        with self.lock:
+            self.rate = max(int(rate), 0)
+            self.burst = max(self.rate, DOWNLOAD_CHUNK) if burst is None else burst
+            self.tokens = self.burst
+            self.stamp = compat.perf_clock()
+
+    def reserve(self, amount):
+        """
+        Take tokens, going into debt if need be; return how long to wait to pay it off.
+        Debt is queued in order of arrival, so threads share bandwidth fairly.
+
+        :param amount: Bytes to take.
+        :type amount: int
+        """
+        with self.lock:
+            now = compat.perf_clock()
+            self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+            self.stamp = now
+            self.tokens -= amount
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        return delay
+
+    def consume(self, amount):
+        """
+        Take tokens, sleeping if the bucket is empty. Return time slept.
+
+        :param amount: Bytes to take.
+        :type amount: int
+        """
+        if not self.rate:
+            return 0
+        delay = self.reserve(amount)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class WorkerTuner(object):
+    """
+    Download worker limit, adjusted by watching aggregate throughput.
+    Adds a worker while throughput keeps rising, settles on the best count
+    once it plateaus, and drops a worker when errors appear.
+    """
+
+    def __init__(self, start=0, ceiling=16, interval=2.0):
+        """
+        Prepare condition and counters.
+
+        :param start: Initial worker limit, 0 to disable tuning. Default is 0.
+        :type start: int
+
+        :param ceiling: Maximum worker limit. Default is 16.
+        :type ceiling: int
+
+        :param interval: Seconds between throughput samples. Default is 2.0.
+        :type interval: float
+        """
+        self.cond = threading.Condition()
+        self.auto = False
+        self.reset(start, ceiling, interval)
+
+    def reset(self, start=0, ceiling=16, interval=2.0):
+        """
+        Start tuning from a given worker limit.
+
+        :param start: Initial worker limit, 0 to disable tuning. Default is 0.
+        :type start: int
+
+        :param ceiling: Maximum worker limit. Default is 16.
+        :type ceiling: int
+
+        :param interval: Seconds between throughput samples. Default is 2.0.
+        :type interval: float
+        """
+        with self.cond:
+            self.ceiling = ceiling
+            self.limit = min(start, ceiling)
+            self.best = self.limit
+            self.interval = interval
+            self.active = 0
+            self.count = 0
+            self.errors = 0
+            self.peak = 0
+            self.growing = True
+            self.stamp = compat.perf_clock()
+
+    def acquire(self):
+        """
+        Wait for a free worker slot.
+        """
+        with self.cond:
+            while self.limit and self.active >= self.limit:
+                self.cond.wait()
+            self.active += 1
+
+    def release(self):
+        """
+        Give back a worker slot.
+        """
+        with self.cond:
+            self.active -= 1
+            self.cond.notify_all()
+
+    def tally(self, amount):
+        """
+        Count downloaded bytes, adjusting limit once per interval.
+
+        :param amount: Bytes downloaded.
+        :type amount: int
+        """
+        if not self.limit:
+            return
+        with self.cond:
+            self.count += amount
+            now = compat.perf_clock()
+            if now - self.stamp >= self.interval:
+                self.adjust(self.count / (now - self.stamp))
+                self.count = 0
+                self.stamp = now
+
+    def error(self):
+        """
+        Count a failed download.
+        """
+        if self.limit:
+            with self.cond:
+                self.errors += 1
+
+    def adjust(self, rate):
+        """
+        Change worker limit based on the last throughput sample. Call with condition held.
+
+        :param rate: Throughput, in bytes per second.
+        :type rate: float
+        """
+        if self.errors:
+            self.errors = 0
+            self.growing = False
+            self.limit = max(1, self.limit - 1)
+            self.best = min(self.best, self.limit)
+        elif rate > self.peak * TUNE_GAIN:
+            self.peak = rate
+            self.best = self.limit
+            if self.growing:
+                self.limit = min(self.ceiling, self.limit + 1)
+        else:
+            self.growing = False
+            self.limit = self.best
+        self.cond.notify_all()
+
+
+#: Download read size, in bytes.
+DOWNLOAD_CHUNK = 64 * 1024
+#: Smallest byte range worth downloading on its own.
+RANGE_MINIMUM = 16 * 1024 * 1024
+#: Segment size for downloading from several mirrors.
+MIRROR_SEGMENT = 8 * 1024 * 1024
+#: Shared download bandwidth limiter.
+BANDWIDTH = TokenBucket()
+#: Throughput must beat the previous peak by this factor to keep adding workers.
+TUNE_GAIN = 1.05
+#: Most workers automatic tuning will use.
+TUNE_CEILING = 16
+#: Shared download worker tuner.
+TUNER = WorkerTuner()
+#: Shared download progress and telemetry.
+MONITOR = utilities.TransferMonitor()
+
+
+def set_bandwidth(rate=0):
+    """
+    Limit download bandwidth, across all download threads.
+
+    :param rate: Bytes per second, 0 for unlimited. Default is 0.
+    :type rate: int
+    """
+    BANDWIDTH.set_rate(rate)
+
+
+def bandwidth_config_loader(homepath=None):
+    """
+    Read a ConfigParser file to get bandwidth limit, with the same k/M/G suffixes as the command line.
+
+    :param homepath: Folder containing ini file. Default is user directory.
+    :type homepath: str
+    """
+    netini = iniconfig.generic_loader("network", homepath)
+    rate = argutils.bandwidth_rate(netini.get("bandwidth", fallback="0"))
+    return rate
+
+
+def bandwidth_config_writer(rate=None, homepath=None):
+    """
+    Write a ConfigParser file to store bandwidth limit.
+
+    :param rate: Bytes per second, 0 for unlimited.
+    :type rate: int
+
+    :param homepath: Folder containing ini file. Default is user directory.
+    :type homepath: str
+    """
+    rate = bandwidth_config_loader(homepath) if rate is None else rate
+    results = {"bandwidth": rate}
+    iniconfig.generic_writer("network", results, homepath)
+
+
+def bandwidth_setup(rate=None):
+    """
+    Apply download bandwidth limit from arguments, or from ini file if not given.
+
+    :param rate: Bytes per second, 0 for unlimited. Default is taken from ini file.
+    :type rate: int
+    """
+    if rate is None:
+        rate = bandwidth_config_loader()
+        bandwidth_config_writer(rate)
+    set_bandwidth(rate)
+    if rate:
+        print("BANDWIDTH LIMIT: {0}/s".format(utilities.fsizer(rate)))
+
+
+def workers_config_loader(host, homepath=None):
+    """
+    Read a ConfigParser file to get last tuned worker count for a host.
+
+    :param host: Download server hostname.
+    :type host: str
+
+    :param homepath: Folder containing ini file. Default is user directory.
+    :type homepath: str
+    """
+    workini = iniconfig.generic_loader("workers", homepath)
+    count = workini.getint(host, fallback=0)
+    return count
+
+
+def workers_config_writer(host, count, homepath=None):
+    """
+    Write a ConfigParser file to store tuned worker count for a host.
+
+    :param host: Download server hostname.
+    :type host: str
+
+    :param count: Worker count.
+    :type count: int
+
+    :param homepath: Folder containing ini file. Default is user directory.
+    :type homepath: str
+    """
+    results = {host: count}
+    iniconfig.generic_writer("workers", results, homepath)
+
+
+def workers_setup(auto=False):
+    """
+    Turn automatic download worker tuning on or off.
+
+    :param auto: Whether to tune worker count from throughput. Default is false.
+    :type auto: bool
+    """
+    TUNER.auto = auto
+    if auto:
+        print("DOWNLOAD WORKERS: AUTO")
+
+
+def workers_host(urls):
+    """
+    Get the most common hostname in a list of URLs.
+
+    :param urls: URLs to download.
+    :type urls: list
+    """
+    hosts = [urllib.parse.urlparse(url).hostname or "" for url in urls]
+    return max(sorted(set(hosts)), key=hosts.count)
+
+
+def download_tally(name, amount):
+    """
+    Account for a downloaded chunk: wait on bandwidth limit, feed worker tuner and telemetry.
+
+    :param name: Filename.
+    :type name: str
+
+    :param amount: Bytes downloaded.
+    :type amount: int
+    """
+    BANDWIDTH.consume(amount)
+    TUNER.tally(amount)
+    MONITOR.update(name, amount)
+
+
+def download_failed(name):
+    """
+    Account for a failed download.
+
+    :param name: Filename.
+    :type name: str
+    """
+    TUNER.error()
+    MONITOR.fail(name)
+
+
+def cache_location(url, homepath=None):
+    """
+    Get paths of cached body and metadata for some URL.
+
+    :param url: URL to look up.
+    :type url: str
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    cachedir = os.path.join(iniconfig.config_homepath(homepath, cachepath=True), "http")
+    key = os.path.join(cachedir, hashlib.sha1(url.encode("utf-8")).hexdigest())
+    return "{0}.body".format(key), "{0}.json".format(key)
+
+
+def cache_load(url, homepath=None):
+    """
+    Get cached body and validators for some URL, or None and an empty dict.
+
+    :param url: URL to look up.
+    :type url: str
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    bodyfile, metafile = cache_location(url, homepath)
+    try:
+        with open(metafile, "r") as afile:
+            meta = json.load(afile)
+        with open(bodyfile, "rb") as afile:
+            body = afile.read()
+    except (OSError, IOError, ValueError):
+        return None, {}
+    return body, meta
+
+
+def cache_store(url, body, meta, homepath=None):
+    """
+    Cache body and validators for some URL.
+
+    :param url: URL to store.
+    :type url: str
+
+    :param body: Response body.
+    :type body: bytes
+
+    :param meta: Validators: {"etag": str, "modified": str}.
+    :type meta: dict(str: str)
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    bodyfile, metafile = cache_location(url, homepath)
+    os.makedirs(os.path.dirname(bodyfile), exist_ok=True)
+    with open(bodyfile, "wb") as afile:
+        afile.write(body)
+    with open(metafile, "w") as afile:
+        json.dump(dict(meta, url=url), afile)
+
+
+def cached_get(url, session=None, homepath=None):
+    """
+    GET some URL, revalidating cached copy with ETag/Last-Modified. Return body.
+    Responses without validators aren't cached.
+
+    :param url: URL to get.
+    :type url: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    session = generic_session(session)
+    body, meta = cache_load(url, homepath)
+    headers = {}
+    if body is not None and meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if body is not None and meta.get("modified"):
+        headers["If-Modified-Since"] = meta["modified"]
+    req = session.get(url, headers=headers)
+    if req.status_code == 304 and body is not None:  # 304 Not Modified
+        return body
+    newmeta = {"etag": req.headers.get("etag"), "modified": req.headers.get("last-modified")}
+    if req.status_code == 200 and any(newmeta.values()):
+        cache_store(url, req.content, newmeta, homepath)
+    return req.content
+
+
 def generic_session(session=None, uagent_type=None):
     """
     Create a Requests session object on the fly, if need be.
@@ -87,112 +656,477 @@ def generic_session(session=None, uagent_type=None):
     return sess
 
 
-def generic_soup_parser(url, session=None):
+def generic_soup_parser(url, session=None):
+    """
+    Get a BeautifulSoup HTML parser for some URL.
+
+    :param url: The URL to check.
+    :type url: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    session = generic_session(session)
+    req = session.get(url)
+    soup = BeautifulSoup(req.content, "html.parser")
+    return soup
+
+
+@pem_wrapper
+@singleflight
+def get_length(url, session=None):
+    """
+    Get content-length header from some URL.
+
+    :param url: The URL to check.
+    :type url: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    session = generic_session(session)
+    if url is None:
+        return 0
+    try:
+        heads = session.head(url)
+        fsize = heads.headers['content-length']
+        return int(fsize)
+    except requests.ConnectionError:
+        return 0
+
+
+@pem_wrapper
+@singleflight
+def get_head_info(url, session=None):
+    """
+    Get content-length header and byte range support from some URL.
+
+    :param url: The URL to check.
+    :type url: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    session = generic_session(session)
+    try:
+        heads = session.head(url)
+    except requests.ConnectionError:
+        return 0, False
+    if heads.status_code != 200:
+        return 0, False
+    fsize = int(heads.headers.get("content-length", 0))
+    ranged = heads.headers.get("accept-ranges", "").lower() == "bytes"
+    return fsize, ranged
+
+
+@pem_wrapper
+def download(url, output_directory=None, session=None):
+    """
+    Download file from given URL.
+
+    :param url: URL to download from.
+    :type url: str
+
+    :param output_directory: Download folder. Default is local.
+    :type output_directory: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    session = generic_session(session)
+    output_directory = utilities.dirhandler(output_directory, os.getcwd())
+    lfname = url.split('/')[-1]
+    sname = utilities.stripper(lfname)
+    fname = os.path.join(output_directory, lfname)
+    download_writer(url, fname, lfname, sname, session)
+    remove_empty_download(fname)
+
+
+def remove_empty_download(fname):
+    """
+    Remove file if it's empty.
+
+    :param fname: File path.
+    :type fname: str
+    """
+    if os.stat(fname).st_size == 0:
+        os.remove(fname)
+
+
+def download_writer(url, fname, lfname, sname, session=None):
+    """
+    Download file and write to disk.
+
+    :param url: URL to download from.
+    :type url: str
+
+    :param fname: File path.
+    :type fname: str
+
+    :param lfname: Long filename.
+    :type lfname: str
+
+    :param sname: Short name, for printing to screen.
+    :type sname: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    with open(fname, "wb") as file:
+        req = session.get(url, stream=True)
+        clength = req.headers['content-length']
+        fsize = utilities.fsizer(clength)
+        if req.status_code == 200:  # 200 OK
+            print("DOWNLOADING {0} [{1}]".format(sname, fsize))
+            for chunk in req.iter_content(chunk_size=DOWNLOAD_CHUNK):
+                download_tally(lfname, len(chunk))
+                file.write(chunk)
+        else:
+            download_failed(lfname)
+            print("ERROR: HTTP {0} IN {1}".format(req.status_code, lfname))
+
+
+@pem_wrapper
+def download_range(url, start, end, output_directory=None, session=None, lfname=None):
+    """
+    Download byte range of file from given URL, into a preallocated file. Return whether it worked.
+
+    :param url: URL to download from.
+    :type url: str
+
+    :param start: First byte of range.
+    :type start: int
+
+    :param end: Last byte of range, inclusive.
+    :type end: int
+
+    :param output_directory: Download folder. Default is local.
+    :type output_directory: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+
+    :param lfname: Filename to write to. Default is taken from URL.
+    :type lfname: str
+    """
+    session = generic_session(session)
+    output_directory = utilities.dirhandler(output_directory, os.getcwd())
+    lfname = url.split('/')[-1] if lfname is None else lfname
+    fname = os.path.join(output_directory, lfname)
+    req = session.get(url, headers={"Range": "bytes={0}-{1}".format(start, end)}, stream=True)
+    if req.status_code == 206:  # 206 Partial Content
+        if not start:
+            print("DOWNLOADING {0} [RANGES]".format(utilities.stripper(lfname)))
+        with open(fname, "r+b") as file:
+            file.seek(start)
+            for chunk in req.iter_content(chunk_size=DOWNLOAD_CHUNK):
+                download_tally(lfname, len(chunk))
+                file.write(chunk)
+        return True
+    download_failed(lfname)
+    print("ERROR: HTTP {0} IN {1}".format(req.status_code, lfname))
+    return False
+
+
+def download_prealloc(url, fsize, output_directory=None):
+    """
+    Create full-size file for ranged downloads to write into.
+
+    :param url: URL to download from.
+    :type url: str
+
+    :param fsize: File size.
+    :type fsize: int
+
+    :param output_directory: Download folder. Default is local.
+    :type output_directory: str
+    """
+    output_directory = utilities.dirhandler(output_directory, os.getcwd())
+    fname = os.path.join(output_directory, url.split('/')[-1])
+    with open(fname, "wb") as file:
+        file.truncate(fsize)
+
+
+def download_split(url, fsize, target):
+    """
+    Split a file into byte range jobs of roughly target size.
+
+    :param url: URL to download from.
+    :type url: str
+
+    :param fsize: File size.
+    :type fsize: int
+
+    :param target: Desired range size.
+    :type target: int
+    """
+    count = max(1, min(fsize // RANGE_MINIMUM, -(-fsize // target)))
+    step = -(-fsize // count)
+    jobs = [(url, start, min(start + step, fsize) - 1, min(step, fsize - start)) for start in range(0, fsize, step)]
+    return jobs
+
+
+def download_mirror_worker(url, segments, lock, lfname, output_directory=None, session=None):
+    """
+    Download segments from one mirror until none are left or the mirror fails.
+    Return bytes downloaded and whether the mirror is still good.
+
+    :param url: Mirror URL.
+    :type url: str
+
+    :param segments: Shared stack of (first byte, last byte) segments left to download.
+    :type segments: list(tuple(int))
+
+    :param lock: Lock for segment stack.
+    :type lock: threading.Lock
+
+    :param lfname: Filename to write to.
+    :type lfname: str
+
+    :param output_directory: Download folder. Default is local.
+    :type output_directory: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    done = 0
+    while True:
+        with lock:
+            if not segments:
+                return done, True
+            start, end = segments.pop()
+        try:
+            good = download_range(url, start, end, output_directory, session, lfname)
+        except requests.RequestException:
+            good = False
+        if not good:
+            with lock:
+                segments.append((start, end))
+            return done, False
+        done += end - start + 1
+
+
+def download_mirrored(urls, fsize, lfname=None, output_directory=None, session=None, segment=MIRROR_SEGMENT):
+    """
+    Download one file from several mirrors at once, in segments.
+    Each mirror takes the next segment when it finishes one, so faster mirrors do more of the work.
+    Failing mirrors are dropped, and their segments retried elsewhere.
+    Return {mirror: bytes downloaded} and whether every segment was downloaded.
+
+    :param urls: Mirror URLs for the same file.
+    :type urls: list(str)
+
+    :param fsize: File size.
+    :type fsize: int
+
+    :param lfname: Filename to write to. Default is taken from first URL.
+    :type lfname: str
+
+    :param output_directory: Download folder. Default is local.
+    :type output_directory: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+
+    :param segment: Segment size, in bytes. Default is 8MB.
+    :type segment: int
+    """
+    session = generic_session(session)
+    lfname = urls[0].split('/')[-1] if lfname is None else lfname
+    download_prealloc(lfname, fsize, output_directory)
+    segments = [(start, min(start + segment, fsize) - 1) for start in range(0, fsize, segment)][::-1]
+    lock = threading.Lock()
+    stats = {url: 0 for url in urls}
+    alive = list(stats)
+    while segments and alive:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(alive)) as xec:
+            futures = [(url, xec.submit(download_mirror_worker, url, segments, lock, lfname, output_directory, session)) for url in alive]
+        for url, future in futures:
+            done, good = future.result()
+            stats[url] += done
+            if not good:
+                alive.remove(url)
+    return stats, not segments
+
+
+def download_plan(urls, workers, xec, session=None):
+    """
+    Get file sizes with one concurrent HEAD round, then make jobs, largest first.
+    Files bigger than a fair share of the total are split into ranges, if the server allows.
+    Jobs are (url, first byte, last byte, size); bytes are None for whole files.
+
+    :param urls: URLs to download.
+    :type urls: list
+
+    :param workers: Number of workers.
+    :type workers: int
+
+    :param xec: ThreadPoolExecutor instance.
+    :type xec: concurrent.futures.ThreadPoolExecutor
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    heads = [(url, xec.submit(get_head_info, url, session)) for url in urls]
+    infos = [(url, head.result()) for url, head in heads]
+    share = -(-sum(info[0] for url, info in infos) // max(workers, 1))
+    jobs = []
+    for url, (fsize, ranged) in infos:
+        if ranged and workers > 1 and fsize > share and fsize >= 2 * RANGE_MINIMUM:
+            jobs.extend(download_split(url, fsize, share))
+        else:
+            jobs.append((url, None, None, fsize))
+    jobs.sort(key=lambda job: job[3], reverse=True)
+    return jobs
+
+
+def download_makespan(jobs, workers):
+    """
+    Get bytes on busiest worker, if jobs are handed out in order to whoever is idle.
+
+    :param jobs: Download jobs, see :func:`download_plan`.
+    :type jobs: list(tuple)
+
+    :param workers: Number of workers.
+    :type workers: int
+    """
+    loads = [0] * max(workers, 1)
+    for job in jobs:
+        loads[loads.index(min(loads))] += job[3]
+    return max(loads)
+
+
+def download_job(job, outdir=None, session=None):
+    """
+    Download a whole file or a byte range of it. Return whether it worked.
+    Failed ranges are reported, not raised, so the whole file can be fetched instead.
+
+    :param job: Download job, see :func:`download_plan`.
+    :type job: tuple
+
+    :param outdir: Download folder. Default is local.
+    :type outdir: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    url, start, end, fsize = job
+    TUNER.acquire()
+    try:
+        if start is None:
+            download(url, outdir, session)
+            good = True
+        else:
+            try:
+                good = download_range(url, start, end, outdir, session)
+            except requests.RequestException:
+                download_failed(url.split('/')[-1])
+                good = False
+    finally:
+        TUNER.release()
+    return good
+
+
+def download_schedule(jobs, outdir, xec, session=None):
     """
-    Get a BeautifulSoup HTML parser for some URL.
+    Submit jobs in order, so idle workers always take the largest one left.
 
-    :param url: The URL to check.
-    :type url: str
+    :param jobs: Download jobs, see :func:`download_plan`.
+    :type jobs: list(tuple)
+
+    :param outdir: Download folder. Default is local.
+    :type outdir: str
+
+    :param xec: ThreadPoolExecutor instance.
+    :type xec: concurrent.futures.ThreadPoolExecutor
 
     :param session: Requests session object, default is created on the fly.
     :type session: requests.Session()
     """
-    session = generic_session(session)
-    req = session.get(url)
-    soup = BeautifulSoup(req.content, "html.parser")
-    return soup
+    for url in {job[0] for job in jobs}:
+        fsize = sum(job[3] for job in jobs if job[0] == url)
+        MONITOR.begin(url.split('/')[-1], fsize)
+        if any(job[1] is not None for job in jobs if job[0] == url):
+            download_prealloc(url, fsize, outdir)
+    return [xec.submit(download_job, job, outdir, session) for job in jobs]
 
 
-@pem_wrapper
-def get_length(url, session=None):
+def download_settle(jobs, futures, outdir, xec, session=None):
     """
-    Get content-length header from some URL.
+    Wait for scheduled jobs, raising any of their exceptions.
+    Files with a failed byte range are deleted and downloaded whole instead.
+    Return URLs that had to be downloaded again.
 
-    :param url: The URL to check.
-    :type url: str
+    :param jobs: Download jobs, see :func:`download_plan`.
+    :type jobs: list(tuple)
+
+    :param futures: Futures for jobs, from :func:`download_schedule`.
+    :type futures: list(concurrent.futures.Future)
+
+    :param outdir: Download folder. Default is local.
+    :type outdir: str
+
+    :param xec: ThreadPoolExecutor instance.
+    :type xec: concurrent.futures.ThreadPoolExecutor
 
     :param session: Requests session object, default is created on the fly.
     :type session: requests.Session()
     """
-    session = generic_session(session)
-    if url is None:
-        return 0
-    try:
-        heads = session.head(url)
-        fsize = heads.headers['content-length']
-        return int(fsize)
-    except requests.ConnectionError:
-        return 0
+    failed = sorted({job[0] for job, future in zip(jobs, futures) if not future.result()})
+    retries = [xec.submit(download_retry, url, sum(job[3] for job in jobs if job[0] == url), outdir, session) for url in failed]
+    for retry in retries:
+        retry.result()
+    return failed
 
 
-@pem_wrapper
-def download(url, output_directory=None, session=None):
+def download_retry(url, fsize, outdir=None, session=None):
     """
-    Download file from given URL.
+    Delete a partly downloaded file and download it whole.
 
     :param url: URL to download from.
     :type url: str
 
-    :param output_directory: Download folder. Default is local.
-    :type output_directory: str
+    :param fsize: File size.
+    :type fsize: int
+
+    :param outdir: Download folder. Default is local.
+    :type outdir: str
 
     :param session: Requests session object, default is created on the fly.
     :type session: requests.Session()
     """
-    session = generic_session(session)
-    output_directory = utilities.dirhandler(output_directory, os.getcwd())
     lfname = url.split('/')[-1]
-    sname = utilities.stripper(lfname)
-    fname = os.path.join(output_directory, lfname)
-    download_writer(url, fname, lfname, sname, session)
-    remove_empty_download(fname)
-
-
-def remove_empty_download(fname):
-    """
-    Remove file if it's empty.
-
-    :param fname: File path.
-    :type fname: str
-    """
-    if os.stat(fname).st_size == 0:
+    fname = os.path.join(utilities.dirhandler(outdir, os.getcwd()), lfname)
+    if os.path.exists(fname):
         os.remove(fname)
+    print("RANGES FAILED, RETRYING {0}".format(utilities.stripper(lfname)))
+    MONITOR.begin(lfname, fsize)
+    download(url, outdir, session)
 
 
-def download_writer(url, fname, lfname, sname, session=None):
+def download_report(jobs, workers, elapsed):
     """
-    Download file and write to disk.
-
-    :param url: URL to download from.
-    :type url: str
-
-    :param fname: File path.
-    :type fname: str
+    Print planned and actual makespan of a download run.
 
-    :param lfname: Long filename.
-    :type lfname: str
+    :param jobs: Download jobs, see :func:`download_plan`.
+    :type jobs: list(tuple)
 
-    :param sname: Short name, for printing to screen.
-    :type sname: str
+    :param workers: Number of workers.
+    :type workers: int
 
-    :param session: Requests session object, default is created on the fly.
-    :type session: requests.Session()
+    :param elapsed: Actual time taken, in seconds.
+    :type elapsed: float
     """
-    with open(fname, "wb") as file:
-        req = session.get(url, stream=True)
-        clength = req.headers['content-length']
-        fsize = utilities.fsizer(clength)
-        if req.status_code == 200:  # 200 OK
-            print("DOWNLOADING {0} [{1}]".format(sname, fsize))
-            for chunk in req.iter_content(chunk_size=1024):
-                file.write(chunk)
-        else:
-            print("ERROR: HTTP {0} IN {1}".format(req.status_code, lfname))
+    total = sum(job[3] for job in jobs)
+    planned = download_makespan(jobs, workers)
+    rate = total / elapsed if elapsed else 0
+    print("PLANNED MAKESPAN: {0} ON BUSIEST WORKER, {1} TOTAL".format(utilities.fsizer(planned), utilities.fsizer(total)))
+    print("ACTUAL MAKESPAN: {0:.2f}s ({1}/s)".format(elapsed, utilities.fsizer(rate)))
 
 
 def download_bootstrap(urls, outdir=None, workers=5, session=None):
     """
-    Run downloaders for each file in given URL iterable.
+    Run downloaders for each file in given URL iterable, largest first.
 
     :param urls: URLs to download.
     :type urls: list
@@ -200,25 +1134,39 @@ def download_bootstrap(urls, outdir=None, workers=5, session=None):
     :param outdir: Download folder. Default is handled in :func:`download`.
     :type outdir: str
 
-    :param workers: Number of worker processes. Default is 5.
+    :param workers: Number of worker processes. Default is 5. If tuning is on, only used for new hosts.
     :type workers: int
 
     :param session: Requests session object, default is created on the fly.
     :type session: requests.Session()
     """
-    workers = len(urls) if len(urls) < workers else workers
-    spinman = utilities.SpinManager()
+    tuned = TUNER.auto
+    if tuned:
+        host = workers_host(urls)
+        TUNER.reset(workers_config_loader(host) or workers, TUNE_CEILING)
+        workers = TUNE_CEILING
+    jobs = None
     with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as xec:
         try:
-            spinman.start()
-            for url in urls:
-                xec.submit(download, url, outdir, session)
+            MONITOR.reset()
+            MONITOR.start()
+            jobs = download_plan(urls, workers, xec, session)
+            starttime = compat.perf_clock()
+            futures = download_schedule(jobs, outdir, xec, session)
+            download_settle(jobs, futures, outdir, xec, session)
         except (KeyboardInterrupt, SystemExit):
             xec.shutdown()
-            spinman.stop()
-    spinman.stop()
-    utilities.spinner_clear()
-    utilities.line_begin()
+            jobs = None
+        finally:
+            MONITOR.stop()
+    if tuned:
+        workers = TUNER.best
+        TUNER.reset()
+    if jobs:
+        download_report(jobs, workers, compat.perf_clock() - starttime)
+        if tuned:
+            workers_config_writer(host, workers)
+            print("DOWNLOAD WORKERS: {0} FOR {1}".format(workers, host))
 
 
 def download_android_tools(downloaddir=None):
@@ -241,6 +1189,7 @@ def download_android_tools(downloaddir=None):
 
 
 @pem_wrapper
+@singleflight
 def getcode(url, session=None):
     """
     Return status code of given URL.
@@ -276,6 +1225,218 @@ def availability(url, session=None):
     return status == 200 or 300 < status <= 308
 
 
+def sw_build_version(swversion, build):
+    """
+    Replace the build number (10.x.y.ZZZZ) of a software release.
+
+    :param swversion: Software version, 10.x.y.zzzz.
+    :type swversion: str
+
+    :param build: New build number.
+    :type build: int
+    """
+    splitsw = swversion.split(".")
+    splitsw[3] = str(build)
+    return ".".join(splitsw)
+
+
+def sw_window(start, sparsity, ceiling):
+    """
+    Return builds in the dense window starting at a given build.
+    The window is one longer than sparsity, so it always reaches the next live build.
+
+    :param start: First build of window.
+    :type start: int
+
+    :param sparsity: Maximum run of dead builds between two live ones.
+    :type sparsity: int
+
+    :param ceiling: Highest build to consider.
+    :type ceiling: int
+    """
+    return range(start, min(start + sparsity + 1, ceiling + 1))
+
+
+def sw_probe_bulk(swversion, builds, xec, cache, session=None):
+    """
+    Check availability of many builds of a software release concurrently.
+
+    :param swversion: Software version, 10.x.y.zzzz.
+    :type swversion: str
+
+    :param builds: Builds to check.
+    :type builds: list(int)
+
+    :param xec: ThreadPoolExecutor instance.
+    :type xec: concurrent.futures.ThreadPoolExecutor
+
+    :param cache: Dictionary of build: availability pairs, updated in place.
+    :type cache: dict(int: bool)
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    todo = sorted({build for build in builds if build not in cache})
+    futures = {}
+    for build in todo:
+        baseurl = utilities.create_base_url(sw_build_version(swversion, build))
+        futures[build] = xec.submit(availability, baseurl, session)
+    for build, future in futures.items():
+        cache[build] = future.result()
+    return cache
+
+
+def sw_window_live(start, sparsity, ceiling, cache):
+    """
+    Check if any build in a probed window is available.
+
+    :param start: First build of window.
+    :type start: int
+
+    :param sparsity: Maximum run of dead builds between two live ones.
+    :type sparsity: int
+
+    :param ceiling: Highest build to consider.
+    :type ceiling: int
+
+    :param cache: Dictionary of build: availability pairs.
+    :type cache: dict(int: bool)
+    """
+    return any(cache.get(build, False) for build in sw_window(start, sparsity, ceiling))
+
+
+def sw_gallop_points(floor, ceiling):
+    """
+    Generate exponentially spaced builds, starting from a floor.
+
+    :param floor: First build.
+    :type floor: int
+
+    :param ceiling: Highest build to consider.
+    :type ceiling: int
+    """
+    points = [floor]
+    step = 1
+    while floor + step <= ceiling:
+        points.append(floor + step)
+        step *= 2
+    return points
+
+
+def sw_split_points(low, high, splits):
+    """
+    Generate evenly spaced builds strictly between two builds.
+
+    :param low: Lower bound, exclusive.
+    :type low: int
+
+    :param high: Upper bound, exclusive.
+    :type high: int
+
+    :param splits: Maximum number of points to generate.
+    :type splits: int
+    """
+    points = {low + (high - low) * idx // (splits + 1) for idx in range(1, splits + 1)}
+    return sorted(point for point in points if low < point < high)
+
+
+def sw_probe_points(swversion, points, sparsity, ceiling, xec, cache, session=None):
+    """
+    Densely scan the windows at each given build, return the builds whose window is live.
+
+    :param swversion: Software version, 10.x.y.zzzz.
+    :type swversion: str
+
+    :param points: Window starting builds.
+    :type points: list(int)
+
+    :param sparsity: Maximum run of dead builds between two live ones.
+    :type sparsity: int
+
+    :param ceiling: Highest build to consider.
+    :type ceiling: int
+
+    :param xec: ThreadPoolExecutor instance.
+    :type xec: concurrent.futures.ThreadPoolExecutor
+
+    :param cache: Dictionary of build: availability pairs, updated in place.
+    :type cache: dict(int: bool)
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    builds = [build for point in points for build in sw_window(point, sparsity, ceiling)]
+    sw_probe_bulk(swversion, builds, xec, cache, session)
+    return [point for point in points if sw_window_live(point, sparsity, ceiling, cache)]
+
+
+def sw_gallop_worker(swversion, ceiling, sparsity, xec, splits=1, session=None):
+    """
+    Gallop, then bisect, to find the highest live build of a software release.
+
+    :param swversion: Software version, 10.x.y.zzzz.
+    :type swversion: str
+
+    :param ceiling: Highest build to consider.
+    :type ceiling: int
+
+    :param sparsity: Maximum run of dead builds between two live ones.
+    :type sparsity: int
+
+    :param xec: ThreadPoolExecutor instance.
+    :type xec: concurrent.futures.ThreadPoolExecutor
+
+    :param splits: Windows to scan per bisection round. Default is 1.
+    :type splits: int
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    cache = {}
+    points = sw_gallop_points(int(swversion.split(".")[3]), ceiling)
+    lives = sw_probe_points(swversion, points, sparsity, ceiling, xec, cache, session)
+    if not lives:
+        return None
+    low = max(lives)
+    high = min([point for point in points if point > low] + [ceiling + 1])
+    while high - low > sparsity:
+        mids = sw_split_points(low, high, splits)
+        lives = sw_probe_points(swversion, mids, sparsity, ceiling, xec, cache, session)
+        low = max(lives + [low])
+        high = min([mid for mid in mids if mid > low] + [high])
+    latest = max(build for build, avail in cache.items() if avail)
+    return sw_build_version(swversion, latest)
+
+
+def sw_gallop_search(swversion, ceiling=9999, sparsity=8, workers=16, session=None):
+    """
+    Find the highest available software release at or above a given one.
+    Assumes no more than sparsity consecutive dead builds between live releases.
+
+    :param swversion: Software version to start from, 10.x.y.zzzz.
+    :type swversion: str
+
+    :param ceiling: Highest build to consider. Default is 9999 (i.e. 10.x.y.9999).
+    :type ceiling: int
+
+    :param sparsity: Maximum run of dead builds between two live ones. Default is 8.
+    :type sparsity: int
+
+    :param workers: Number of worker threads. Default is 16.
+    :type workers: int
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    session = generic_session(session)
+    splits = max(1, workers // sparsity)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as xec:
+        try:
+            return sw_gallop_worker(swversion, ceiling, sparsity, xec, splits, session)
+        except KeyboardInterrupt:
+            xec.shutdown(wait=False)
+
+
 def clean_availability(results, server):
     """
     Clean availability for autolookup script.
@@ -835,6 +1996,11 @@ def table_headers(pees):
     return bolds
 
 
+#: Android autoloader pages: (name, URL).
+LOADER_PAGES = (("og", "https://ca.blackberry.com/support/smartphones/Android-OS-Reload.html"),
+                ("bbm", "https://www.blackberrymobile.com/support/reload-software/"))
+
+
 @pem_wrapper
 def loader_page_scraper(session=None):
     """
@@ -855,12 +2021,8 @@ def loader_page_scraper_og(session=None):
     :param session: Requests session object, default is created on the fly.
     :type session: requests.Session()
     """
-    url = "https://ca.blackberry.com/support/smartphones/Android-OS-Reload.html"
-    soup = generic_soup_parser(url, session)
-    tables = soup.find_all("table")
-    headers = table_headers(soup.find_all("p"))
-    for idx, table in enumerate(tables):
-        loader_page_chunker_og(idx, table, headers)
+    soup = generic_soup_parser(LOADER_PAGES[0][1], session)
+    loader_records_printer(loader_page_records_og(soup))
 
 
 def loader_page_scraper_bbm(session=None):
@@ -870,17 +2032,42 @@ def loader_page_scraper_bbm(session=None):
     :param session: Requests session object, default is created on the fly.
     :type session: requests.Session()
     """
-    url = "https://www.blackberrymobile.com/support/reload-software/"
-    soup = generic_soup_parser(url, session)
+    soup = generic_soup_parser(LOADER_PAGES[1][1], session)
+    loader_records_printer(loader_page_records_bbm(soup), False)
+
+
+def loader_page_records_og(soup):
+    """
+    Parse autoloader page, original site, into records.
+
+    :param soup: BeautifulSoup HTML parser.
+    :type soup: bs4.BeautifulSoup
+    """
+    tables = soup.find_all("table")
+    headers = table_headers(soup.find_all("p"))
+    records = []
+    for idx, table in enumerate(tables):
+        records.extend(loader_page_chunker_og(idx, table, headers))
+    return records
+
+
+def loader_page_records_bbm(soup):
+    """
+    Parse autoloader page, new site, into records.
+
+    :param soup: BeautifulSoup HTML parser.
+    :type soup: bs4.BeautifulSoup
+    """
     ulls = soup.find_all("ul", {"class": re.compile("list-two special-.")})[1:]
-    print("~~~BlackBerry KEYone~~~")
+    records = []
     for ull in ulls:
-        loader_page_chunker_bbm(ull)
+        records.extend(loader_page_chunker_bbm(ull))
+    return records
 
 
 def loader_page_chunker_og(idx, table, headers):
     """
-    Given a loader page table, chunk it into lists of table cells.
+    Given a loader page table, chunk it into records.
 
     :param idx: Index of enumerating tables.
     :type idx: int
@@ -891,36 +2078,149 @@ def loader_page_chunker_og(idx, table, headers):
     :param headers: List of table headers.
     :type headers: list(str)
     """
-    print("~~~{0}~~~".format(headers[idx]))
     chunks = chunker(table.find_all("td"), 4)
-    for chunk in chunks:
-        loader_page_printer(chunk)
-    print(" ")
+    return [loader_page_record(headers[idx], chunk) for chunk in chunks]
 
 
 def loader_page_chunker_bbm(ull):
     """
-    Given a loader page list, chunk it into lists of list items.
+    Given a loader page list, chunk it into records.
 
     :param ull: HTML unordered list tag.
     :type ull: bs4.element.Tag
     """
     chunks = chunker(ull.find_all("li"), 3)
-    for chunk in chunks:
-        loader_page_printer(chunk)
+    return [loader_page_record("BlackBerry KEYone", chunk) for chunk in chunks]
 
 
-def loader_page_printer(chunk):
+def loader_page_record(group, chunk):
     """
-    Print individual cell texts given a list of table cells.
+    Make a record out of a list of table cells.
+
+    :param group: Device family header.
+    :type group: str
 
     :param chunk: List of td tags.
     :type chunk: list(bs4.element.Tag)
     """
-    key = unicode_filter(chunk[0].text)
-    ver = unicode_filter(chunk[1].text)
-    link = unicode_filter(chunk[2].find("a")["href"])
-    print("{0}\n    {1}: {2}".format(key, ver, link))
+    record = {"group": group,
+              "device": unicode_filter(chunk[0].text),
+              "version": unicode_filter(chunk[1].text),
+              "link": unicode_filter(chunk[2].find("a")["href"])}
+    return record
+
+
+def loader_records_printer(records, spacer=True):
+    """
+    Print records, grouped by device family.
+
+    :param records: Records from :func:`loader_page_record`.
+    :type records: list(dict)
+
+    :param spacer: Whether to print a blank line after each group. Default is true.
+    :type spacer: bool
+    """
+    groups = []
+    for record in records:
+        if record["group"] not in groups:
+            groups.append(record["group"])
+    for group in groups:
+        print("~~~{0}~~~".format(group))
+        for record in records:
+            if record["group"] == group:
+                print("{0}\n    {1}: {2}".format(record["device"], record["version"], record["link"]))
+        if spacer:
+            print(" ")
+
+
+def loader_cache_location(homepath=None):
+    """
+    Get path of parsed autoloader page cache.
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    return os.path.join(iniconfig.config_homepath(homepath, cachepath=True), "loaders.json")
+
+
+def loader_cache_load(homepath=None):
+    """
+    Read parsed autoloader page cache: {page: {"digest": str, "records": list}}.
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    try:
+        with open(loader_cache_location(homepath), "r") as afile:
+            cache = json.load(afile)
+    except (OSError, IOError, ValueError):
+        cache = {}
+    return cache
+
+
+def loader_cache_store(cache, homepath=None):
+    """
+    Write parsed autoloader page cache.
+
+    :param cache: {page: {"digest": str, "records": list}}.
+    :type cache: dict
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    with open(loader_cache_location(homepath), "w") as afile:
+        json.dump(cache, afile, indent=1)
+
+
+def loader_page_fetch(name, url, cached, session=None, homepath=None):
+    """
+    Get one autoloader page and its records. Unchanged pages aren't re-parsed.
+
+    :param name: Page name, see :data:`LOADER_PAGES`.
+    :type name: str
+
+    :param url: Page URL.
+    :type url: str
+
+    :param cached: Previous cache entry for page, or empty dict.
+    :type cached: dict
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    content = cached_get(url, session, homepath)
+    digest = hashlib.sha1(content).hexdigest()
+    if cached.get("digest") == digest:
+        return cached
+    soup = BeautifulSoup(content, "html.parser")
+    records = loader_page_records_og(soup) if name == "og" else loader_page_records_bbm(soup)
+    return {"digest": digest, "records": records}
+
+
+@pem_wrapper
+def loader_page_bootstrap(session=None, homepath=None):
+    """
+    Get all autoloader pages in parallel. Return all records and records with links not seen last time.
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    session = generic_session(session)
+    cache = loader_cache_load(homepath)
+    oldlinks = {record["link"] for entry in cache.values() for record in entry["records"]}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(LOADER_PAGES)) as xec:
+        pages = [(name, xec.submit(loader_page_fetch, name, url, cache.get(name, {}), session, homepath)) for name, url in LOADER_PAGES]
+    newcache = {name: page.result() for name, page in pages}
+    loader_cache_store(newcache, homepath)
+    records = [record for name, _ in LOADER_PAGES for record in newcache[name]["records"]]
+    fresh = [record for record in records if record["link"] not in oldlinks]
+    return records, fresh
 
 
 @pem_wrapper
@@ -934,9 +2234,7 @@ def base_metadata(url, session=None):
     :param session: Requests session object, default is created on the fly.
     :type session: requests.Session()
     """
-    session = generic_session(session)
-    req = session.get(url)
-    data = req.content
+    data = cached_get(url, session)
     entries = data.split(b"\n")
     metadata = [entry.split(b",")[1].decode("utf-8") for entry in entries if entry]
     return metadata
@@ -963,6 +2261,17 @@ def ndk_metadata(session=None):
     """
     ndkurl = base_metadata_url()
     data = base_metadata(ndkurl, session)
+    metadata = ndk_filter(data)
+    return metadata
+
+
+def ndk_filter(data):
+    """
+    Filter BBNDK target metadata to target versions.
+
+    :param data: Metadata from the main feed.
+    :type data: list(str)
+    """
     metadata = [entry for entry in data if entry.startswith(("10.0", "10.1", "10.2"))]
     return metadata
 
@@ -991,6 +2300,25 @@ def runtime_metadata(session=None):
     return metadata
 
 
+def metadata_bootstrap(alternates=(None, "simulator", "runtime"), session=None):
+    """
+    Get BBNDK metadata feeds concurrently. Return {alternate: metadata}.
+
+    :param alternates: Feeds to check, see :func:`base_metadata_url`. Default is all of them.
+    :type alternates: tuple(str)
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    session = generic_session(session)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(alternates)) as xec:
+        feeds = {alt: xec.submit(base_metadata, base_metadata_url(alt), session) for alt in alternates}
+    results = {alt: feed.result() for alt, feed in feeds.items()}
+    if None in results:
+        results[None] = ndk_filter(results[None])
+    return results
+
+
 def series_generator(osversion):
     """
     Generate series/branch name from OS version.
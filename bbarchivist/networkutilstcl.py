@@ -4,11 +4,18 @@
 import base64  # encoding
 import binascii  # encoding
 import hashlib  # salt
+import json  # remote cache
+import os  # cache path
 import random  # salt
+import threading  # connection limits
 import time  # salt
+import urllib.parse  # hostnames
+import weakref  # sticky sessions
 import zlib  # encoding
 
 import requests  # downloading
+from bbarchivist import compat  # clock
+from bbarchivist import iniconfig  # cache directory
 from bbarchivist import networkutils  # network tools
 from bbarchivist import xmlutilstcl  # xml work
 from bbarchivist.bbconstants import TCLMASTERS  # lookup servers
@@ -17,12 +24,198 @@ __author__ = "Thurask"
 __license__ = "WTFPL v2"
 __copyright__ = "2018-2019 Thurask"
 
+#: Seconds the remote OTA version list is fresh for.
+REMOTE_TTL = 3600
+#: Most simultaneous requests to any one master server.
+MASTER_CONNECTIONS = 4
+#: Request slots for each master server.
+MASTER_SLOTS = {}
+MASTER_LOCK = threading.Lock()
 
-def tcl_master():
+
+def master_slot(url):
+    """
+    Get request slot semaphore for the server in some URL.
+
+    :param url: Request URL.
+    :type url: str
+    """
+    host = urllib.parse.urlparse(url).hostname
+    with MASTER_LOCK:
+        if host not in MASTER_SLOTS:
+            MASTER_SLOTS[host] = threading.BoundedSemaphore(MASTER_CONNECTIONS)
+        slot = MASTER_SLOTS[host]
+    return slot
+
+
+def tcl_scan_session():
+    """
+    Get a session that keeps enough connections alive for concurrent master requests.
+    """
+    sess = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=len(TCLMASTERS), pool_maxsize=MASTER_CONNECTIONS)
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+
+class MasterPicker(object):
+    """
+    Pick master servers by health: sticky per session, ranked by latency and errors.
+    Demoted masters get one trial request per re-probe interval.
     """
-    Get a random master server.
+
+    def __init__(self, masters=TCLMASTERS, reprobe=60.0, alpha=0.3):
+        """
+        Prepare lock and per-master stats.
+
+        :param masters: Master servers. Default is bbconstants.TCLMASTERS.
+        :type masters: tuple(str)
+
+        :param reprobe: Seconds before a demoted master is tried again. Default is 60.
+        :type reprobe: float
+
+        :param alpha: Weight of newest latency sample in moving average. Default is 0.3.
+        :type alpha: float
+        """
+        self.lock = threading.Lock()
+        self.masters = tuple(masters)
+        self.reprobe = reprobe
+        self.alpha = alpha
+        self.stats = {host: {"latency": 0.0, "errors": 0.0, "failed": 0.0, "inflight": 0} for host in self.masters}
+        self.sticky = weakref.WeakKeyDictionary()
+
+    def healthy(self, host):
+        """
+        Check if master isn't demoted.
+
+        :param host: Master server.
+        :type host: str
+        """
+        return self.stats[host]["errors"] < 1
+
+    def score(self, host):
+        """
+        Rank master: lower is better. Unmeasured masters rank first, so they get measured.
+
+        :param host: Master server.
+        :type host: str
+        """
+        stat = self.stats[host]
+        return stat["latency"] * (1 + stat["errors"])
+
+    def best(self):
+        """
+        Get healthiest master with free connection slots. Call with lock held.
+        """
+        hosts = [host for host in self.masters if self.healthy(host)] or list(self.masters)
+        free = [host for host in hosts if self.stats[host]["inflight"] < MASTER_CONNECTIONS] or hosts
+        return min(free, key=lambda host: (self.score(host), random.random()))
+
+    def probe(self):
+        """
+        Get a demoted master due for re-probing, if any, and reset its timer. Call with lock held.
+        """
+        now = compat.perf_clock()
+        for host in self.masters:
+            stat = self.stats[host]
+            if not self.healthy(host) and now - stat["failed"] >= self.reprobe:
+                stat["failed"] = now
+                return host
+        return None
+
+    def pick(self, session=None):
+        """
+        Get master for a request. Sessions keep their master while it's healthy and not saturated.
+
+        :param session: Requests session object, None to skip stickiness.
+        :type session: requests.Session()
+        """
+        with self.lock:
+            host = self.probe()
+            if host is not None:
+                return host
+            host = self.sticky.get(session) if session is not None else None
+            if host is not None and self.healthy(host) and self.stats[host]["inflight"] < MASTER_CONNECTIONS:
+                return host
+            host = self.best()
+            if session is not None and not (session in self.sticky and self.healthy(self.sticky[session])):
+                self.sticky[session] = host
+            return host
+
+    def begin(self, host):
+        """
+        Count request as in flight.
+
+        :param host: Master server.
+        :type host: str
+        """
+        with self.lock:
+            if host in self.stats:
+                self.stats[host]["inflight"] += 1
+
+    def end(self, host, latency=None, error=False):
+        """
+        Record request outcome.
+
+        :param host: Master server.
+        :type host: str
+
+        :param latency: Seconds taken, None if unknown. Default is None.
+        :type latency: float
+
+        :param error: Whether request failed. Default is False.
+        :type error: bool
+        """
+        with self.lock:
+            if host not in self.stats:
+                return
+            stat = self.stats[host]
+            stat["inflight"] -= 1
+            if error:
+                stat["errors"] += 1
+                stat["failed"] = compat.perf_clock()
+            else:
+                stat["errors"] /= 2
+            if latency is not None:
+                stat["latency"] = latency if not stat["latency"] else self.alpha * latency + (1 - self.alpha) * stat["latency"]
+
+
+#: Shared master server picker.
+MASTERS = MasterPicker()
+
+
+def master_request(method, url, **kwargs):
     """
-    return random.choice(TCLMASTERS)
+    Make request to a master server, within its connection limit, recording latency and errors.
+
+    :param method: Session method, e.g. session.get.
+    :type method: function
+
+    :param url: Request URL.
+    :type url: str
+    """
+    host = urllib.parse.urlparse(url).hostname
+    MASTERS.begin(host)
+    start = compat.perf_clock()
+    try:
+        with master_slot(url):
+            req = method(url, **kwargs)
+    except requests.exceptions.RequestException:
+        MASTERS.end(host, error=True)
+        raise
+    MASTERS.end(host, compat.perf_clock() - start, req.status_code >= 500)
+    return req
+
+
+def tcl_master(session=None):
+    """
+    Get the best master server, keeping the same one per session where possible.
+
+    :param session: Requests session object, None to skip stickiness.
+    :type session: requests.Session()
+    """
+    return MASTERS.pick(session)
 
 
 def tcl_default_id(devid):
@@ -37,7 +230,7 @@ def tcl_default_id(devid):
     return devid
 
 
-def check_prep(curef, mode=4, fvver="AAA000", cltp=2010, cktp=2, rtd=1, chnl=2, devid=None):
+def check_prep(curef, mode=4, fvver="AAA000", cltp=2010, cktp=2, rtd=1, chnl=2, devid=None, session=None):
     """
     Prepare variables for TCL update check.
 
@@ -64,9 +257,12 @@ def check_prep(curef, mode=4, fvver="AAA000", cltp=2010, cktp=2, rtd=1, chnl=2,
 
     :param devid: Serial number/IMEI. Default is fake, not that it matters.
     :type devid: str
+
+    :param session: Requests session object, to keep the same master. Default is None.
+    :type session: requests.Session()
     """
     devid = tcl_default_id(devid)
-    geturl = "http://{0}/check.php".format(tcl_master())
+    geturl = "http://{0}/check.php".format(tcl_master(session))
     params = {"id": devid, "curef": curef, "fv": fvver, "mode": mode, "type": "Firmware", "cltp": cltp, "cktp": cktp, "rtd": rtd, "chnl": chnl}
     return geturl, params
 
@@ -93,8 +289,8 @@ def tcl_check(curef, session=None, mode=4, fvver="AAA000", export=False):
     :type export: bool
     """
     sess = networkutils.generic_session(session)
-    geturl, params = check_prep(curef, mode, fvver)
-    req = sess.get(geturl, params=params)
+    geturl, params = check_prep(curef, mode, fvver, session=sess)
+    req = master_request(sess.get, geturl, params=params)
     if req.status_code == 200:
         req.encoding = "utf-8"
         response = req.text
@@ -160,7 +356,7 @@ def vkhash(curef, tvver, fwid, salt, mode=4, fvver="AAA000", cltp=2010, devid=No
     return engine.hexdigest()
 
 
-def download_request_prep(curef, tvver, fwid, salt, vkh, mode=4, fvver="AAA000", cltp=2010, devid=None):
+def download_request_prep(curef, tvver, fwid, salt, vkh, mode=4, fvver="AAA000", cltp=2010, devid=None, session=None):
     """
     Prepare variables for download server check.
 
@@ -190,9 +386,12 @@ def download_request_prep(curef, tvver, fwid, salt, vkh, mode=4, fvver="AAA000",
 
     :param devid: Serial number/IMEI. Default is fake, not that it matters.
     :type devid: str
+
+    :param session: Requests session object, to keep the same master. Default is None.
+    :type session: requests.Session()
     """
     devid = tcl_default_id(devid)
-    posturl = "http://{0}/download_request.php".format(tcl_master())
+    posturl = "http://{0}/download_request.php".format(tcl_master(session))
     params = {"id": devid, "curef": curef, "fv": fvver, "mode": mode, "type": "Firmware", "tv": tvver, "fw_id": fwid, "salt": salt, "vk": vkh, "cltp": cltp}
     if mode == 4:
         params["foot"] = 1
@@ -233,8 +432,8 @@ def tcl_download_request(curef, tvver, fwid, salt, vkh, session=None, mode=4, fv
     :type export: bool
     """
     sess = networkutils.generic_session(session)
-    posturl, params = download_request_prep(curef, tvver, fwid, salt, vkh, mode, fvver)
-    req = sess.post(posturl, data=params)
+    posturl, params = download_request_prep(curef, tvver, fwid, salt, vkh, mode, fvver, session=sess)
+    req = master_request(sess.post, posturl, data=params)
     if req.status_code == 200:
         req.encoding = "utf-8"
         response = req.text
@@ -287,13 +486,67 @@ def encrypt_header(address, encslave, session=None):
     return sentinel
 
 
+def remote_prd_location(homepath=None):
+    """
+    Get path of parsed remote OTA version cache.
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    return os.path.join(iniconfig.config_homepath(homepath, cachepath=True), "remote_prd.json")
+
+
+def remote_prd_load(homepath=None):
+    """
+    Read parsed remote OTA version cache: {"stamp": float, "digest": str, "map": dict}.
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    try:
+        with open(remote_prd_location(homepath), "r") as afile:
+            cache = json.load(afile)
+    except (OSError, IOError, ValueError):
+        cache = {}
+    return cache
+
+
+def remote_prd_store(cache, homepath=None):
+    """
+    Write parsed remote OTA version cache.
+
+    :param cache: {"stamp": float, "digest": str, "map": dict}.
+    :type cache: dict
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
+    """
+    with open(remote_prd_location(homepath), "w") as afile:
+        json.dump(cache, afile, separators=(",", ":"))
+
+
 @networkutils.pem_wrapper
-def remote_prd_info():
+def remote_prd_info(ttl=REMOTE_TTL, homepath=None):
     """
     Get list of remote OTA versions.
+    The parsed list is cached; within the TTL it's used as is, after that the document is revalidated.
+
+    :param ttl: Seconds the cached list is fresh for, 0 to always revalidate. Default is 1 hour.
+    :type ttl: int
+
+    :param homepath: Cache folder. Default is user cache directory.
+    :type homepath: str
     """
+    cache = remote_prd_load(homepath)
+    if "map" in cache and time.time() - cache.get("stamp", 0) < ttl:
+        return cache["map"]
     dburl = "https://tclota.birth-online.de/json_lastupdates.php"
-    req = requests.get(dburl)
-    reqj = req.json()
-    otadict = {val["curef"]: val["last_ota"] for val in reqj.values() if val["last_ota"] is not None}
+    body = networkutils.cached_get(dburl, homepath=homepath)
+    digest = hashlib.sha1(body).hexdigest()
+    if cache.get("digest") == digest:
+        otadict = cache["map"]
+    else:
+        reqj = json.loads(body.decode("utf-8"))
+        otadict = {val["curef"]: val["last_ota"] for val in reqj.values() if val["last_ota"] is not None}
+    remote_prd_store({"stamp": time.time(), "digest": digest, "map": otadict}, homepath)
     return otadict
@@ -28,7 +28,7 @@ def grab_args():
     Invoke :func:`archivist.archivist_main` with those arguments.
     """
     if len(sys.argv) > 1:
-        parser = argutils.default_parser("bb-archivist", "Create autoloaders", ("folder", "osr"))
+        parser = argutils.default_parser("bb-archivist", "Create autoloaders", ("folder", "osr", "bandwidth", "workers"))
         negategroup = parser.add_argument_group(
             "negators",
             "Disable program functionality")
@@ -132,6 +132,8 @@ def grab_args():
         parser.set_defaults(compmethod="7z")
         args = parser.parse_args(sys.argv[1:])
         args.folder = scriptutils.generate_workfolder(args.folder)
+        networkutils.bandwidth_setup(args.bandwidth)
+        networkutils.workers_setup(args.autoworkers)
         if getattr(sys, 'frozen', False):
             args.gpg = False
             hashdict = hashutils.verifier_config_loader(os.getcwd())
@@ -177,6 +179,7 @@ def questionnaire():
         hashdict = hashutils.verifier_config_loader()
         hashutils.verifier_config_writer(hashdict)
         compmethod = archiveutils.compress_config_loader()
+    networkutils.bandwidth_setup()
     print(" ")
     archivist_main(osversion, radioversion, softwareversion,
                    localdir, radios, compressed, deleted, hashed,
@@ -507,6 +510,7 @@ def archivist_removeemptyfolders(localdir):
     barutils.remove_empty_folders(localdir)
 
 
+@networkutils.memoize_run
 def archivist_main(osversion, radioversion=None, softwareversion=None,
                    localdir=None, radios=True, compressed=True, deleted=True,
                    hashed=True, hashdict=None, download=True,
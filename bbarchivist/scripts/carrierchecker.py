@@ -26,7 +26,7 @@ def grab_args():
     Invoke :func:`carrierchecker.carrierchecker_main` with those arguments.
     """
     if len(sys.argv) > 1:
-        parser = argutils.default_parser("bb-cchecker", "Carrier info checking")
+        parser = argutils.default_parser("bb-cchecker", "Carrier info checking", ("bandwidth", "workers"))
         parser.add_argument(
             "mcc",
             help="1-3 digit country code",
@@ -107,6 +107,8 @@ def grab_args():
             metavar="OS")
         parser.set_defaults()
         args = parser.parse_args(sys.argv[1:])
+        networkutils.bandwidth_setup(args.bandwidth)
+        networkutils.workers_setup(args.autoworkers)
         if args.codes:
             webbrowser.open("https://en.wikipedia.org/wiki/Mobile_country_code")
         else:
@@ -197,6 +199,8 @@ def questionnaire():
         upgrade = False if not download else utilities.i2b("Y=UPGRADE BARS, N=DEBRICK BARS?: ")
         blitz = False if not download else (utilities.i2b("CREATE BLITZ?: ") if upgrade else False)
     directory = os.getcwd()
+    if download:
+        networkutils.bandwidth_setup()
     print(" ")
     carrierchecker_main(mcc, mnc, device, download, upgrade, directory, export, blitz, bundles, None, False)
 
@@ -24,7 +24,7 @@ def grab_args():
     Invoke downloader from :func:`archivist.archivist_main` with arguments.
     """
     if len(sys.argv) > 1:
-        parser = argutils.default_parser("bb-downloader", "Download bar files", ("folder", "osr"))
+        parser = argutils.default_parser("bb-downloader", "Download bar files", ("folder", "osr", "bandwidth", "workers"))
         parser.add_argument(
             "-a",
             "--altsw",
@@ -57,6 +57,8 @@ def grab_args():
         parser.set_defaults()
         args = parser.parse_args(sys.argv[1:])
         args.folder = utilities.dirhandler(args.folder, os.getcwd())
+        networkutils.bandwidth_setup(args.bandwidth)
+        networkutils.workers_setup(args.autoworkers)
         downloader_main(args.os, args.radio, args.swrelease,
                         args.folder, args.debricks, args.radios,
                         args.cores, args.altsw)
@@ -80,6 +82,7 @@ def questionnaire():
     if not cores:
         cores = False
     altsw = None
+    networkutils.bandwidth_setup()
     print(" ")
     downloader_main(osversion, radioversion, softwareversion,
                     localdir, debricks, radios, cores, altsw)
@@ -17,12 +17,26 @@ def droidscraper_main():
     Wrap around :mod:`bbarchivist.networkutils` web scraping.
     """
     parser = argutils.default_parser("bb-droidscraper", "Autoloader scraper.")
+    parser.add_argument(
+        "-a",
+        "--all",
+        dest="showall",
+        help="Show all autoloaders, not just new ones",
+        action="store_true",
+        default=False)
     parser.set_defaults()
-    parser.parse_args(sys.argv[1:])
+    args = parser.parse_args(sys.argv[1:])
     argutils.slim_preamble("DROIDSCRAPER")
     print(" ")
     session = networkutils.generic_session()
-    networkutils.loader_page_scraper_og(session)
+    records, fresh = networkutils.loader_page_bootstrap(session)
+    if args.showall:
+        networkutils.loader_records_printer(records)
+    elif fresh:
+        print("NEW AUTOLOADERS:")
+        networkutils.loader_records_printer(fresh)
+    else:
+        print("NO NEW AUTOLOADERS")
     decorators.enter_to_exit(True)
 
 
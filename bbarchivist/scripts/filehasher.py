@@ -36,10 +36,46 @@ def filehasher_main():
             help="Filter out files generated by this package",
             default=False,
             action="store_true")
+        parser.add_argument(
+            "-nc",
+            "--no-cache",
+            dest="cache",
+            help="Rehash every file, ignoring cached hashes",
+            default=True,
+            action="store_false")
+        parser.add_argument(
+            "-k",
+            "--check",
+            dest="verify",
+            help="Check files against existing .cksum files instead",
+            default=False,
+            action="store_true")
+        parser.add_argument(
+            "-ff",
+            "--fail-fast",
+            dest="failfast",
+            help="Stop checking at the first mismatch",
+            default=False,
+            action="store_true")
+        parser.add_argument(
+            "-c",
+            "--calibrate",
+            dest="calibrate",
+            help="Benchmark block sizes on this folder's storage, save the fastest",
+            default=False,
+            action="store_true")
         parser.set_defaults()
         args = parser.parse_args(sys.argv[1:])
+        hashutils.hashcache_setup(args.cache)
         args.folder = utilities.dirhandler(args.folder, os.getcwd())
-        hashutils.verifier(args.folder, hashdict)
+        if args.calibrate:
+            hashutils.calibrate_main(args.folder)
+        elif args.verify:
+            failures = hashutils.cksum_verify([args.folder], args.failfast, hashdict["blocksize"])
+            if failures:
+                raise SystemExit(1)
+        else:
+            hashutils.verifier(args.folder, hashdict)
     else:
         folder = os.getcwd()
         print(" ")
@@ -5,6 +5,7 @@ import os  # path operations
 import sys  # load arguments
 
 from bbarchivist import argutils  # arguments
+from bbarchivist import hashutils  # hash cache
 from bbarchivist import scriptutils  # script frontends
 from bbarchivist import utilities  # input validation
 
@@ -29,6 +30,13 @@ def grab_args():
             nargs="?",
             default=None,
             type=argutils.droidlookup_devicetype)
+        parser.add_argument(
+            "-nc",
+            "--no-cache",
+            dest="cache",
+            help="Rehash every file, ignoring cached hashes",
+            default=True,
+            action="store_false")
         parser.set_defaults()
         args = parser.parse_args(sys.argv[1:])
         execute_args(args)
@@ -63,6 +71,7 @@ def execute_args(args):
     :type args: argparse.Namespace
     """
     args.folder = utilities.dirhandler(args.folder, os.getcwd())
+    hashutils.hashcache_setup(args.cache)
     infogenerator_main(args.folder, args.os, args.radio, args.swrelease, args.device)
 
 
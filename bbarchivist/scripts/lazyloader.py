@@ -28,7 +28,7 @@ def grab_args():
     Invoke :func:`lazyloader.lazyloader_main` with arguments.
     """
     if len(sys.argv) > 1:
-        argflags = ("folder", "osr")
+        argflags = ("folder", "osr", "bandwidth", "workers")
         parser = argutils.default_parser("bb-lazyloader", "Create one autoloader", argflags)
         devgroup = parser.add_argument_group("devices", "Device to load (one required)")
         compgroup = devgroup.add_mutually_exclusive_group()
@@ -105,6 +105,8 @@ def grab_args():
             action="store_true")
         parser.set_defaults(device=None)
         args = parser.parse_args(sys.argv[1:])
+        networkutils.bandwidth_setup(args.bandwidth)
+        networkutils.workers_setup(args.autoworkers)
         execute_args(args)
     else:
         questionnaire()
@@ -212,10 +214,12 @@ def questionnaire():
     swver, radiover, altsw = questionnaire_check(swver, radiover)
     device = questionnaire_devices()
     autoloader = questionnaire_loader()
+    networkutils.bandwidth_setup()
     print(" ")
     lazyloader_main(device, osver, radiover, swver, localdir, autoloader, True, altsw, False)
 
 
+@networkutils.memoize_run
 def lazyloader_main(device, osversion, radioversion=None, softwareversion=None, localdir=None, autoloader=False, download=True, altsw=None, core=False):
     """
     Wrap the tools necessary to make one autoloader.
@@ -22,8 +22,9 @@ def metachecker_main():
     parser.parse_args(sys.argv[1:])
     argutils.slim_preamble("METACHECKER")
     sess = requests.Session()
-    runt = networkutils.ndk_metadata(sess) + networkutils.runtime_metadata(sess)
-    simu = networkutils.sim_metadata(sess)
+    feeds = networkutils.metadata_bootstrap(session=sess)
+    runt = feeds[None] + feeds["runtime"]
+    simu = feeds["simulator"]
     print("RUNTIME METADATA")
     utilities.lprint(sorted(runt))
     print("\nSIMULATOR METADATA")
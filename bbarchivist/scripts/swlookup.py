@@ -34,12 +34,27 @@ def grab_args():
             type=int,
             choices=range(1, 10000),
             metavar="INT")
+        parser.add_argument(
+            "-s", "--search",
+            dest="search",
+            help="Find latest release with parallel galloping search",
+            action="store_true",
+            default=False)
+        parser.add_argument(
+            "-g", "--gap",
+            dest="sparsity",
+            help="Search mode: most dead builds between live ones, default = 8",
+            default=8,
+            type=argutils.positive_integer,
+            metavar="INT")
         args = parser.parse_args(sys.argv[1:])
         parser.set_defaults()
         swlookup_main(
             args.sw,
             args.recurse,
-            args.ceiling)
+            args.ceiling,
+            args.search,
+            args.sparsity)
     else:
         swrel = input("SOFTWARE RELEASE: ")
         recurse = utilities.i2b("LOOP (Y/N)?: ")
@@ -71,8 +86,29 @@ def terminator(swversion, ceiling, loop=None):
         raise KeyboardInterrupt
 
 
+def swlookup_search(swversion, ceiling=9999, sparsity=8):
+    """
+    Find the latest live software release at or above a given one.
+
+    :param swversion: Software version, 10.x.y.zzzz.
+    :type swversion: str
+
+    :param ceiling: Highest build to consider. Default is 9999 (i.e. 10.x.y.9999).
+    :type ceiling: int
+
+    :param sparsity: Maximum run of dead builds between live ones. Default is 8.
+    :type sparsity: int
+    """
+    print("SEARCHING FROM: {0}".format(swversion))
+    latest = networkutils.sw_gallop_search(swversion, ceiling, sparsity)
+    if latest is None:
+        print("NO SW RELEASE FOUND")
+    else:
+        print("LATEST SW: {0}".format(latest))
+
+
 @decorators.wrap_keyboard_except
-def swlookup_main(swversion, loop=False, ceiling=9999):
+def swlookup_main(swversion, loop=False, ceiling=9999, search=False, sparsity=8):
     """
     Check if a software release exists.
 
@@ -84,8 +120,17 @@ def swlookup_main(swversion, loop=False, ceiling=9999):
 
     :param ceiling: When to stop loop. Default is 9999 (i.e. 10.x.y.9999).
     :type ceiling: int
+
+    :param search: Whether to search for the latest release instead. Default is false.
+    :type search: bool
+
+    :param sparsity: Search mode: maximum run of dead builds between live ones. Default is 8.
+    :type sparsity: int
     """
     argutils.slim_preamble("SWLOOKUP")
+    if search:
+        swlookup_search(swversion, ceiling, sparsity)
+        return
     while True:
         terminator(swversion, ceiling, loop)
         print("NOW SCANNING: {0}".format(swversion), end="\r")
@@ -5,6 +5,8 @@ import sys  # load arguments
 
 from bbarchivist import argutils  # arguments
 from bbarchivist import decorators  # enter to exit
+from bbarchivist import networkutils  # bandwidth
+from bbarchivist import networkutilstcl  # remote OTA database
 from bbarchivist import scriptutilstcl  # script frontends
 
 __author__ = "Thurask"
@@ -18,9 +20,16 @@ def grab_args():
 
     Invoke a function with those arguments.
     """
-    parser = argutils.default_parser("bb-tcldelta", "Check for delta updates for TCL devices")
+    parser = argutils.default_parser("bb-tcldelta", "Check for delta updates for TCL devices", ("bandwidth",))
     parser.add_argument("curef", help="PRD to check", default=None, nargs="?")
     parser.add_argument("fvver", help="Current OS version", default=None, nargs="?")
+    parser.add_argument(
+        "-a",
+        "--all",
+        dest="batch",
+        help="Resolve deltas for every PRD in remote OTA database",
+        action="store_true",
+        default=False)
     parser.add_argument(
         "-d",
         "--download",
@@ -28,6 +37,20 @@ def grab_args():
         help="Download update file",
         action="store_true",
         default=False)
+    parser.add_argument(
+        "-j",
+        "--json",
+        dest="asjson",
+        help="Print JSON instead of a table, with -a",
+        action="store_true",
+        default=False)
+    parser.add_argument(
+        "-m",
+        "--mirrors",
+        dest="mirrors",
+        help="Download from every mirror at once",
+        action="store_true",
+        default=False)
     parser.add_argument(
         "-o",
         "--original-filename",
@@ -51,11 +74,17 @@ def grab_args():
         default=False)
     args = parser.parse_args(sys.argv[1:])
     parser.set_defaults()
+    if args.batch:
+        tcldelta_batch(args.asjson)
+        raise SystemExit
+    args.download = args.download or args.mirrors
+    if args.download or args.original:
+        networkutils.bandwidth_setup(args.bandwidth)
     if args.curef is None:
         args = questionnaire(args)
     elif args.fvver is None and not args.remote:
         args = questionnaire(args)
-    tcldelta_main(args.curef, args.fvver, args.download, args.original, args.export)
+    tcldelta_main(args.curef, args.fvver, args.download, args.original, args.export, args.remote, args.mirrors)
     decorators.enter_to_exit(True)
 
 
@@ -73,7 +102,19 @@ def questionnaire(args):
     return args
 
 
-def tcldelta_main(curef, fvver, download=False, original=False, export=False, remote=False):
+def tcldelta_batch(asjson=False):
+    """
+    Resolve OTA deltas for every PRD with a known base version.
+
+    :param asjson: Whether to print JSON instead of a table. Default is False.
+    :type asjson: bool
+    """
+    remotedict = networkutilstcl.remote_prd_info()
+    deltas = scriptutilstcl.tcl_delta_batch(remotedict)
+    scriptutilstcl.tcl_delta_printer(deltas, asjson)
+
+
+def tcldelta_main(curef, fvver, download=False, original=False, export=False, remote=False, mirrors=False):
     """
     Scan one PRD and produce download URL and filename.
 
@@ -94,10 +135,13 @@ def tcldelta_main(curef, fvver, download=False, original=False, export=False, re
 
     :param remote: Whether to get OTA version from remote server. Default is False.
     :type remote: bool
+
+    :param mirrors: Whether to download from every mirror at once. Default is False.
+    :type mirrors: bool
     """
     if remote:
         fvver = scriptutilstcl.tcl_delta_remote(curef)
-    scriptutilstcl.tcl_prd_scan(curef, download, mode=2, fvver=fvver, original=original, export=export)
+    scriptutilstcl.tcl_prd_scan(curef, download, mode=2, fvver=fvver, original=original, export=export, mirrors=mirrors)
 
 
 if __name__ == "__main__":
@@ -62,12 +62,26 @@ def grab_args():
         help="Don't include lines to wipe userdata",
         action="store_false",
         default=True)
+    parser.add_argument(
+        "-s",
+        "--stream",
+        dest="stream",
+        help="Write needed files straight from zip, without extracting it",
+        action="store_true",
+        default=False)
+    parser.add_argument(
+        "-nl",
+        "--no-link",
+        dest="stage",
+        help="Copy images instead of linking/cloning them",
+        action="store_false",
+        default=True)
     if len(sys.argv) == 1 and getattr(sys, 'frozen', False):
         print("You're better off running this from command line")
         decorators.enter_to_exit(True)
     args = parser.parse_args(sys.argv[1:])
     parser.set_defaults()
-    tclloader_main(args.loaderfile, args.loadername, args.directory, args.localtools, args.compress, args.wipe)
+    tclloader_main(args.loaderfile, args.loadername, args.directory, args.localtools, args.compress, args.wipe, args.stage, args.stream)
 
 
 def tclloader_extract(loaderfile, loaderdir, directory=False):
@@ -125,7 +139,7 @@ def tclloader_compress(compress=False, loadername=None):
         print("COMPRESSION FINISHED")
 
 
-def tclloader_main(loaderfile, loadername=None, directory=False, localtools=False, compress=False, wipe=True):
+def tclloader_main(loaderfile, loadername=None, directory=False, localtools=False, compress=False, wipe=True, stage=True, stream=False):
     """
     Scan every PRD and produce latest versions.
 
@@ -146,15 +160,27 @@ def tclloader_main(loaderfile, loadername=None, directory=False, localtools=Fals
 
     :param wipe: If the final loader wipes userdata. Default is True.
     :type wipe: bool
+
+    :param stage: Link/clone images instead of copying, where possible. Default is True.
+    :type stage: bool
+
+    :param stream: If needed files are written straight from the zip, skipping extraction. Default is False.
+    :type stream: bool
     """
     argutils.slim_preamble("TCLLOADER")
     loaderdir, osver = scriptutilstcl.tclloader_prep(loaderfile, directory)
-    tclloader_extract(loaderfile, loaderdir, directory)
+    stream = stream and not directory
+    if not stream:
+        tclloader_extract(loaderfile, loaderdir, directory)
     localtools = tclloader_fastboot(localtools)
-    loadername, platform = scriptutilstcl.tclloader_filename(loaderdir, osver, loadername)
     print("CREATING LOADER")
-    loadergentcl.generate_tclloader(loaderdir, loadername, platform, localtools, wipe)
-    shutil.rmtree("plattools")
+    if stream:
+        loadername, platform = scriptutilstcl.tclloader_streamname(loaderfile, osver, loadername)
+        loadergentcl.generate_tclloader_stream(loaderfile, loadername, platform, localtools, wipe)
+    else:
+        loadername, platform = scriptutilstcl.tclloader_filename(loaderdir, osver, loadername)
+        loadergentcl.generate_tclloader(loaderdir, loadername, platform, localtools, wipe, stage)
+    shutil.rmtree("plattools", ignore_errors=True)
     tclloader_compress(compress, loadername)
     print("LOADER COMPLETE!")
 
@@ -7,6 +7,7 @@ from bbarchivist import argutils  # arguments
 from bbarchivist import decorators  # enter to exit
 from bbarchivist import jsonutils  # json
 from bbarchivist import scriptutilstcl  # script frontends
+from bbarchivist import sqlutils  # discovered PRDs
 from bbarchivist import utilities  # bool
 
 __author__ = "Thurask"
@@ -68,6 +69,14 @@ def grab_args():
             help="Use KEY2 syntax",
             action="store_true",
             default=False)
+        parser.add_argument(
+            "-s",
+            "--shard",
+            dest="shard",
+            help="Only scan shard i of n, ex. 2/4",
+            default=None,
+            type=argutils.shard_spec,
+            metavar="I/N")
         args = parser.parse_args(sys.argv[1:])
         parser.set_defaults()
         execute_args(args)
@@ -110,12 +119,12 @@ def execute_args(args):
         print("INVALID RANGE!")
         raise SystemExit
     args.ceiling += 1  # because range() is a half-open interval
-    tclnewprd_main(args.prds, args.floor, args.ceiling, args.export, args.noprefix, args.key2mode)
+    tclnewprd_main(args.prds, args.floor, args.ceiling, args.export, args.noprefix, args.key2mode, args.shard)
 
 
-def tclnewprd_main(prds=None, floor=1, ceiling=60, export=False, noprefix=False, key2mode=False):
+def tclnewprd_main(prds=None, floor=1, ceiling=60, export=False, noprefix=False, key2mode=False, shard=None):
     """
-    Scan every PRD and produce latest versions.
+    Scan for PRDs not in the database or found by previous scans, and record new ones.
 
     :param prds: Specific PRD(s) to check, None if all will be checked. Default is None.
     :type prds: list(str)
@@ -134,12 +143,16 @@ def tclnewprd_main(prds=None, floor=1, ceiling=60, export=False, noprefix=False,
 
     :param key2mode: Whether to use new-style prefix. Default is False.
     :type key2mode: bool
+
+    :param shard: Only scan one shard of candidates: (i, n). Default is None.
+    :type shard: tuple(int)
     """
     argutils.slim_preamble("TCLNEWPRD")
     prdbase = jsonutils.load_json("prds")
+    prdbase["DISCOVERED"] = sqlutils.list_tcl_prds() or []
     prddict = scriptutilstcl.tcl_findprd_prepdict(prdbase)
     prddict = scriptutilstcl.tcl_findprd_checkfilter(prddict, prds)
-    scriptutilstcl.tcl_findprd(prddict, floor, ceiling, export, noprefix, key2mode)
+    scriptutilstcl.tcl_findprd(prddict, floor, ceiling, export, noprefix, key2mode, shard, store=True)
 
 
 if __name__ == "__main__":
@@ -3,14 +3,13 @@
 
 import sys  # load arguments
 
-import requests  # session
 from bbarchivist import argutils  # arguments
 from bbarchivist import decorators  # enter to exit
 from bbarchivist import jsonutils  # json
+from bbarchivist import networkutils  # bandwidth
 from bbarchivist import networkutilstcl  # lookup
 from bbarchivist import scriptutilstcl  # script frontends
 from bbarchivist import utilities  # bool
-from bbarchivist import xmlutilstcl  # xml handling
 
 __author__ = "Thurask"
 __license__ = "WTFPL v2"
@@ -26,7 +25,7 @@ def grab_args():
     if getattr(sys, "frozen", False) and len(sys.argv) == 1:
         questionnaire()
     else:
-        parser = argutils.default_parser("bb-tclscan", "Check for updates for TCL devices")
+        parser = argutils.default_parser("bb-tclscan", "Check for updates for TCL devices", ("bandwidth",))
         parser.add_argument("prd", help="Only scan one PRD", default=None, nargs="?")
         parser.add_argument(
             "-l",
@@ -35,6 +34,13 @@ def grab_args():
             help="List PRDs in database",
             action="store_true",
             default=False)
+        parser.add_argument(
+            "-c",
+            "--changes",
+            dest="changes",
+            help="Only show PRDs that changed since last scan",
+            action="store_true",
+            default=False)
         parser.add_argument(
             "-d",
             "--download",
@@ -42,6 +48,13 @@ def grab_args():
             help="Download update, assumes single PRD",
             action="store_true",
             default=False)
+        parser.add_argument(
+            "-m",
+            "--mirrors",
+            dest="mirrors",
+            help="Download from every mirror at once, assumes -d",
+            action="store_true",
+            default=False)
         parser.add_argument(
             "-o",
             "--ota-version",
@@ -71,6 +84,9 @@ def grab_args():
             default=False)
         args = parser.parse_args(sys.argv[1:])
         parser.set_defaults()
+        args.download = args.download or args.mirrors
+        if args.download:
+            networkutils.bandwidth_setup(args.bandwidth)
         execute_args(args)
 
 
@@ -85,9 +101,9 @@ def execute_args(args):
         prddict = jsonutils.load_json("prds")
         jsonutils.list_prds(prddict)
     elif args.prd is not None:
-        tclscan_single(args.prd, args.download, args.otaver, args.export, args.remote)
+        tclscan_single(args.prd, args.download, args.otaver, args.export, args.remote, args.mirrors)
     else:
-        tclscan_main(args.otaver, args.device, args.export, args.remote)
+        tclscan_main(args.otaver, args.device, args.export, args.remote, args.changes)
 
 
 def questionnaire_ota():
@@ -127,7 +143,7 @@ def questionnaire():
     decorators.enter_to_exit(True)
 
 
-def tclscan_single(curef, download=False, ota=None, export=False, remote=False):
+def tclscan_single(curef, download=False, ota=None, export=False, remote=False, mirrors=False):
     """
     Scan one PRD and produce download URL and filename.
 
@@ -145,17 +161,20 @@ def tclscan_single(curef, download=False, ota=None, export=False, remote=False):
 
     :param remote: Whether to get OTA version from remote server. Default is False.
     :type remote: bool
+
+    :param mirrors: Whether to download from every mirror at once. Default is False.
+    :type mirrors: bool
     """
     if remote:
         remotedict = networkutilstcl.remote_prd_info()
         ota = remotedict.get(curef, None)
     mode, fvver = scriptutilstcl.tcl_prep_otaver(ota)
-    scriptutilstcl.tcl_prd_scan(curef, download, mode=mode, fvver=fvver, export=export, verify=False)
+    scriptutilstcl.tcl_prd_scan(curef, download, mode=mode, fvver=fvver, export=export, verify=False, mirrors=mirrors)
 
 
-def tclscan_main(ota=None, device=None, export=False, remote=False):
+def tclscan_main(ota=None, device=None, export=False, remote=False, changes=False):
     """
-    Scan every PRD and produce latest versions.
+    Scan every PRD and produce latest versions. Results are stored in the SQL database.
 
     :param ota: The starting version if OTA, None if not. Default is None.
     :type ota: str
@@ -168,6 +187,9 @@ def tclscan_main(ota=None, device=None, export=False, remote=False):
 
     :param remote: Whether to get OTA version from remote server. Default is False.
     :type remote: bool
+
+    :param changes: Whether to only show PRDs that changed since last scan. Default is False.
+    :type changes: bool
     """
     if remote:
         remotedict = networkutilstcl.remote_prd_info()
@@ -177,19 +199,7 @@ def tclscan_main(ota=None, device=None, export=False, remote=False):
     prddict = jsonutils.load_json("prds")
     if device is not None:
         prddict = {device: prddict[device]}
-    sess = requests.Session()
-    for devx in prddict.keys():
-        print("~{0}~".format(devx))
-        for curef in prddict[devx]:
-            if remote:
-                fvver = remotedict.get(curef, "AAA000")
-            checktext = networkutilstcl.tcl_check(curef, sess, mode=mode, fvver=fvver, export=export)
-            if checktext is None:
-                continue
-            else:
-                tvver, firmwareid, filename, fsize, fhash = xmlutilstcl.parse_tcl_check(checktext)
-                del firmwareid, filename, fsize, fhash
-                scriptutilstcl.tcl_mainscan_printer(curef, tvver, ota)
+    scriptutilstcl.tcl_mainscan_bootstrap(prddict, mode, fvver, export, remotedict if remote else None, ota, store=True, changes=changes)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,6 @@
 """This module contains various utilities for the scripts folder."""
 
 import getpass  # invisible password
-import hashlib  # hashes
 import os  # path work
 import shutil  # folder removal
 import sys  # getattr
@@ -647,6 +646,7 @@ def linkgen_sdk(sdk, oses, cores):
     return oses, cores
 
 
+@networkutils.memoize_run
 def linkgen(osversion, radioversion=None, softwareversion=None, altsw=None, temp=False, sdk=False):
     """
     Generate debrick/core/radio links for given OS, radio, software release.
@@ -1019,7 +1019,7 @@ def bulk_hash(dirs, compressed=True, deleted=True, radios=True, hashdict=None):
     """
     print("HASHING LOADERS...")
     defargs = utilities.def_args(dirs)
-    utilities.cond_check(hashutils.verifier, defargs, [hashdict], radios, compressed, deleted)
+    hashutils.verifier_bulk(utilities.cond_args(defargs, radios, compressed, deleted), hashdict)
 
 
 def bulk_verify(dirs, compressed=True, deleted=True, radios=True):
@@ -1142,6 +1142,7 @@ def make_info(filepath, osver, radio=None, software=None, device=None):
         info_header(afile, osver, radio, software, device)
         for indx, file in enumerate(absfiles):
             write_info(file, indx, len(absfiles), afile)
+    hashutils.HASHCACHE.save()
 
 
 def write_info(infile, index, filecount, outfile):
@@ -1164,10 +1165,11 @@ def write_info(infile, index, filecount, outfile):
     outfile.write("File: {0}\n".format(os.path.basename(infile)))
     outfile.write("\tSize: {0} ({1})\n".format(fsize, utilities.fsizer(fsize)))
     outfile.write("\tHashes:\n")
-    outfile.write("\t\tMD5: {0}\n".format(hashutils.hashlib_hash(infile, hashlib.md5()).upper()))
-    outfile.write("\t\tSHA1: {0}\n".format(hashutils.hashlib_hash(infile, hashlib.sha1()).upper()))
-    outfile.write("\t\tSHA256: {0}\n".format(hashutils.hashlib_hash(infile, hashlib.sha256()).upper()))
-    outfile.write("\t\tSHA512: {0}\n".format(hashutils.hashlib_hash(infile, hashlib.sha512()).upper()))
+    hashes = hashutils.multi_hash(infile, ("md5", "sha1", "sha256", "sha512"))
+    outfile.write("\t\tMD5: {0}\n".format(hashes["md5"].upper()))
+    outfile.write("\t\tSHA1: {0}\n".format(hashes["sha1"].upper()))
+    outfile.write("\t\tSHA256: {0}\n".format(hashes["sha256"].upper()))
+    outfile.write("\t\tSHA512: {0}\n".format(hashes["sha512"].upper()))
     if index != filecount - 1:
         outfile.write("\n")
 
@@ -2,13 +2,18 @@
 """This module contains various utilities for TCL tools."""
 
 import collections  # defaultdict
+import concurrent.futures  # multiprocessing/threading
+import json  # batch output
 import os  # path work
+import zipfile  # loader templates
 
 import requests  # session
 from bbarchivist import argutils  # arguments
 from bbarchivist import hashutils  # file hashes
+from bbarchivist import loadergentcl  # loader layout
 from bbarchivist import networkutils  # network tools
 from bbarchivist import networkutilstcl  # tcl network tools
+from bbarchivist import sqlutils  # scan state
 from bbarchivist import utilities  # little things
 from bbarchivist import xmlutilstcl  # xml handling
 
@@ -51,9 +56,30 @@ def tclloader_filename(loaderdir, osver, loadername=None):
     return loadername, platform
 
 
-def tcl_download(downloadurl, filename, filesize, filehash, verify=True):
+def tclloader_streamname(loaderfile, osver, loadername=None):
+    """
+    Prepare platform and filename, from a loader template zip.
+
+    :param loaderfile: Path to input zip.
+    :type loaderfile: str
+
+    :param osver: OS version.
+    :type osver: str
+
+    :param loadername: Name of final autoloader. Default is auto-generated.
+    :type loadername: str
+    """
+    with zipfile.ZipFile(loaderfile) as zipf:
+        platform = loadergentcl.stream_platform(zipf.namelist())
+    if loadername is None:
+        loadername = "{0}_autoloader_user-all-{1}".format(platform, osver)
+    return loadername, platform
+
+
+def tcl_download(downloadurl, filename, filesize, filehash, verify=True, mirrors=None):
     """
     Download autoloader file, rename, and verify.
+    If several mirrors are given, download from all of them at once, and always verify.
 
     :param downloadurl: Download URL.
     :type downloadurl: str
@@ -69,15 +95,22 @@ def tcl_download(downloadurl, filename, filesize, filehash, verify=True):
 
     :param verify: Whether to verify the file after downloading. Default is True.
     :type verify: bool
+
+    :param mirrors: Download URLs on every slave. Default is None.
+    :type mirrors: list(str)
     """
     print("FILENAME: {0}".format(filename))
     print("LENGTH: {0}".format(utilities.fsizer(filesize)))
-    networkutils.download(downloadurl)
+    if mirrors is not None and len(mirrors) > 1:
+        verify = True
+        if not tcl_download_mirrored(downloadurl, filesize, mirrors):
+            return
+    else:
+        networkutils.download(downloadurl)
     print("DOWNLOAD COMPLETE")
     os.rename(downloadurl.split("/")[-1], filename)
     if verify:
-        method = hashutils.get_engine("sha1")
-        shahash = hashutils.hashlib_hash(filename, method)
+        shahash = hashutils.multi_hash(filename, ("sha1",), cache=False)["sha1"]
         if shahash == filehash:
             print("HASH CHECK OK")
         else:
@@ -85,7 +118,33 @@ def tcl_download(downloadurl, filename, filesize, filehash, verify=True):
             print("HASH FAILED!")
 
 
-def tcl_prd_scan(curef, download=False, mode=4, fvver="AAA000", original=True, export=False, verify=True):
+def tcl_download_mirrored(downloadurl, filesize, mirrors):
+    """
+    Download autoloader file from several mirrors at once, and show how much each one did.
+    Return whether every segment was downloaded; if not, the partial file is removed.
+
+    :param downloadurl: Download URL, for the filename.
+    :type downloadurl: str
+
+    :param filesize: Size of autoloader file.
+    :type filesize: str
+
+    :param mirrors: Download URLs on every slave.
+    :type mirrors: list(str)
+    """
+    print("MIRRORS: {0}".format(len(mirrors)))
+    lfname = downloadurl.split("/")[-1]
+    stats, complete = networkutils.download_mirrored(mirrors, int(filesize), lfname)
+    for mirror, done in stats.items():
+        print("{0}: {1}".format(mirror.split("/")[2], utilities.fsizer(done)))
+    if not complete:
+        print("ALL MIRRORS FAILED!")
+        if os.path.exists(lfname):
+            os.remove(lfname)
+    return complete
+
+
+def tcl_prd_scan(curef, download=False, mode=4, fvver="AAA000", original=True, export=False, verify=True, mirrors=False):
     """
     Scan one PRD and produce download URL and filename.
 
@@ -109,6 +168,9 @@ def tcl_prd_scan(curef, download=False, mode=4, fvver="AAA000", original=True, e
 
     :param verify: Whether to verify the file after downloading. Default is True.
     :type verify: bool
+
+    :param mirrors: Whether to download from every slave at once. Default is False.
+    :type mirrors: bool
     """
     sess = requests.Session()
     ctext = networkutilstcl.tcl_check(curef, sess, mode, fvver, export)
@@ -123,7 +185,8 @@ def tcl_prd_scan(curef, download=False, mode=4, fvver="AAA000", original=True, e
     filename = tcl_delta_filename(curef, fvver, tvver, filename, original)
     tcl_prd_print(tvver, downloadurl, filename, statcode, encslave, sess)
     if statcode == 200 and download:
-        tcl_download(downloadurl, filename, filesize, filehash, verify)
+        mirrorlist = xmlutilstcl.parse_tcl_download_mirrors(updatetext) if mirrors else None
+        tcl_download(downloadurl, filename, filesize, filehash, verify, mirrorlist)
 
 
 def tcl_delta_filename(curef, fvver, tvver, filename, original=True):
@@ -200,6 +263,87 @@ def tcl_prep_otaver(ota=None):
     return mode, fvver
 
 
+def tcl_delta_resolve(curef, fvver, session=None):
+    """
+    Resolve one PRD's OTA delta: update check, download request, then URL check.
+    Return dict of PRD, versions, filename, size, hash, URL and HTTP status, or None if there's no delta.
+
+    :param curef: PRD of the phone variant to check.
+    :type curef: str
+
+    :param fvver: Initial software version.
+    :type fvver: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+    """
+    ctext = networkutilstcl.tcl_check(curef, session, mode=2, fvver=fvver)
+    if ctext is None:
+        return None
+    tvver, firmwareid, filename, filesize, filehash = xmlutilstcl.parse_tcl_check(ctext)
+    salt = networkutilstcl.tcl_salt()
+    vkhsh = networkutilstcl.vkhash(curef, tvver, firmwareid, salt, 2, fvver)
+    updatetext = networkutilstcl.tcl_download_request(curef, tvver, firmwareid, salt, vkhsh, session, 2, fvver)
+    downloadurl, statcode = None, None
+    if updatetext is not None:
+        downloadurl = xmlutilstcl.parse_tcl_download_request(updatetext, 2)[0]
+        statcode = networkutils.getcode(downloadurl, session)
+    delta = {"curef": curef, "fvver": fvver, "tvver": tvver, "filename": filename, "size": int(filesize), "sha1": filehash, "url": downloadurl, "status": statcode}
+    return delta
+
+
+def tcl_delta_batch(remotedict, workers=16):
+    """
+    Resolve OTA deltas for every PRD with a known base version, concurrently. Return list in PRD order.
+    A PRD that can't be resolved gets an error row instead, so it doesn't sink the rest of the batch.
+    If interrupted, queued PRDs are cancelled and deltas resolved so far are returned.
+
+    :param remotedict: Dictionary of PRD: base version.
+    :type remotedict: dict(str: str)
+
+    :param workers: Number of PRDs resolved at once. Default is 16.
+    :type workers: int
+    """
+    sess = networkutilstcl.tcl_scan_session()
+    deltas = []
+    futures = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as xec:
+        try:
+            futures = [(curef, fvver, xec.submit(tcl_delta_resolve, curef, fvver, sess)) for curef, fvver in sorted(remotedict.items())]
+            for curef, fvver, future in futures:
+                try:
+                    delta = future.result()
+                except Exception as exc:
+                    delta = {"curef": curef, "fvver": fvver, "error": "{0}: {1}".format(type(exc).__name__, exc)}
+                if delta is not None:
+                    deltas.append(delta)
+        except KeyboardInterrupt:
+            tcl_cancel(xec, [future for curef, fvver, future in futures])
+    return deltas
+
+
+def tcl_delta_printer(deltas, asjson=False):
+    """
+    Print resolved OTA deltas, as a table or as JSON.
+
+    :param deltas: List of deltas and error rows, from :func:`tcl_delta_batch`.
+    :type deltas: list(dict)
+
+    :param asjson: Whether to print JSON instead of a table. Default is False.
+    :type asjson: bool
+    """
+    if asjson:
+        print(json.dumps(deltas, indent=2))
+        return
+    for delta in deltas:
+        if "error" in delta:
+            print("{0} {1} ERROR: {2}".format(delta["curef"], delta["fvver"], delta["error"]))
+            continue
+        size = utilities.fsizer(delta["size"])
+        print("{0} {1} to {2} [{3}] {4}".format(delta["curef"], delta["fvver"], delta["tvver"], size, delta["sha1"]))
+        print("    HTTP {0}: {1}".format(delta["status"], delta["url"]))
+
+
 def tcl_delta_remote(curef):
     """
     Prepare remote version for delta scanning.
@@ -246,6 +390,101 @@ def tcl_mainscan_printer(curef, tvver, ota=None):
         print("{0}: {1}".format(curef, tvver))
 
 
+def tcl_mainscan_check(curef, session=None, mode=4, fvver="AAA000", export=False):
+    """
+    Check one PRD, return parsed check or None.
+
+    :param curef: PRD of the phone variant to check.
+    :type curef: str
+
+    :param session: Requests session object, default is created on the fly.
+    :type session: requests.Session()
+
+    :param mode: 4 if downloading autoloaders, 2 if downloading OTA deltas.
+    :type mode: int
+
+    :param fvver: Initial software version, must be specific if downloading OTA deltas.
+    :type fvver: str
+
+    :param export: Whether to export XML response to file. Default is False.
+    :type export: bool
+    """
+    checktext = networkutilstcl.tcl_check(curef, session, mode=mode, fvver=fvver, export=export)
+    return None if checktext is None else xmlutilstcl.parse_tcl_check(checktext)
+
+
+def tcl_cancel(xec, futures):
+    """
+    Cancel every queued check and shut down without waiting, so only running checks hold up exit.
+
+    :param xec: ThreadPoolExecutor instance.
+    :type xec: concurrent.futures.ThreadPoolExecutor
+
+    :param futures: Submitted checks.
+    :type futures: list(concurrent.futures.Future)
+    """
+    for future in futures:
+        future.cancel()
+    xec.shutdown(wait=False)
+
+
+def tcl_mainscan_bootstrap(prddict, mode=4, fvver="AAA000", export=False, remotedict=None, ota=None, workers=16, store=False, changes=False):
+    """
+    Check every PRD concurrently, print results in database order, grouped by device.
+    Results can be stored in the SQL database, and compared with the last stored results.
+
+    :param prddict: Dictionary of device: [PRD, PRD...].
+    :type prddict: dict(str: list(str))
+
+    :param mode: 4 if downloading autoloaders, 2 if downloading OTA deltas.
+    :type mode: int
+
+    :param fvver: Initial software version, must be specific if downloading OTA deltas.
+    :type fvver: str
+
+    :param export: Whether to export XML response to file. Default is False.
+    :type export: bool
+
+    :param remotedict: Dictionary of PRD: initial version, to override fvver. Default is None.
+    :type remotedict: dict(str: str)
+
+    :param ota: The starting version if OTA, None if not. Default is None.
+    :type ota: str
+
+    :param workers: Number of concurrent checks. Default is 16.
+    :type workers: int
+
+    :param store: Whether to store results in SQL database. Default is False.
+    :type store: bool
+
+    :param changes: Whether to only print PRDs whose target version changed since last stored scan. Default is False.
+    :type changes: bool
+    """
+    previous = (sqlutils.list_tcl_scans(mode) or {}) if changes else {}
+    sess = networkutilstcl.tcl_scan_session()
+    results = []
+    checks = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as xec:
+        try:
+            for devx, curefs in prddict.items():
+                fvvers = [fvver if remotedict is None else remotedict.get(curef, "AAA000") for curef in curefs]
+                checks.append((devx, [(curef, fvv, xec.submit(tcl_mainscan_check, curef, sess, mode, fvv, export)) for curef, fvv in zip(curefs, fvvers)]))
+            for devx, futures in checks:
+                print("~{0}~".format(devx))
+                for curef, fvv, future in futures:
+                    result = future.result()
+                    if result is None:
+                        continue
+                    results.append((curef, fvv, result))
+                    if not changes or previous.get((curef.upper(), fvv.upper())) != result[0]:
+                        tcl_mainscan_printer(curef, result[0], ota)
+        except KeyboardInterrupt:
+            tcl_cancel(xec, [future for devx, futures in checks for curef, fvv, future in futures])
+            store = False
+    if store:
+        sqlutils.insert_tcl_scans(results, mode)
+
+
 def tcl_findprd_prepd_start(prddict):
     """
     Collect list of PRD entries.
@@ -317,40 +556,6 @@ def tcl_findprd_checkfilter(prddict, tocheck=None):
     return prddict2
 
 
-def tcl_findprd_centerscan(center, prddict, session, floor=0, ceiling=999, export=False, noprefix=False, key2mode=False):
-    """
-    Individual scanning for the center of a PRD.
-
-    :param center: PRD-center-end.
-    :type center: str
-
-    :param prddict: PRD center:[ends] dictionary.
-    :type prddict: collections.defaultdict(str: list)
-
-    :param session: Session object.
-    :type session: requests.Session
-
-    :param floor: When to start. Default is 0.
-    :type floor: int
-
-    :param ceiling: When to stop. Default is 999.
-    :type ceiling: int
-
-    :param export: Whether to export XML response to file. Default is False.
-    :type export: bool
-
-    :param noprefix: Whether to skip adding "PRD-" prefix. Default is False.
-    :type noprefix: bool
-
-    :param key2mode: Whether to use new-style prefix. Default is False.
-    :type key2mode: bool
-    """
-    tails = [int(i) for i in prddict[center]]
-    safes = [g for g in range(floor, ceiling) if g not in tails]
-    print("SCANNING ROOT: {0}{1}".format(center, " "*12))
-    tcl_findprd_safescan(safes, center, session, export, noprefix, key2mode)
-
-
 def tcl_findprd_prepcuref(center, tail, noprefix=False, key2mode=False):
     """
     Prepare candidate PRD.
@@ -375,41 +580,9 @@ def tcl_findprd_prepcuref(center, tail, noprefix=False, key2mode=False):
     return curef
 
 
-def tcl_findprd_safescan(safes, center, session, export=False, noprefix=False, key2mode=False):
-    """
-    Scan for PRDs known not to be in database.
-
-    :param safes: List of ends within given range that aren't in database.
-    :type safes: list(int)
-
-    :param center: PRD-center-end.
-    :type center: str
-
-    :param session: Session object.
-    :type session: requests.Session
-
-    :param export: Whether to export XML response to file. Default is False.
-    :type export: bool
-
-    :param noprefix: Whether to skip adding "PRD-" prefix. Default is False.
-    :type noprefix: bool
-
-    :param key2mode: Whether to use new-style prefix. Default is False.
-    :type key2mode: bool
-    """
-    for j in safes:
-        curef = tcl_findprd_prepcuref(center, j, noprefix, key2mode)
-        print("NOW SCANNING: {0}".format(curef), end="\r")
-        checktext = networkutilstcl.tcl_check(curef, session, export)
-        if checktext is None:
-            continue
-        else:
-            tcl_findprd_safehandle(curef, checktext)
-
-
 def tcl_findprd_safehandle(curef, checktext):
     """
-    Parse API output and print the relevant bits.
+    Parse API output and print the relevant bits. Return target version.
 
     :param curef: PRD of the phone variant to check.
     :type curef: str
@@ -421,11 +594,57 @@ def tcl_findprd_safehandle(curef, checktext):
     del firmwareid, filename, fsize, fhash
     tvver2 = "{0}{1}".format(tvver, " "*12)
     tcl_mainscan_printer(curef, tvver2)
+    return tvver
 
 
-def tcl_findprd(prddict, floor=0, ceiling=999, export=False, noprefix=False, key2mode=False):
+def tcl_findprd_candidates(prddict, floor=0, ceiling=999, shard=None):
     """
-    Check for new PRDs based on PRD database.
+    Get (center, end) pairs in range that aren't in database, across all centers.
+
+    :param prddict: PRD center:[ends] dictionary.
+    :type prddict: collections.defaultdict(str: list)
+
+    :param floor: When to start. Default is 0.
+    :type floor: int
+
+    :param ceiling: When to stop. Default is 999.
+    :type ceiling: int
+
+    :param shard: Only keep ends whose remainder mod n is i - 1: (i, n). Default is None.
+        Shards are picked before known ends are dropped, so they don't depend on the local database.
+    :type shard: tuple(int)
+    """
+    index, count = (1, 1) if shard is None else shard
+    candidates = []
+    for center in sorted(prddict.keys()):
+        tails = {int(i) for i in prddict[center]}
+        candidates.extend((center, tail) for tail in range(floor, ceiling) if tail % count == index - 1 and tail not in tails)
+    return candidates
+
+
+def tcl_findprd_results(probes):
+    """
+    Print results of candidate probes, in order. Return list of (PRD, target version) found.
+
+    :param probes: List of (center, PRD, future returning check XML or None).
+    :type probes: list(tuple)
+    """
+    found = []
+    lastcenter = None
+    for center, curef, probe in probes:
+        if center != lastcenter:
+            print("SCANNING ROOT: {0}{1}".format(center, " "*12))
+            lastcenter = center
+        print("NOW SCANNING: {0}".format(curef), end="\r")
+        checktext = probe.result()
+        if checktext is not None:
+            found.append((curef, tcl_findprd_safehandle(curef, checktext)))
+    return found
+
+
+def tcl_findprd(prddict, floor=0, ceiling=999, export=False, noprefix=False, key2mode=False, shard=None, workers=16, store=False):
+    """
+    Check for new PRDs based on PRD database, probing candidates concurrently.
 
     :param prddict: PRD center:[ends] dictionary.
     :type prddict: collections.defaultdict(str: list)
@@ -444,7 +663,27 @@ def tcl_findprd(prddict, floor=0, ceiling=999, export=False, noprefix=False, key
 
     :param key2mode: Whether to use new-style prefix. Default is False.
     :type key2mode: bool
-    """
-    sess = requests.Session()
-    for center in sorted(prddict.keys()):
-        tcl_findprd_centerscan(center, prddict, sess, floor, ceiling, export, noprefix, key2mode)
+
+    :param shard: Only scan one shard of candidates: (i, n). Default is None.
+    :type shard: tuple(int)
+
+    :param workers: Number of concurrent probes. Default is 16.
+    :type workers: int
+
+    :param store: Whether to record found PRDs in SQL database. Default is False.
+    :type store: bool
+    """
+    sess = networkutilstcl.tcl_scan_session()
+    candidates = tcl_findprd_candidates(prddict, floor, ceiling, shard)
+    found = []
+    probes = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as xec:
+        try:
+            for center, tail in candidates:
+                curef = tcl_findprd_prepcuref(center, tail, noprefix, key2mode)
+                probes.append((center, curef, xec.submit(networkutilstcl.tcl_check, curef, sess, export=export)))
+            found = tcl_findprd_results(probes)
+        except KeyboardInterrupt:
+            tcl_cancel(xec, [probe for center, curef, probe in probes])
+    if store and found:
+        sqlutils.insert_tcl_prds(found)
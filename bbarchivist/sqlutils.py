@@ -148,3 +148,99 @@ def list_sw_releases(avail=False):
         crs.execute(query)
         rows = crs.fetchall()
         return rows
+
+
+@decorators.sql_excepthandler("False")
+def prepare_tcl_db():
+    """
+    Create SQLite tables for TCL scans and discovered PRDs, if not already existing.
+    """
+    cnxn = sqlite3.connect(prepare_path())
+    with cnxn:
+        crs = cnxn.cursor()
+        reqid = "INTEGER PRIMARY KEY"
+        reqs = "TEXT NOT NULL COLLATE NOCASE"
+        reqs2 = "TEXT"
+        table = "Tclscan(Id {0}, Prd {1}, Mode INTEGER NOT NULL, Fvver {1}, Tvver {2}, Firmware {2}, Filename {2}, Size {2}, Checksum {2}, Date {2}, UNIQUE(Prd, Mode, Fvver))".format(
+            reqid, reqs, reqs2)
+        crs.execute("CREATE TABLE IF NOT EXISTS " + table)
+        table2 = "Tclprd(Id {0}, Prd {1} UNIQUE, Tvver {2}, Date {2})".format(reqid, reqs, reqs2)
+        crs.execute("CREATE TABLE IF NOT EXISTS " + table2)
+
+
+@decorators.sql_excepthandler("False")
+def insert_tcl_scans(results, mode=4, curdate=None):
+    """
+    Insert or update TCL scan results, in one transaction.
+
+    :param results: List of (PRD, initial version, (tvver, firmware id, filename, size, checksum)).
+    :type results: list(tuple)
+
+    :param mode: 4 if checking autoloaders, 2 if checking OTA deltas. Default is 4.
+    :type mode: int
+
+    :param curdate: If None, now. For manual dates, specify this.
+    :type curdate: str
+    """
+    if curdate is None:
+        curdate = time.strftime("%Y-%m-%d %H:%M:%S")
+    prepare_tcl_db()
+    cnxn = sqlite3.connect(prepare_path())
+    with cnxn:
+        crs = cnxn.cursor()
+        for curef, fvver, check in results:
+            crs.execute(
+                "INSERT OR REPLACE INTO Tclscan(Prd, Mode, Fvver, Tvver, Firmware, Filename, Size, Checksum, Date) VALUES (?,?,?,?,?,?,?,?,?)",
+                (curef, mode, fvver) + tuple(str(item) for item in check) + (curdate,))
+
+
+@decorators.sql_excepthandler("False")
+def list_tcl_scans(mode=4):
+    """
+    Return {(PRD, initial version): target version} for every stored TCL scan result.
+
+    :param mode: 4 if checking autoloaders, 2 if checking OTA deltas. Default is 4.
+    :type mode: int
+    """
+    prepare_tcl_db()
+    cnxn = sqlite3.connect(prepare_path())
+    with cnxn:
+        crs = cnxn.cursor()
+        crs.execute("SELECT Prd, Fvver, Tvver FROM Tclscan WHERE Mode=?", (mode,))
+        rows = crs.fetchall()
+    return {(prd.upper(), fvver.upper()): tvver for prd, fvver, tvver in rows}
+
+
+@decorators.sql_excepthandler("False")
+def insert_tcl_prds(found, curdate=None):
+    """
+    Record newly discovered PRDs, in one transaction.
+
+    :param found: List of (PRD, target version).
+    :type found: list(tuple(str))
+
+    :param curdate: If None, now. For manual dates, specify this.
+    :type curdate: str
+    """
+    if curdate is None:
+        curdate = time.strftime("%Y-%m-%d %H:%M:%S")
+    prepare_tcl_db()
+    cnxn = sqlite3.connect(prepare_path())
+    with cnxn:
+        crs = cnxn.cursor()
+        for curef, tvver in found:
+            crs.execute("INSERT OR REPLACE INTO Tclprd(Prd, Tvver, Date) VALUES (?,?,?)", (curef, tvver, curdate))
+
+
+@decorators.sql_excepthandler("False")
+def list_tcl_prds():
+    """
+    Return every discovered PRD in the database.
+    """
+    prepare_tcl_db()
+    cnxn = sqlite3.connect(prepare_path())
+    with cnxn:
+        crs = cnxn.cursor()
+        crs.execute("SELECT Prd FROM Tclprd")
+        rows = crs.fetchall()
+    return [row[0] for row in rows]
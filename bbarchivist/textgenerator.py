@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """This module is used for generation of URLs and related text files."""
 
-from bbarchivist.networkutils import get_length  # network
+from bbarchivist.networkutils import get_length, memoize_run  # network
 from bbarchivist.utilities import (create_bar_url, fsizer, generate_urls, newer_103, stripper)  # utils
 
 __author__ = "Thurask"
@@ -218,6 +218,7 @@ def write_header(target, softwareversion, osversion, radioversion):
     target.write("SOFTWARE RELEASE: {0}\n".format(softwareversion))
 
 
+@memoize_run
 def write_links(softwareversion, osversion, radioversion, osurls, coreurls, radiourls,
                 avlty=False, appendbars=False, appurls=None, temp=False, altsw=None):
     """
@@ -4,6 +4,7 @@
 import glob  # cap grabbing
 import hashlib  # base url creation
 import itertools  # spinners gonna spin
+import json  # telemetry lines
 import os  # path work
 import platform  # platform info
 import subprocess  # loader verification
@@ -726,6 +727,151 @@ class SpinManager(object):
             print("\n")
 
 
+class TransferMonitor(object):
+    """
+    Byte counts for a batch of transfers, shown in another thread:
+    a one-line progress view on a terminal, periodic JSON lines otherwise.
+    """
+
+    def __init__(self, stream=None, interval=None):
+        """
+        Prepare lock and counters.
+
+        :param stream: Output stream. Default is stderr, checked at start.
+        :type stream: file
+
+        :param interval: Seconds between updates. Default is 0.5 on a terminal, 10 otherwise.
+        :type interval: float
+        """
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.target = stream
+        self.stream = dummy.UselessStdout()
+        self.wait = interval
+        self.interval = interval
+        self.thread = None
+        self.tty = False
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all transfers.
+        """
+        with self.lock:
+            self.files = {}
+            self.failed = 0
+            self.started = compat.perf_clock()
+            self.stamp = self.started
+            self.last = 0
+            self.width = 0
+
+    def begin(self, name, size=0):
+        """
+        Add a transfer.
+
+        :param name: Transfer name.
+        :type name: str
+
+        :param size: Expected bytes, 0 if unknown.
+        :type size: int
+        """
+        with self.lock:
+            self.files[name] = [0, int(size or 0)]
+
+    def update(self, name, amount):
+        """
+        Count transferred bytes.
+
+        :param name: Transfer name.
+        :type name: str
+
+        :param amount: Bytes transferred.
+        :type amount: int
+        """
+        with self.lock:
+            self.files.setdefault(name, [0, 0])[0] += amount
+
+    def fail(self, name):
+        """
+        Count a failed transfer.
+
+        :param name: Transfer name.
+        :type name: str
+        """
+        with self.lock:
+            self.failed += 1
+
+    def snapshot(self):
+        """
+        Get totals, rates and active transfers since last snapshot.
+        """
+        with self.lock:
+            now = compat.perf_clock()
+            done = sum(entry[0] for entry in self.files.values())
+            total = sum(max(entry) for entry in self.files.values())
+            complete = len([entry for entry in self.files.values() if entry[1] and entry[0] >= entry[1]])
+            active = sorted((name, entry[0] / entry[1]) for name, entry in self.files.items() if entry[1] and 0 < entry[0] < entry[1])
+            rate = (done - self.last) / (now - self.stamp) if now > self.stamp else 0
+            average = done / (now - self.started) if now > self.started else 0
+            self.last, self.stamp = done, now
+            snap = {"elapsed": round(now - self.started, 2), "bytes": done, "total": total, "rate": int(rate), "eta": round((total - done) / average, 1) if average else None, "files": complete, "count": len(self.files), "active": active, "failed": self.failed}
+        return snap
+
+    def render(self, snap):
+        """
+        Write a snapshot to the output stream.
+
+        :param snap: Snapshot, from :meth:`snapshot`.
+        :type snap: dict
+        """
+        if self.tty:
+            eta = "--:--" if snap["eta"] is None else "{0}:{1:02d}".format(*divmod(int(snap["eta"]), 60))
+            files = " ".join("{0} {1:.0%}".format(name, pct) for name, pct in snap["active"][:3])
+            line = "[{0}/{1}] {2}/{3} {4}/s ETA {5}".format(snap["files"], snap["count"], fsizer(snap["bytes"]), fsizer(snap["total"]), fsizer(snap["rate"]), eta)
+            line = "{0} | {1}".format(line, files) if files else line
+            line = "{0} | {1} FAILED".format(line, snap["failed"]) if snap["failed"] else line
+            line = line[:compat.terminal_columns() - 1]
+            self.stream.write("\r{0}".format(line.ljust(self.width)))
+            self.width = len(line)
+        else:
+            snap = dict(snap, active=len(snap["active"]))
+            self.stream.write("{0}\n".format(json.dumps(dict({"event": "transfer"}, **snap), sort_keys=True)))
+        self.stream.flush()
+
+    def start(self):
+        """
+        Begin showing progress.
+        """
+        self.stream = sys.stderr if self.target is None else self.target
+        self.tty = self.stream.isatty()
+        self.wait = self.interval if self.interval else (0.5 if self.tty else 10.0)
+        self.event.clear()
+        self.thread = threading.Thread(target=self.loop, args=())
+        self.thread.daemon = True
+        self.thread.start()
+
+    def loop(self):
+        """
+        Show progress every interval, until stopped.
+        """
+        while not self.event.wait(self.wait):
+            self.render(self.snapshot())
+
+    def stop(self):
+        """
+        Stop showing progress, show final totals.
+        """
+        self.event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+            self.render(self.snapshot())
+            if self.tty:
+                self.stream.write("\n")
+                self.stream.flush()
+        self.stream = dummy.UselessStdout()
+
+
 def return_and_delete(target):
     """
     Read text file, then delete it. Return contents.
@@ -966,6 +1112,30 @@ def cond_do(dofunc, goargs, restargs=None, condition=True):
         dofunc(goargs[1], *restargs)
 
 
+def cond_args(goargs, condition=True, checkif=True, checkifnot=True):
+    """
+    Return the variable arguments :func:`cond_check` would use, in order.
+
+    :param goargs: List of variable arguments.
+    :type goargs: list(str)
+
+    :param condition: Condition to check in order to use secondarg.
+    :type condition: bool
+
+    :param checkif: Use first pair if this is True.
+    :type checkif: bool
+
+    :param checkifnot: Use second pair if this is False.
+    :type checkifnot: bool
+    """
+    picked = []
+    if checkif:
+        picked.extend(goargs[0:2] if condition else goargs[0:1])
+    if not checkifnot:
+        picked.extend(goargs[2:4] if condition else goargs[2:3])
+    return picked
+
+
 def cond_check(dofunc, goargs, restargs=None, condition=True, checkif=True, checkifnot=True):
     """
     Do :func:`cond_do` based on a condition, then do it again based on a second condition.
@@ -70,3 +70,24 @@ def parse_tcl_download_request(body, mode=4):
     eslave = root.find("SLAVE_LIST").findall("ENCRYPT_SLAVE")
     encslave = None if mode == 2 or not eslave else random.choice(eslave).text
     return "http://{0}{1}".format(slave, dlurl), encslave
+
+
+def parse_tcl_download_mirrors(body):
+    """
+    Extract file URLs on every slave, including S3 slaves, from TCL update server response.
+
+    :param body: The data to parse.
+    :type body: str
+    """
+    root = ElementTree.fromstring(body)
+    fileinfo = root.find("FILE_LIST").find("FILE")
+    mirrors = []
+    for tag, urltag in (("SLAVE", "DOWNLOAD_URL"), ("S3_SLAVE", "S3_DOWNLOAD_URL")):
+        dlurl = fileinfo.find(urltag)
+        if dlurl is None:
+            continue
+        for slave in root.find("SLAVE_LIST").findall(tag):
+            mirror = "http://{0}{1}".format(slave.text, dlurl.text)
+            if mirror not in mirrors:
+                mirrors.append(mirror)
+    return mirrors
@@ -133,6 +133,40 @@ class TestClassArchiveutilsCompression:
         if os.path.exists("snek.zip"):
             os.remove("snek.zip")
 
+    def test_compress_zip_parallel(self):
+        """
+        Test parallel zip compression, with members split into several blocks.
+        """
+        with open("pzip.bin", "wb") as afile:
+            afile.write(b"".join(bytes([i % 7, i % 251]) * 64 for i in range(4096)))
+        with open("pzip_empty.bin", "wb"):
+            pass
+        ba.pack_zip_parallel("pzip.zip", [("pzip.bin", "a/pzip.bin"), ("pzip_empty.bin", "pzip_empty.bin")], workers=4, block=65536)
+        with zipfile.ZipFile("pzip.zip") as zfile:
+            assert zfile.testzip() is None
+            assert zfile.namelist() == ["a/pzip.bin", "pzip_empty.bin"]
+            with open("pzip.bin", "rb") as afile:
+                assert zfile.read("a/pzip.bin") == afile.read()
+        for file in ("pzip.bin", "pzip_empty.bin", "pzip.zip"):
+            os.remove(file)
+
+    def test_compress_zip_parallel64(self):
+        """
+        Test parallel zip compression, with Zip64 records and a UTF-8 name.
+        """
+        with open("pzip.bin", "wb") as afile:
+            afile.write(b"Jackdaws love my big sphinx of quartz" * 5000)
+        with mock.patch("zipfile.ZIP64_LIMIT", 1000):
+            ba.pack_zip_parallel("pzip.zip", [("pzip.bin", "pzip.bin"), ("pzip.bin", "sph\u00efnx.bin")], workers=2, block=65536)
+        with zipfile.ZipFile("pzip.zip") as zfile:
+            assert zfile.testzip() is None
+            assert zfile.namelist() == ["pzip.bin", "sph\u00efnx.bin"]
+            assert zfile.getinfo("sph\u00efnx.bin").file_size == 185000
+            with open("pzip.bin", "rb") as afile:
+                assert zfile.read("sph\u00efnx.bin") == afile.read()
+        for file in ("pzip.bin", "pzip.zip"):
+            os.remove(file)
+
     def test_compress_zip_fail(self):
         """
         Test zip compression failure.
@@ -70,6 +70,40 @@ class TestClassArgutilsArgs:
             ba.positive_integer(-34)
             assert "is too low" in str(argexc.value)
 
+    def test_bandwidth_rate_good(self):
+        """
+        Test bandwidth limit parsing, best case.
+        """
+        assert ba.bandwidth_rate("512k") == 524288
+        assert ba.bandwidth_rate("1.5M") == 1572864
+        assert ba.bandwidth_rate("4096") == 4096
+        assert ba.bandwidth_rate("0") == 0
+
+    def test_bandwidth_rate_bad(self):
+        """
+        Test bandwidth limit parsing, worst case.
+        """
+        with pytest.raises(argparse.ArgumentError) as argexc:
+            ba.bandwidth_rate("snek")
+            assert "Invalid bandwidth" in str(argexc.value)
+        with pytest.raises(argparse.ArgumentError):
+            ba.bandwidth_rate("-5k")
+
+    def test_shard_spec_good(self):
+        """
+        Test shard spec parsing, best case.
+        """
+        assert ba.shard_spec("2/4") == (2, 4)
+        assert ba.shard_spec("1/1") == (1, 1)
+
+    def test_shard_spec_bad(self):
+        """
+        Test shard spec parsing, worst case.
+        """
+        for shard in ("0/4", "5/4", "snek", "1/2/3"):
+            with pytest.raises(argparse.ArgumentError):
+                ba.shard_spec(shard)
+
     def test_valid_method_good(self):
         """
         Test compression method validity, best case.
@@ -77,3 +77,52 @@ class TestClassCompat:
         with mock.patch('bbarchivist.compat.where_which', mock.MagicMock(return_value="here")):
             with mock.patch('builtins.__import__', mock.MagicMock(side_effect=imp_side_effect)):
                 assert bc.where_which("woodo") == "here"
+
+    def test_replace_file(self):
+        """
+        Test renaming a file over another.
+        """
+        for name in ("old.txt", "new.txt"):
+            with open(name, "w") as afile:
+                afile.write(name)
+        bc.replace_file("new.txt", "old.txt")
+        with open("old.txt") as afile:
+            assert afile.read() == "new.txt"
+        assert not os.path.exists("new.txt")
+
+    def test_replace_file_legacy(self, monkeypatch):
+        """
+        Test renaming a file over another, legacy.
+        """
+        for name in ("old.txt", "new.txt"):
+            with open(name, "w") as afile:
+                afile.write(name)
+        monkeypatch.delattr(os, "replace")
+        monkeypatch.setattr(os, "name", "nt")
+        bc.replace_file("new.txt", "old.txt")
+        monkeypatch.undo()
+        with open("old.txt") as afile:
+            assert afile.read() == "new.txt"
+        os.remove("old.txt")
+
+    def test_stat_mtime_ns(self):
+        """
+        Test modification time in nanoseconds, with and without st_mtime_ns.
+        """
+        assert bc.stat_mtime_ns(mock.MagicMock(st_mtime_ns=1500000000)) == 1500000000
+        assert bc.stat_mtime_ns(mock.MagicMock(spec=["st_mtime"], st_mtime=1.5)) == 1500000000
+
+    def test_terminal_columns(self):
+        """
+        Test terminal width.
+        """
+        with mock.patch("shutil.get_terminal_size", mock.MagicMock(return_value=os.terminal_size((123, 45)))):
+            assert bc.terminal_columns() == 123
+
+    def test_terminal_columns_legacy(self):
+        """
+        Test terminal width, legacy.
+        """
+        with mock.patch.dict("os.environ", {"COLUMNS": "99"}):
+            with mock.patch('builtins.__import__', mock.MagicMock(side_effect=imp_side_effect)):
+                assert bc.terminal_columns() == 99
@@ -28,12 +28,15 @@ def setup_module(module):
     with open("tempfile.txt", "w") as targetfile:
         targetfile.write("Jackdaws love my big sphinx of quartz")
     os.mkdir("skipme")
+    os.mkdir("hashcache")
+    bh.hashcache_setup(homepath=os.path.abspath("hashcache"))
 
 
 def teardown_module(module):
     """
     Delete necessary files.
     """
+    bh.hashcache_setup()
     os.chdir("..")
     rmtree("temp_hashutils", ignore_errors=True)
 
@@ -195,6 +198,214 @@ class TestClassHashutils:
             bh.ssl_hash("tempfile.txt", "whirlpool")
             assert "WHIRLPOOL HASH FAILED" in capsys.readouterr()[0]
 
+    def test_multi_hash(self):
+        """
+        Test hashing a file once with several engines, serially and concurrently.
+        """
+        hashtypes = ("crc32", "md5", "sha1", "sha256")
+        expected = {"crc32": "ed5d3f26", "md5": "822e1187fde7c8d55aff8cc688701650", "sha1": "71dc7ce8f27c11b792be3f169ecf985865e276d0", "sha256": "f118871c45171d5fe4e9049980959e033eeeabcfa12046c243fda310580e8a0b"}
+        with mock.patch("bbarchivist.utilities.cpu_workers", mock.MagicMock(return_value=1)):
+            assert bh.multi_hash("tempfile.txt", hashtypes, 8) == expected
+        with mock.patch("bbarchivist.utilities.cpu_workers", mock.MagicMock(return_value=4)):
+            assert bh.multi_hash("tempfile.txt", hashtypes, 8) == expected
+
+    def test_multi_hash_unavail(self, capsys):
+        """
+        Test hashing a file once, with an engine the SSL library lacks.
+        """
+        with mock.patch("hashlib.new", mock.MagicMock(side_effect=ValueError)):
+            assert bh.multi_hash("tempfile.txt", ("md4", "sha1")) == {"sha1": "71dc7ce8f27c11b792be3f169ecf985865e276d0"}
+            assert "MD4 HASH FAILED" in capsys.readouterr()[0]
+
+    def test_hash_cache(self):
+        """
+        Test persistent hash cache: hits, invalidation on change, bypass and pruning.
+        """
+        with open("cached.bin", "wb") as afile:
+            afile.write(b"Jackdaws love my big sphinx of quartz")
+        os.utime("cached.bin", (1500000000, 1500000000))
+        assert bh.multi_hash("cached.bin", ("sha1",)) == {"sha1": "71dc7ce8f27c11b792be3f169ecf985865e276d0"}
+        bh.HASHCACHE.save()
+        bh.hashcache_setup(homepath=os.path.abspath("hashcache"))
+        with mock.patch("bbarchivist.hashutils.multi_read", mock.MagicMock(return_value={"md5": "snek"})) as reader:
+            assert bh.multi_hash("cached.bin", ("sha1", "md5")) == {"sha1": "71dc7ce8f27c11b792be3f169ecf985865e276d0", "md5": "snek"}
+            reader.assert_called_once_with("cached.bin", ["md5"], 16777216, None)
+            assert bh.multi_hash("cached.bin", ("sha1", "md5")) == {"sha1": "71dc7ce8f27c11b792be3f169ecf985865e276d0", "md5": "snek"}
+            assert reader.call_count == 1
+        os.utime("cached.bin", (1500000001, 1500000001))
+        assert bh.multi_hash("cached.bin", ("md5",)) == {"md5": "822e1187fde7c8d55aff8cc688701650"}
+        bh.HASHCACHE.save()
+        with mock.patch("bbarchivist.hashutils.multi_read", mock.MagicMock(return_value={"md5": "snek"})):
+            bh.hashcache_setup(False, homepath=os.path.abspath("hashcache"))
+            assert bh.multi_hash("cached.bin", ("md5",)) == {"md5": "snek"}
+        bh.hashcache_setup(homepath=os.path.abspath("hashcache"))
+        assert bh.HASHCACHE.read()[bh.HashCache.identity("cached.bin")[0]]["digests"] == {"md5": "822e1187fde7c8d55aff8cc688701650"}
+        os.remove("cached.bin")
+        bh.HASHCACHE.save()
+        assert bh.HASHCACHE.read() == {}
+
+    def test_file_blocks(self):
+        """
+        Test reading a file into a reused buffer, and mapping it.
+        """
+        with mock.patch("bbarchivist.hashutils.MMAP_THRESHOLD", 1 << 40):
+            assert b"".join(bytes(chunk) for chunk in bh.file_blocks("tempfile.txt", 8)) == b"Jackdaws love my big sphinx of quartz"
+        with mock.patch("bbarchivist.hashutils.MMAP_THRESHOLD", 1):
+            assert [bytes(chunk) for chunk in bh.file_blocks("tempfile.txt", 32)] == [b"Jackdaws love my big sphinx of q", b"uartz"]
+            assert bh.zlib_hash("tempfile.txt", "crc32", 8) == "ed5d3f26"
+
+    def test_calibrate(self, capsys):
+        """
+        Test picking and storing the fastest block size.
+        """
+        bh.calibrate_dropcache("tempfile.txt")
+        with mock.patch("bbarchivist.hashutils.MMAP_THRESHOLD", 0):
+            with mock.patch("bbarchivist.hashutils.mapped_blocks", mock.MagicMock(side_effect=AssertionError)):
+                assert sorted(bh.calibrate_blocksize("tempfile.txt", (8, 16))) == [8, 16]
+        assert bh.calibrate_sample(os.getcwd(), 16) == (os.path.join(os.getcwd(), "tempfile.txt"), False)
+        with mock.patch("os.urandom", mock.MagicMock(return_value=b"")):
+            assert bh.calibrate_sample("skipme", 16 * 1024 * 1024) == (os.path.join("skipme", "bbarchivist_calibrate.bin"), True)
+        os.remove(os.path.join("skipme", "bbarchivist_calibrate.bin"))
+        if os.path.exists("bbarchivist.ini"):
+            os.remove("bbarchivist.ini")
+        with mock.patch("bbarchivist.hashutils.calibrate_blocksize", mock.MagicMock(return_value={65536: 100.0, 1048576: 300.0})):
+            with mock.patch("bbarchivist.hashutils.calibrate_sample", mock.MagicMock(return_value=("tempfile.txt", False))):
+                with mock.patch("bbarchivist.hashutils.checksum_benchmark", mock.MagicMock(return_value={})):
+                    with mock.patch("bbarchivist.hashutils.digest_benchmark", mock.MagicMock(return_value={"blake2b": 900.0})):
+                        assert bh.calibrate_main(os.getcwd(), os.getcwd()) == 1048576
+        output = capsys.readouterr()[0]
+        assert "BEST BLOCK SIZE: 1.00MB" in output
+        assert "BLAKE2B: 900.0 MB/s" in output
+        assert bh.verifier_config_loader(os.getcwd())["blocksize"] == 1048576
+        os.remove("bbarchivist.ini")
+
+    def test_verifier_jobs(self):
+        """
+        Test collecting files from several directories, largest first.
+        """
+        with open(os.path.join("skipme", "big.bin"), "wb") as afile:
+            afile.write(b"0" * 4096)
+        jobs = bh.verifier_jobs(["skipme", os.getcwd(), "skipme"])
+        assert jobs[0] == (4096, "skipme", os.path.join("skipme", "big.bin"))
+        assert [job[0] for job in jobs] == sorted((job[0] for job in jobs), reverse=True)
+        assert len([job for job in jobs if job[1] == "skipme"]) == 1
+        assert bh.verifier_engines(4096, 5000, 4) is None
+        assert bh.verifier_engines(100, 5000, 4) == 1
+        os.remove(os.path.join("skipme", "big.bin"))
+
+    def test_verifier_report(self, capsys):
+        """
+        Test printing hashing throughput.
+        """
+        bh.verifier_report(3, 2097152, 2.0)
+        assert "HASHED 3 FILES, 2.00MB IN 2.00s (1.00MB/s)" in capsys.readouterr()[0]
+
+    def test_checksum_backend(self, capsys):
+        """
+        Test picking a CRC32/Adler32 provider, skipping ones that don't match zlib.
+        """
+        import zlib
+        wrong = mock.MagicMock(crc32=lambda data, seed=0: 6, adler32=zlib.adler32)
+        right = mock.MagicMock(crc32=zlib.crc32, adler32=zlib.adler32)
+        backends = (("zlib-ng", "fake_zlib_ng"), ("isa-l", "fake_isal"), ("zlib", "zlib"))
+        with mock.patch.dict("sys.modules", {"fake_zlib_ng": wrong, "fake_isal": right}):
+            with mock.patch("bbarchivist.hashutils.CHECKSUM_BACKENDS", backends), mock.patch("bbarchivist.hashutils.CHECKSUM_BACKEND", []):
+                assert [name for name, module in bh.checksum_available()] == ["isa-l", "zlib"]
+                assert bh.checksum_backend() == ("isa-l", right)
+                assert bh.zlib_hash("tempfile.txt", "crc32") == "ed5d3f26"
+                bh.checksum_report({"isa-l": (4.0, 8.0), "zlib": (1.0, 2.0)})
+        output = capsys.readouterr()[0]
+        assert "ISA-L (IN USE): CRC32 4.00 GB/s, ADLER32 8.00 GB/s" in output
+        assert "ZLIB: CRC32 1.00 GB/s" in output
+
+    def test_checksum_fallback(self):
+        """
+        Test falling back to zlib when no provider imports.
+        """
+        import zlib
+        with mock.patch("bbarchivist.hashutils.CHECKSUM_BACKENDS", (("zlib-ng", "fake_missing_zlib_ng"),)):
+            with mock.patch("bbarchivist.hashutils.CHECKSUM_BACKEND", []):
+                assert bh.checksum_backend() == ("zlib", zlib)
+        assert "zlib" in bh.checksum_benchmark(1024)
+
+    def test_cksum_verify(self, capsys):
+        """
+        Test checking files against existing .cksum files.
+        """
+        os.makedirs("audit", exist_ok=True)
+        for name in ("good.bin", "bad.bin", "gone.bin"):
+            with open(os.path.join("audit", name), "wb") as afile:
+                afile.write(b"Jackdaws love my big sphinx of quartz")
+            with open(os.path.join("audit", name + ".cksum"), "w") as afile:
+                afile.write("CRC32\nED5D3F26 {0}\nSHA1\n71DC7CE8F27C11B792BE3F169ECF985865E276D0 {0}\nBLAH\nDEADBEEF {0}\n".format(name))
+        with open(os.path.join("audit", "bad.bin"), "ab") as afile:
+            afile.write(b"!")
+        os.remove(os.path.join("audit", "gone.bin"))
+        with open(os.path.join("audit", "odd.bin"), "wb") as afile:
+            afile.write(b"Jackdaws love my big sphinx of quartz")
+        with open(os.path.join("audit", "odd.bin.cksum"), "w") as afile:
+            afile.write("MD4\n00000000000000000000000000000000 odd.bin\nBLAH\nDEADBEEF odd.bin\n")
+        assert bh.cksum_parse(os.path.join("audit", "good.bin.cksum")) == {"crc32": ("ED5D3F26", "good.bin"), "sha1": ("71DC7CE8F27C11B792BE3F169ECF985865E276D0", "good.bin"), "blah": ("DEADBEEF", "good.bin")}
+        with mock.patch("hashlib.new", mock.MagicMock(side_effect=ValueError)):
+            assert bh.cksum_check(os.path.join("audit", "odd.bin.cksum")) == ([], ["MD4", "BLAH"], [])
+            failures = bh.cksum_verify(["audit"])
+        assert failures == {os.path.join("audit", "bad.bin.cksum"): ["CRC32", "SHA1"], os.path.join("audit", "gone.bin.cksum"): ["MISSING"]}
+        output = capsys.readouterr()[0]
+        assert "OK: good.bin [SKIPPED: BLAH]" in output
+        assert "FAILED: bad.bin (CRC32, SHA1) [SKIPPED: BLAH]" in output
+        assert "UNVERIFIED: odd.bin (NO SUPPORTED HASHES) [SKIPPED: MD4, BLAH]" in output
+        assert "CHECKED 4 FILES, 2 FAILED, 1 UNVERIFIED" in output
+        with mock.patch("bbarchivist.utilities.cpu_workers", mock.MagicMock(return_value=1)):
+            assert len(bh.cksum_verify(["audit"], failfast=True)) == 1
+        rmtree("audit")
+
+    def test_blake2(self):
+        """
+        Test BLAKE2b/BLAKE2s hashes.
+        """
+        assert bh.multi_hash("tempfile.txt", ("blake2b", "blake2s"), cache=False) == {
+            "blake2b": "9bf3535c37b33f9976b4ea79dcc866c6a7b4df226508e3b1fa91a6ffea8870a0eb781233e9b0122110bb24fd0e69d045df1500a4cc78b38d3f07925694256a04",
+            "blake2s": "bd646914baff66e2ec970975c77fe9b9dcf55e0df5e6e4e65575edd33b4519c8"}
+
+    def test_optional_hash(self):
+        """
+        Test hashes from optional packages, when installed.
+        """
+        fake = mock.MagicMock(xxh3_64=lambda: hashlib.sha1())
+        with mock.patch.dict("sys.modules", {"xxhash": fake}):
+            assert bh.optional_hash("tempfile.txt", "xxh3") == "71dc7ce8f27c11b792be3f169ecf985865e276d0"
+            assert bh.multi_hash("tempfile.txt", ("xxh3",), cache=False) == {"xxh3": "71dc7ce8f27c11b792be3f169ecf985865e276d0"}
+
+    def test_optional_hash_unavail(self, capsys):
+        """
+        Test hashes from optional packages, when not installed.
+        """
+        with mock.patch.dict("sys.modules", {"blake3": None}):
+            bh.optional_hash("tempfile.txt", "blake3")
+            assert "BLAKE3 HASH FAILED" in capsys.readouterr()[0]
+            assert bh.multi_hash("tempfile.txt", ("blake3", "blake2s"), cache=False) == {"blake2s": "bd646914baff66e2ec970975c77fe9b9dcf55e0df5e6e4e65575edd33b4519c8"}
+
+    def test_optional_hash_old(self, capsys):
+        """
+        Test hashes from optional packages, when installed but too old.
+        """
+        with mock.patch.dict("sys.modules", {"xxhash": mock.MagicMock(spec=["xxh64"])}):
+            bh.optional_hash("tempfile.txt", "xxh128")
+            assert "XXH128 HASH FAILED" in capsys.readouterr()[0]
+            assert bh.multi_hash("tempfile.txt", ("xxh3", "blake2s"), cache=False) == {"blake2s": "bd646914baff66e2ec970975c77fe9b9dcf55e0df5e6e4e65575edd33b4519c8"}
+            assert not bh.hash_supported("xxh3")
+            assert sorted(bh.digest_benchmark(("xxh3", "sha1"), 1024)) == ["sha1"]
+
+    def test_digest_benchmark(self, capsys):
+        """
+        Test timing every available hash type.
+        """
+        with mock.patch.dict("sys.modules", {"blake3": None}):
+            results = bh.digest_benchmark(("blake2b", "blake3", "sha1"), 1024)
+        assert sorted(results) == ["blake2b", "sha1"]
+        bh.digest_report({"blake2b": 100.0, "sha1": 200.0})
+        assert capsys.readouterr()[0] == "      SHA1: 200.0 MB/s\n   BLAKE2B: 100.0 MB/s\n"
+
     def test_escreens(self):
         """
         Test EScreens code generation.
@@ -345,6 +556,11 @@ class TestClassHashutilsConfig:
         cls.hashdict['whirlpool'] = False
         cls.hashdict['sha0'] = False
         cls.hashdict['blocksize'] = 16777216
+        cls.hashdict['blake2b'] = False
+        cls.hashdict['blake2s'] = False
+        cls.hashdict['blake3'] = False
+        cls.hashdict['xxh3'] = False
+        cls.hashdict['xxh128'] = False
 
     def test_hash_loader(self):
         """
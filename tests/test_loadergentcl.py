@@ -8,6 +8,11 @@ from shutil import copyfile, rmtree
 import bbarchivist.bbconstants as bc
 import bbarchivist.loadergentcl as bl
 
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
 __author__ = "Thurask"
 __license__ = "WTFPL v2"
 __copyright__ = "2018-2019 Thurask"
@@ -162,3 +167,70 @@ class TestClassLoadergentcl:
         assert bl.generate_tclloader_scripttype("thesearethedaysofmiracleandwonder")[0] == None
         assert bl.generate_tclloader_platmbn("thesearethedaysofmiracleandwonder")[0] == None
         assert bl.generate_tclloader_platother("thesearethedaysofmiracleandwonder")[0] == None
+
+    def test_stage_link(self):
+        """
+        Test staging a file as a hardlink.
+        """
+        bl.stage_file("smack.dat", "smack_link.dat")
+        assert os.path.samefile("smack.dat", "smack_link.dat")
+
+    def test_stage_range(self):
+        """
+        Test staging a file with an in-kernel copy, when linking and cloning fail.
+        """
+        with mock.patch("bbarchivist.loadergentcl.stage_link", mock.MagicMock(return_value=False)):
+            with mock.patch("bbarchivist.loadergentcl.stage_clone", mock.MagicMock(return_value=False)):
+                bl.stage_file("smack.dat", "smack_range.dat")
+        assert not os.path.samefile("smack.dat", "smack_range.dat")
+        with open("smack_range.dat") as afile:
+            assert afile.read() == "The quick brown fox jumps over the lazy dog"
+
+    def test_stage_fallback(self):
+        """
+        Test staging a file with a plain copy, when everything else fails.
+        """
+        with mock.patch("bbarchivist.loadergentcl.stage_link", mock.MagicMock(return_value=False)):
+            with mock.patch("bbarchivist.loadergentcl.stage_clone", mock.MagicMock(return_value=False)):
+                with mock.patch("bbarchivist.loadergentcl.stage_range", mock.MagicMock(return_value=False)):
+                    bl.stage_file("smack.dat", "smack_copy.dat")
+        assert not os.path.samefile("smack.dat", "smack_copy.dat")
+        assert os.path.getsize("smack_copy.dat") == os.path.getsize("smack.dat")
+        assert not os.path.exists("smack_copy.dat.staging")
+
+    def test_stage_twice(self):
+        """
+        Test staging onto an existing target, including a hardlink to the source, without truncating the source.
+        """
+        os.makedirs("stagetwice", exist_ok=True)
+        copyfile("smack.dat", "stagesrc.dat")
+        size = os.path.getsize("stagesrc.dat")
+        bl.point_point_copy(os.getcwd(), "stagetwice", "stagesrc.dat")
+        bl.point_point_copy(os.getcwd(), "stagetwice", "stagesrc.dat")
+        assert os.path.getsize("stagesrc.dat") == size
+        with mock.patch("bbarchivist.loadergentcl.stage_link", mock.MagicMock(return_value=False)):
+            bl.point_point_copy(os.getcwd(), "stagetwice", "stagesrc.dat")
+        assert os.path.getsize("stagesrc.dat") == size
+        bl.point_point_copy(os.getcwd(), "stagetwice", "stagesrc.dat", stage=False)
+        assert os.path.getsize("stagesrc.dat") == size
+        assert not os.path.samefile("stagesrc.dat", os.path.join("stagetwice", "stagesrc.dat"))
+        assert os.listdir("stagetwice") == ["stagesrc.dat"]
+
+    def test_tclloader_stream(self):
+        """
+        Test generating loader straight from template zip, matching the extracted layout.
+        """
+        with zipfile.ZipFile("template.zip", "w") as zfile:
+            for root, _, files in os.walk("autoloader-signed"):
+                for file in files:
+                    abs_filename = os.path.join(root, file)
+                    zfile.write(abs_filename, os.path.relpath(abs_filename, "autoloader-signed").replace(os.sep, "/"))
+        with zipfile.ZipFile("template.zip") as zfile:
+            assert bl.stream_platform(zfile.namelist()) == "bbry_qc8953"
+        bl.generate_tclloader("autoloader-signed", "snekx", "bbry_qc8953", localtools=True)
+        bl.generate_tclloader_stream("template.zip", "sneks", "bbry_qc8953", localtools=True)
+        extracted = sorted(os.path.relpath(os.path.join(root, file), "snekx") for root, _, files in os.walk("snekx") for file in files)
+        streamed = sorted(os.path.relpath(os.path.join(root, file), "sneks") for root, _, files in os.walk("sneks") for file in files)
+        assert streamed == extracted
+        assert os.path.join("img", "boot.imgsprint.sig") in streamed
+        assert os.path.join("host", "fastboot.exe") in streamed
@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 """Test the networkutils module."""
 
+import concurrent.futures
 import os
-from hashlib import sha512
+import threading
+import time
+from hashlib import sha1, sha512
 from shutil import rmtree
 
 import bbarchivist.networkutils as bn
 import httmock
+import pytest
 import requests
 
 try:
@@ -63,6 +67,43 @@ def download_mock(url, request):
     return httmock.response(status_code=200, content=content, headers=headers)
 
 
+@httmock.all_requests
+def download_mock_ranged(url, request):
+    """
+    HTTMock mock for downloading in byte ranges.
+    """
+    content = b"Jackdaws love my big sphinx of quartz" * 5000
+    if request.method == "HEAD":
+        headers = {'content-length': len(content), 'accept-ranges': 'bytes'}
+        return httmock.response(status_code=200, headers=headers)
+    start, end = request.headers["Range"].replace("bytes=", "").split("-")
+    content = content[int(start):int(end) + 1]
+    headers = {'content-length': len(content)}
+    return httmock.response(status_code=206, content=content, headers=headers)
+
+
+@httmock.all_requests
+def download_mock_norange(url, request):
+    """
+    HTTMock mock for downloading, from a server that claims byte range support but ignores ranges.
+    """
+    content = b"Jackdaws love my big sphinx of quartz" * 5000
+    headers = {'content-length': len(content)}
+    if request.method == "HEAD":
+        headers['accept-ranges'] = 'bytes'
+    return httmock.response(status_code=200, content=content, headers=headers)
+
+
+@httmock.all_requests
+def download_mock_mirrors(url, request):
+    """
+    HTTMock mock for downloading from mirrors, one of them broken.
+    """
+    if "broken" in request.url:
+        return httmock.response(status_code=503)
+    return download_mock_ranged(url, request)
+
+
 @httmock.all_requests
 def download_mock_fail(url, request):
     """
@@ -297,6 +338,17 @@ def md_base_mock(url, request):
     return {'status_code': 200, 'content': thebody}
 
 
+@httmock.all_requests
+def md_etag_mock(url, request):
+    """
+    Mock for metadata lookup, with conditional requests.
+    """
+    if request.headers.get("If-None-Match") == '"snek"':
+        return httmock.response(status_code=304)
+    thebody = b'bbndkext,10.2.0.1155,ndktargetrepo\nbbndkext,10.3.0.1172,ndktargetrepo\nbbndkext,10.2.1.1940,ndktargetrepo'
+    return httmock.response(status_code=200, content=thebody, headers={"ETag": '"snek"'})
+
+
 @httmock.all_requests
 def da_mock(url, request):
     """
@@ -308,6 +360,19 @@ def da_mock(url, request):
     return httmock.response(status_code=code, headers=headers)
 
 
+#: Hashed software releases that are live, 10.3.2.2000 to 10.3.2.2500, every 5 builds.
+SW_LIVE = {sha1("10.3.2.{0}".format(build).encode("utf-8")).hexdigest() for build in range(2000, 2501, 5)}
+
+
+@httmock.all_requests
+def sw_gallop_mock(url, request):
+    """
+    Mock for software release searching.
+    """
+    code = 200 if request.url.split("/")[-1] in SW_LIVE else 404
+    return httmock.response(status_code=code)
+
+
 @httmock.all_requests
 def timeout_mock(url, request):
     """
@@ -411,6 +476,87 @@ class TestClassNetworkutils:
                     else:
                         break
 
+    def test_download_bootstrap_ranged(self, capsys):
+        """
+        Test multiple downloading, with big file split into ranges.
+        """
+        urllist = ["http://google.com/{0}.dat".format(i) for i in ["idle", "cleese"]]
+        with mock.patch("bbarchivist.networkutils.RANGE_MINIMUM", 20000):
+            with httmock.HTTMock(download_mock_ranged):
+                bn.download_bootstrap(urllist, workers=4)
+        out, err = capsys.readouterr()
+        assert "ACTUAL MAKESPAN" in out
+        assert '"bytes": 370000' in err
+        for file in ["idle.dat", "cleese.dat"]:
+            with open(file, 'rb') as filehandle:
+                assert sha512(filehandle.read()).hexdigest() == "02c25df184ba5ed0eb7faa43b61fc2d0752a8230cc23d3f3085af55919198f83d1664277c6c4c00d78c0f95528fe8ab9f6dc145b8f9cc4b9a0f24482a1630bd9"
+            os.remove(file)
+
+    def test_download_bootstrap_norange(self, capsys):
+        """
+        Test multiple downloading, with failed ranges retried as whole files.
+        """
+        urllist = ["http://google.com/{0}.dat".format(i) for i in ["idle", "cleese"]]
+        with mock.patch("bbarchivist.networkutils.RANGE_MINIMUM", 20000):
+            with httmock.HTTMock(download_mock_norange):
+                bn.download_bootstrap(urllist, workers=4)
+        out = capsys.readouterr()[0]
+        assert "HTTP 200" in out
+        assert "RANGES FAILED, RETRYING" in out
+        for file in ["idle.dat", "cleese.dat"]:
+            with open(file, 'rb') as filehandle:
+                assert sha512(filehandle.read()).hexdigest() == "02c25df184ba5ed0eb7faa43b61fc2d0752a8230cc23d3f3085af55919198f83d1664277c6c4c00d78c0f95528fe8ab9f6dc145b8f9cc4b9a0f24482a1630bd9"
+            os.remove(file)
+
+    def test_download_bootstrap_raise(self):
+        """
+        Test multiple downloading, with a job raising an exception.
+        """
+        urllist = ["http://google.com/{0}.dat".format(i) for i in ["idle", "cleese"]]
+        with mock.patch("bbarchivist.networkutils.download", mock.MagicMock(side_effect=ValueError)):
+            with httmock.HTTMock(download_mock):
+                with pytest.raises(ValueError):
+                    bn.download_bootstrap(urllist, workers=2)
+
+    def test_download_mirrored(self):
+        """
+        Test downloading one file from several mirrors.
+        """
+        mirrors = ["http://{0}.com/sphinx.bin".format(host) for host in ("fast", "broken", "slow")]
+        with httmock.HTTMock(download_mock_mirrors):
+            stats, complete = bn.download_mirrored(mirrors, 185000, "sphinx.dat", segment=10000)
+        assert complete
+        assert stats["http://broken.com/sphinx.bin"] == 0
+        assert sum(stats.values()) == 185000
+        with open("sphinx.dat", "rb") as afile:
+            assert sha512(afile.read()).hexdigest() == "02c25df184ba5ed0eb7faa43b61fc2d0752a8230cc23d3f3085af55919198f83d1664277c6c4c00d78c0f95528fe8ab9f6dc145b8f9cc4b9a0f24482a1630bd9"
+        os.remove("sphinx.dat")
+
+    def test_download_mirrored_fail(self):
+        """
+        Test downloading one file from several mirrors, all broken.
+        """
+        mirrors = ["http://broken{0}.com/sphinx.bin".format(idx) for idx in range(2)]
+        with httmock.HTTMock(download_mock_mirrors):
+            stats, complete = bn.download_mirrored(mirrors, 185000, "sphinx.dat", segment=10000)
+        assert not complete
+        assert not any(stats.values())
+        os.remove("sphinx.dat")
+
+    def test_download_plan(self):
+        """
+        Test largest-first download planning.
+        """
+        sizes = {"http://a.com/big.bin": (2**30, True), "http://a.com/one.bin": (30 * 2**20, False), "http://a.com/two.bin": (31 * 2**20, True)}
+        with mock.patch("bbarchivist.networkutils.get_head_info", mock.MagicMock(side_effect=lambda url, session: sizes[url])):
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as xec:
+                jobs = bn.download_plan(list(sizes), 3, xec)
+        assert len(jobs) == 5
+        assert [job[3] for job in jobs] == sorted((job[3] for job in jobs), reverse=True)
+        assert sum(job[3] for job in jobs if job[0] == "http://a.com/big.bin") == 2**30
+        assert jobs[-1][1] is None
+        assert bn.download_makespan(jobs, 3) < 2**30 // 2
+
     def test_download_bootstrap_fail(self):
         """
         Test multiple downloading, worst case.
@@ -476,6 +622,238 @@ class TestClassNetworkutils:
         with mock.patch("bbarchivist.networkutils.devalpha_urls_bulk", mock.MagicMock(side_effect=KeyboardInterrupt)):
             bn.devalpha_urls_bootstrap("10.2.3.4567", skels)
 
+    def test_sw_gallop_points(self):
+        """
+        Test exponential build spacing.
+        """
+        assert bn.sw_gallop_points(2000, 2020) == [2000, 2001, 2002, 2004, 2008, 2016]
+
+    def test_sw_split_points(self):
+        """
+        Test splitting a build range.
+        """
+        assert bn.sw_split_points(0, 100, 3) == [25, 50, 75]
+        assert bn.sw_split_points(10, 12, 5) == [11]
+
+    def test_sw_gallop_search(self):
+        """
+        Test searching for latest software release.
+        """
+        with httmock.HTTMock(sw_gallop_mock):
+            assert bn.sw_gallop_search("10.3.2.2000", sparsity=8) == "10.3.2.2500"
+            assert bn.sw_gallop_search("10.3.2.2003", ceiling=2300, sparsity=6) == "10.3.2.2300"
+
+    def test_sw_gallop_search_fail(self):
+        """
+        Test searching for latest software release, nothing available.
+        """
+        with httmock.HTTMock(sw_gallop_mock):
+            assert bn.sw_gallop_search("10.3.2.3000", ceiling=3100) is None
+
+    def test_sw_gallop_search_sparse(self):
+        """
+        Test searching for latest software release, with exactly sparsity dead builds between live ones.
+        """
+        assert bn.sw_window_live(2001, 4, 9999, {2000: True, 2005: True})
+        assert list(bn.sw_window(2498, 4, 2500)) == [2498, 2499, 2500]
+        with httmock.HTTMock(sw_gallop_mock):
+            assert bn.sw_gallop_search("10.3.2.2000", sparsity=4) == "10.3.2.2500"
+
+
+    def test_singleflight_coalesce(self):
+        """
+        Test sharing one call between identical concurrent requests.
+        """
+        calls = []
+
+        def slowcall(url):
+            """
+            Count calls, take a while.
+            """
+            calls.append(url)
+            time.sleep(0.2)
+            return len(url)
+        flights = bn.SingleFlight()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do(("slow", "snek"), slowcall, "snek"))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == ["snek"]
+        assert results == [4] * 5
+        assert not flights.inflight
+        assert not flights.results
+
+    def test_singleflight_error(self):
+        """
+        Test that failed calls are not memoized.
+        """
+        flights = bn.SingleFlight()
+        flights.begin()
+        with pytest.raises(ValueError):
+            flights.do(("bad", "snek"), mock.MagicMock(side_effect=ValueError))
+        assert flights.do(("bad", "snek"), mock.MagicMock(return_value=42)) == 42
+        with pytest.raises(KeyboardInterrupt):
+            flights.do(("stop", "snek"), mock.MagicMock(side_effect=KeyboardInterrupt))
+        assert ("stop", "snek") not in flights.results
+        assert flights.do(("stop", "snek"), mock.MagicMock(return_value=42)) == 42
+        flights.end()
+
+    def test_memoize_run(self):
+        """
+        Test memoizing HEAD requests for the duration of a run.
+        """
+        hits = []
+
+        @httmock.all_requests
+        def count_mock(url, request):
+            """
+            Count requests.
+            """
+            hits.append(request.url)
+            return httmock.response(status_code=200, headers={'content-length': '525600'})
+
+        @bn.memoize_run
+        def runner():
+            """
+            Check the same URL several times.
+            """
+            for _ in range(3):
+                assert bn.availability("http://qrrbrbirlbel.yu/snek")
+                assert bn.get_length("http://qrrbrbirlbel.yu/snek") == 525600
+        with httmock.HTTMock(count_mock):
+            runner()
+            assert len(hits) == 2
+            assert not bn.FLIGHTS.results
+            bn.availability("http://qrrbrbirlbel.yu/snek")
+            bn.availability("http://qrrbrbirlbel.yu/snek")
+            assert len(hits) == 4
+
+    def test_token_bucket_unlimited(self):
+        """
+        Test bandwidth limiting, no limit.
+        """
+        bucket = bn.TokenBucket()
+        assert bucket.consume(10 ** 9) == 0
+
+    def test_token_bucket_limited(self):
+        """
+        Test bandwidth limiting, with limit.
+        """
+        bucket = bn.TokenBucket(1048576)
+        with mock.patch("time.sleep", mock.MagicMock()) as sleeper:
+            assert bucket.consume(1048576) == 0
+            delay = bucket.consume(524288)
+            assert 0.45 < delay <= 0.5
+            delay2 = bucket.consume(524288)
+            assert 0.95 < delay2 <= 1.0
+            assert sleeper.call_count == 2
+
+    def test_bandwidth_config(self):
+        """
+        Test reading/writing bandwidth limit.
+        """
+        try:
+            os.remove("bbarchivist.ini")
+        except (OSError, IOError):
+            pass
+        with mock.patch('bbarchivist.iniconfig.config_homepath', mock.MagicMock(return_value=os.getcwd())):
+            assert bn.bandwidth_config_loader() == 0
+            bn.bandwidth_config_writer(524288)
+            assert bn.bandwidth_config_loader() == 524288
+            bn.bandwidth_setup()
+            assert bn.BANDWIDTH.rate == 524288
+            bn.bandwidth_setup(0)
+            assert bn.BANDWIDTH.rate == 0
+            bn.bandwidth_config_writer("2M")
+            assert bn.bandwidth_config_loader() == 2097152
+
+    def test_worker_tuner_grow(self):
+        """
+        Test worker tuning, rising then flat throughput.
+        """
+        tuner = bn.WorkerTuner(2, 4)
+        with tuner.cond:
+            tuner.adjust(100)
+            assert tuner.limit == 3
+            tuner.adjust(200)
+            assert tuner.limit == 4
+            tuner.adjust(300)
+            assert tuner.limit == 4
+            tuner.adjust(301)
+            assert tuner.limit == 4
+            assert tuner.best == 4
+            assert not tuner.growing
+
+    def test_worker_tuner_plateau(self):
+        """
+        Test worker tuning, settling on best count.
+        """
+        tuner = bn.WorkerTuner(2, 16)
+        with tuner.cond:
+            tuner.adjust(100)
+            tuner.adjust(150)
+            tuner.adjust(151)
+            assert tuner.limit == 3
+            assert tuner.best == 3
+            tuner.adjust(500)
+            assert tuner.limit == 3
+
+    def test_worker_tuner_error(self):
+        """
+        Test worker tuning, backing off on errors.
+        """
+        tuner = bn.WorkerTuner(3, 16)
+        tuner.error()
+        with tuner.cond:
+            tuner.adjust(100)
+        assert tuner.limit == 2
+        assert tuner.best == 2
+        assert not tuner.growing
+
+    def test_worker_tuner_disabled(self):
+        """
+        Test worker tuning, when off.
+        """
+        tuner = bn.WorkerTuner()
+        tuner.tally(100)
+        tuner.error()
+        for _ in range(50):
+            tuner.acquire()
+        assert tuner.count == 0
+        assert tuner.errors == 0
+
+    def test_workers_host(self):
+        """
+        Test finding most common download host.
+        """
+        urls = ["http://a.com/1.bar", "http://b.com:8080/2.bar", "http://b.com/3.bar"]
+        assert bn.workers_host(urls) == "b.com"
+
+    def test_workers_bootstrap(self, capsys):
+        """
+        Test multiple downloading, with worker tuning.
+        """
+        try:
+            os.remove("bbarchivist.ini")
+        except (OSError, IOError):
+            pass
+        urllist = ["http://google.com/{0}.dat".format(i) for i in ["idle", "cleese", "gilliam"]]
+        with mock.patch('bbarchivist.iniconfig.config_homepath', mock.MagicMock(return_value=os.getcwd())):
+            bn.workers_config_writer("google.com", 6)
+            bn.workers_setup(True)
+            with httmock.HTTMock(download_mock):
+                bn.download_bootstrap(urllist, workers=2)
+            bn.workers_setup(False)
+            assert bn.workers_config_loader("google.com") == 6
+            assert bn.workers_config_loader("bing.com") == 0
+        assert "DOWNLOAD WORKERS: 6 FOR google.com" in capsys.readouterr()[0]
+        assert not bn.TUNER.limit
+        for file in ["idle.dat", "cleese.dat", "gilliam.dat"]:
+            os.remove(file)
+
+
 class TestClassNetworkutilsParsing:
     """
     Test functions that require parsing of XML/HTML.
@@ -753,19 +1131,69 @@ class TestClassNetworkutilsParsing:
         """
         Test grabbing old-style metadata.
         """
-        with httmock.HTTMock(md_base_mock):
-            results = bn.ndk_metadata()
-            assert "1940" in results[1]
+        with mock.patch("bbarchivist.iniconfig.config_homepath", mock.MagicMock(return_value=os.getcwd())):
+            with httmock.HTTMock(md_base_mock):
+                results = bn.ndk_metadata()
+        assert "1940" in results[1]
 
     def test_metadata_new(self):
         """
         Test grabbing new-style metadata, simulator.
         """
-        with httmock.HTTMock(md_base_mock):
-            res1 = bn.sim_metadata()
-            assert "1172" in res1[1]
-            res2 = bn.runtime_metadata()
-            assert "1155" in res2[0]
+        with mock.patch("bbarchivist.iniconfig.config_homepath", mock.MagicMock(return_value=os.getcwd())):
+            with httmock.HTTMock(md_base_mock):
+                res1 = bn.sim_metadata()
+                res2 = bn.runtime_metadata()
+        assert "1172" in res1[1]
+        assert "1155" in res2[0]
+
+    def test_loader_bootstrap(self):
+        """
+        Test loader checking, both pages, with change detection.
+        """
+        if os.path.exists("loaders.json"):
+            os.remove("loaders.json")
+        with httmock.HTTMock(ls_mock):
+            records, fresh = bn.loader_page_bootstrap(homepath=os.getcwd())
+            assert len(records) == 2
+            assert records == fresh
+            assert records[0] == {"group": "BlackBerry DTEK50", "device": "BlackBerry common SW for STH100-1 & STH100-2 devices", "version": "AAG326", "link": "https://bbapps.download.blackberry.com/Priv/bbry_qc8952_64_sfi_autoloader_user-common-AAG326.zip"}
+            assert records[1]["version"] == "AAK399"
+            with mock.patch("bbarchivist.networkutils.loader_page_records_og", mock.MagicMock(side_effect=AssertionError)):
+                records2, fresh2 = bn.loader_page_bootstrap(homepath=os.getcwd())
+        assert records2 == records
+        assert not fresh2
+        os.remove("loaders.json")
+
+    def test_metadata_bootstrap(self):
+        """
+        Test grabbing all metadata feeds at once.
+        """
+        with mock.patch("bbarchivist.iniconfig.config_homepath", mock.MagicMock(return_value=os.getcwd())):
+            with httmock.HTTMock(md_base_mock):
+                results = bn.metadata_bootstrap()
+        assert results[None] == ["10.2.0.1155", "10.2.1.1940"]
+        assert "10.3.0.1172" in results["simulator"]
+        assert len(results["runtime"]) == 3
+
+    def test_cached_get(self):
+        """
+        Test conditional GET with cache.
+        """
+        if os.path.exists("http"):
+            rmtree("http")
+        url = bn.base_metadata_url("runtime")
+        with mock.patch("bbarchivist.iniconfig.config_homepath", mock.MagicMock(return_value=os.getcwd())):
+            with httmock.HTTMock(md_etag_mock):
+                first = bn.cached_get(url)
+                body, meta = bn.cache_load(url)
+                assert body == first
+                assert meta["etag"] == '"snek"'
+                assert bn.cached_get(url) == first
+            with httmock.HTTMock(md_base_mock):
+                assert bn.cached_get("http://google.com/uncached") == first
+                assert bn.cache_load("http://google.com/uncached") == (None, {})
+        rmtree("http")
 
     def test_loader_scraper(self, capsys):
         """
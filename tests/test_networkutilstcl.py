@@ -9,6 +9,11 @@ import bbarchivist.xmlutilstcl as bx
 import httmock
 import requests
 
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
 __author__ = "Thurask"
 __license__ = "WTFPL v2"
 __copyright__ = "2018-2019 Thurask"
@@ -117,6 +122,72 @@ class TestClassNetworkutilstcl:
         assert fsize == "2712821341"
         assert fhash == "97a9f933c70fbe7c106037aaba19c6aedd9136d2"
 
+    def test_master_slot(self):
+        """
+        Test per-master request slots.
+        """
+        slot = bn.master_slot("http://g2master-us-east.tctmobile.com/check.php")
+        assert slot is bn.master_slot("http://g2master-us-east.tctmobile.com/download_request.php")
+        assert slot is not bn.master_slot("http://g2master-eu-west.tctmobile.com/check.php")
+        for _ in range(bn.MASTER_CONNECTIONS):
+            assert slot.acquire(blocking=False)
+        assert not slot.acquire(blocking=False)
+        for _ in range(bn.MASTER_CONNECTIONS):
+            slot.release()
+
+    def test_master_picker_sticky(self):
+        """
+        Test master selection, same master per session.
+        """
+        picker = bn.MasterPicker(("a.com", "b.com", "c.com"))
+        sess, sess2 = requests.Session(), requests.Session()
+        host = picker.pick(sess)
+        assert all(picker.pick(sess) == host for _ in range(10))
+        picker.pick(sess2)
+        assert len(picker.sticky) == 2
+
+    def test_master_picker_health(self):
+        """
+        Test master selection, preferring fast masters, demoting failing ones, re-probing.
+        """
+        picker = bn.MasterPicker(("a.com", "b.com", "c.com"), reprobe=3600)
+        for host, latency in (("a.com", 0.5), ("b.com", 0.1), ("c.com", 0.3)):
+            picker.begin(host)
+            picker.end(host, latency)
+        sess = requests.Session()
+        assert picker.pick(sess) == "b.com"
+        picker.begin("b.com")
+        picker.end("b.com", error=True)
+        assert not picker.healthy("b.com")
+        assert picker.pick(sess) == "c.com"
+        assert picker.pick() == "c.com"
+        picker.stats["b.com"]["failed"] -= 3600
+        assert picker.pick() == "b.com"
+        assert picker.pick() == "c.com"
+        picker.begin("b.com")
+        picker.end("b.com", 0.1)
+        assert picker.healthy("b.com")
+
+    def test_master_picker_saturated(self):
+        """
+        Test master selection, spilling over when a master has no free slots.
+        """
+        picker = bn.MasterPicker(("a.com", "b.com"))
+        sess = requests.Session()
+        host = picker.pick(sess)
+        for _ in range(bn.MASTER_CONNECTIONS):
+            picker.begin(host)
+        assert picker.pick(sess) != host
+        picker.end(host)
+        assert picker.pick(sess) == host
+
+    def test_tcl_scan_session(self):
+        """
+        Test session for concurrent scanning.
+        """
+        sess = bn.tcl_scan_session()
+        assert sess.get_adapter("http://g2master-us-east.tctmobile.com")._pool_maxsize == bn.MASTER_CONNECTIONS
+
     def test_tcl_check_fail(self):
         """
         Test checking for Android updates, worst case.
@@ -157,6 +228,21 @@ class TestClassNetworkutilstcl:
         del encslave
         assert "/ce570ddc079e2744558f191895e524d02a60476f/cfcdde91ea7f810311d1f973726e390f77a9ff1b/258098/261497" in dlurl
 
+    def test_tcl_request_mirrors(self):
+        """
+        Test getting Android update URLs on every mirror.
+        """
+        with httmock.HTTMock(tcl_request_mock):
+            salt = bn.tcl_salt()
+            vkh = bn.vkhash("PRD-63764-001", "AAM693", "258098", salt)
+            utxt = bn.tcl_download_request("PRD-63764-001", "AAM693", "258098", salt, vkh)
+        mirrors = bx.parse_tcl_download_mirrors(utxt)
+        assert len(mirrors) == 3
+        assert mirrors[0] == "http://g2slave-ap-north-01.tctmobile.com/ce570ddc079e2744558f191895e524d02a60476f/cfcdde91ea7f810311d1f973726e390f77a9ff1b/258098/261497"
+        with httmock.HTTMock(tcl_request_mocks3):
+            utxt = bn.tcl_download_request("PRD-63764-001", "AAM693", "258098", salt, vkh)
+        assert len(bx.parse_tcl_download_mirrors(utxt)) == 3
+
     def test_tcl_request_fail(self):
         """
         Test checking for Android update URLs, worst case.
@@ -188,5 +274,20 @@ class TestClassNetworkutilstcl:
         Test getting remote PRD info.
         """
         with httmock.HTTMock(remote_prd_mock):
-            sentinel = bn.remote_prd_info()
+            sentinel = bn.remote_prd_info(homepath=os.getcwd())
         assert sentinel == {"PRD-63999-999": "AAZ888"}
+        os.remove("remote_prd.json")
+
+    def test_remote_prd_cache(self):
+        """
+        Test getting remote PRD info, cached.
+        """
+        with httmock.HTTMock(remote_prd_mock):
+            bn.remote_prd_info(homepath=os.getcwd())
+        with mock.patch("requests.Session.get", mock.MagicMock(side_effect=AssertionError)):
+            assert bn.remote_prd_info(homepath=os.getcwd()) == {"PRD-63999-999": "AAZ888"}
+        cache = bn.remote_prd_load(os.getcwd())
+        bn.remote_prd_store(dict(cache, map={"PRD-63999-999": "UNPARSED"}), os.getcwd())
+        with httmock.HTTMock(remote_prd_mock):
+            assert bn.remote_prd_info(ttl=0, homepath=os.getcwd()) == {"PRD-63999-999": "UNPARSED"}
+        os.remove("remote_prd.json")
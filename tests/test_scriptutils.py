@@ -6,6 +6,7 @@ import time
 import zipfile
 from shutil import copyfile, rmtree
 
+import bbarchivist.hashutils as bh
 import bbarchivist.scriptutils as bs
 import httmock
 import pytest
@@ -27,6 +28,8 @@ def setup_module(module):
     if not os.path.exists("temp_scriptutils"):
         os.mkdir("temp_scriptutils")
     os.chdir("temp_scriptutils")
+    os.mkdir("hashcache")
+    bh.hashcache_setup(homepath=os.path.abspath("hashcache"))
     with open("Z10_loader1.exe", "w") as targetfile:
         targetfile.write("Jackdaws love my big sphinx of quartz")
     copyfile("Z10_loader1.exe", "Z10_loader2.exe")
@@ -40,6 +43,7 @@ def teardown_module(module):
     """
     Delete necessary files.
     """
+    bh.hashcache_setup()
     os.chdir("..")
     rmtree("temp_scriptutils", ignore_errors=True)
 
@@ -854,9 +858,9 @@ class TestClassScriptutilsHash:
         Test flag-based per-folder hashing.
         """
         dirs = (os.getcwd(), os.getcwd(), os.getcwd(), os.getcwd(), os.getcwd(), os.getcwd())
-        with mock.patch('bbarchivist.hashutils.verifier', mock.MagicMock(side_effect=None)):
-            bs.bulk_hash(dirs, True, False, True)
-            assert True
+        with mock.patch('bbarchivist.hashutils.verifier_bulk', mock.MagicMock(side_effect=None)) as bulker:
+            bs.bulk_hash(dirs, True, False, False, {"sha1": True})
+        bulker.assert_called_once_with([os.getcwd(), os.getcwd()], {"sha1": True})
 
 
 class TestClassScriptutilsInfo:
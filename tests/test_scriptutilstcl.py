@@ -2,11 +2,12 @@
 """Test the scriptutilstcl module."""
 
 import os
+import time
 from shutil import rmtree
 
 import bbarchivist.scriptutilstcl as bs
 import pytest
-from requests import Session
+from requests import ConnectionError, Session
 
 try:
     import unittest.mock as mock
@@ -90,10 +91,40 @@ class TestClassScriptutilstcl:
                             with mock.patch("bbarchivist.networkutils.getcode", mock.MagicMock(return_value=200)):
                                 with mock.patch("bbarchivist.networkutils.download", mock.MagicMock(side_effect=None)):
                                     with mock.patch("os.rename", mock.MagicMock(side_effect=None)):
-                                        with mock.patch("bbarchivist.hashutils.hashlib_hash", mock.MagicMock(return_value=6)):
+                                        with mock.patch("bbarchivist.hashutils.multi_hash", mock.MagicMock(return_value={"sha1": 6})):
                                             bs.tcl_prd_scan("PRD-63116-001", download=True)
                                             assert "HASH CHECK OK" in capsys.readouterr()[0]
 
+    def test_tcl_download_mirrors(self, capsys):
+        """
+        Test downloading a file from several mirrors, and verifying it.
+        """
+        stats = ({"http://a.com/update.zip": 4, "http://b.com/update.zip": 2}, True)
+        with mock.patch("bbarchivist.networkutils.download_mirrored", mock.MagicMock(return_value=stats)) as dler:
+            with mock.patch("os.rename", mock.MagicMock(side_effect=None)):
+                with mock.patch("bbarchivist.hashutils.multi_hash", mock.MagicMock(return_value={"sha1": 6})):
+                    bs.tcl_download("http://a.com/update.zip", "snek.zip", "6", 6, False, list(stats[0]))
+        dler.assert_called_once_with(list(stats[0]), 6, "update.zip")
+        output = capsys.readouterr()[0]
+        assert "a.com: 4.00B" in output
+        assert "HASH CHECK OK" in output
+
+    def test_tcl_download_mirrors_fail(self, capsys):
+        """
+        Test downloading a file from several mirrors, all broken.
+        """
+        with open("update.zip", "wb") as afile:
+            afile.write(b"\x00" * 6)
+        stats = ({"http://a.com/update.zip": 0, "http://b.com/update.zip": 0}, False)
+        with mock.patch("bbarchivist.networkutils.download_mirrored", mock.MagicMock(return_value=stats)):
+            with mock.patch("os.rename", mock.MagicMock(side_effect=None)) as mover:
+                bs.tcl_download("http://a.com/update.zip", "snek.zip", "6", 6, False, list(stats[0]))
+        output = capsys.readouterr()[0]
+        assert "ALL MIRRORS FAILED!" in output
+        assert "DOWNLOAD COMPLETE" not in output
+        assert not mover.called
+        assert not os.path.exists("update.zip")
+
     def test_tcl_prd_scan_dlfail(self, capsys):
         """
         Test scanning a PRD, downloading a file, and failing.
@@ -106,7 +137,7 @@ class TestClassScriptutilstcl:
                             with mock.patch("bbarchivist.networkutils.getcode", mock.MagicMock(return_value=200)):
                                 with mock.patch("bbarchivist.networkutils.download", mock.MagicMock(side_effect=None)):
                                     with mock.patch("os.rename", mock.MagicMock(side_effect=None)):
-                                        with mock.patch("bbarchivist.hashutils.hashlib_hash", mock.MagicMock(return_value=7)):
+                                        with mock.patch("bbarchivist.hashutils.multi_hash", mock.MagicMock(return_value={"sha1": 7})):
                                             bs.tcl_prd_scan("PRD-63116-001", download=True)
                                             assert "HASH FAILED" in capsys.readouterr()[0]
 
@@ -133,6 +164,77 @@ class TestClassScriptutilstcl:
             bs.tcl_findprd(prddict, floor=0, ceiling=111)
             assert "PRD-63119-001:" not in capsys.readouterr()[0]
 
+    def test_tcl_newprd_candidates(self):
+        """
+        Test collecting PRDs to scan, with shards.
+        """
+        prddict = bs.tcl_findprd_prepdict({"KEYone": ["PRD-63116-001", "PRD-63116-003", "PRD-63118-002"]})
+        allprds = bs.tcl_findprd_candidates(prddict, floor=0, ceiling=5)
+        assert allprds == [("63116", 0), ("63116", 2), ("63116", 4), ("63118", 0), ("63118", 1), ("63118", 3), ("63118", 4)]
+        shards = [bs.tcl_findprd_candidates(prddict, 0, 5, (idx, 3)) for idx in (1, 2, 3)]
+        assert sorted(sum(shards, [])) == allprds
+        assert shards[1] == [("63116", 4), ("63118", 1), ("63118", 4)]
+
+    def test_tcl_newprd_shards_hosts(self):
+        """
+        Test that shards stay disjoint and complete when hosts know different PRDs.
+        """
+        known = ({"KEYone": ["PRD-63116-001"]}, {"KEYone": ["PRD-63116-001", "PRD-63116-004", "PRD-63116-005"]})
+        shards = [bs.tcl_findprd_candidates(bs.tcl_findprd_prepdict(known[idx - 1]), 0, 10, (idx, 2)) for idx in (1, 2)]
+        assert not set(shards[0]) & set(shards[1])
+        assert sorted(shards[0] + shards[1]) == [("63116", tail) for tail in (0, 2, 3, 4, 6, 7, 8, 9)]
+
+    def test_tcl_newprd_shard(self, capsys):
+        """
+        Test scanning for new PRDs, one shard.
+        """
+        with mock.patch("bbarchivist.networkutilstcl.tcl_check", mock.MagicMock(side_effect=lambda curef, sess, export: curef if curef.endswith("5") else None)):
+            with mock.patch("bbarchivist.xmlutilstcl.parse_tcl_check", mock.MagicMock(return_value=("AAQ420", 6, 6, 6, 6))):
+                prddict = bs.tcl_findprd_prepdict({"KEYone": ["PRD-63116-001"]})
+                with mock.patch("bbarchivist.sqlutils.insert_tcl_prds", mock.MagicMock()) as inserter:
+                    bs.tcl_findprd(prddict, floor=0, ceiling=10, shard=(2, 2), store=True)
+        inserter.assert_called_once_with([("PRD-63116-005", "AAQ420")])
+        output = capsys.readouterr()[0]
+        assert "SCANNING ROOT: 63116" in output
+        assert "PRD-63116-005: AAQ420" in output
+        assert "PRD-63116-004" not in output
+
+    def test_tcl_newprd_interrupt(self):
+        """
+        Test scanning for new PRDs, interrupted.
+        """
+        def check(curef, sess, export):
+            """
+            Interrupt on the first PRD, slowly check the rest.
+            """
+            if curef.endswith("000"):
+                raise KeyboardInterrupt
+            time.sleep(0.01)
+        with mock.patch("bbarchivist.networkutilstcl.tcl_check", mock.MagicMock(side_effect=check)) as checker:
+            prddict = bs.tcl_findprd_prepdict({"KEYone": ["PRD-63116-001"]})
+            with mock.patch("bbarchivist.sqlutils.insert_tcl_prds", mock.MagicMock()) as inserter:
+                bs.tcl_findprd(prddict, floor=0, ceiling=500, workers=2, store=True)
+        assert not inserter.called
+        assert checker.call_count < 100
+
+    def test_tcl_scan_interrupt(self):
+        """
+        Test concurrent full scan, interrupted.
+        """
+        def check(curef, session, mode, fvver, export):
+            """
+            Interrupt on the first PRD, slowly check the rest.
+            """
+            if curef.endswith("000"):
+                raise KeyboardInterrupt
+            time.sleep(0.01)
+        prddict = {"KEYone": ["PRD-63117-{0:03}".format(tail) for tail in range(500)]}
+        with mock.patch("bbarchivist.scriptutilstcl.tcl_mainscan_check", mock.MagicMock(side_effect=check)) as checker:
+            with mock.patch("bbarchivist.sqlutils.insert_tcl_scans", mock.MagicMock()) as inserter:
+                bs.tcl_mainscan_bootstrap(prddict, workers=2, store=True)
+        assert not inserter.called
+        assert checker.call_count < 100
+
     def test_tcl_otaprep_ota(self):
         """
         Test preparing values for OTA scanning, OTA scanning.
@@ -179,6 +281,36 @@ class TestClassScriptutilstcl:
         bs.tcl_mainscan_printer("PRD-63999-999", "AAA000")
         assert "PRD-63999-999: AAA000" in capsys.readouterr()[0]
 
+    def test_tcl_scan_bootstrap(self, capsys):
+        """
+        Test concurrent full scan, ordered output.
+        """
+        def slowcheck(curef, session, mode, fvver, export):
+            """
+            Finish later PRDs first.
+            """
+            time.sleep(0.05 * (3 - int(curef[-1])))
+            return None if curef.endswith("2") else curef
+        prddict = {"KEYone": ["PRD-63117-001", "PRD-63117-002"], "Motion": ["PRD-63734-003"]}
+        with mock.patch("bbarchivist.networkutilstcl.tcl_check", mock.MagicMock(side_effect=slowcheck)):
+            with mock.patch("bbarchivist.xmlutilstcl.parse_tcl_check", mock.MagicMock(side_effect=lambda text: ("AAQ{0}".format(text[-3:]), 6, 6, 6, 6))):
+                bs.tcl_mainscan_bootstrap(prddict, workers=3)
+        assert capsys.readouterr()[0] == "~KEYone~\nPRD-63117-001: AAQ001\n~Motion~\nPRD-63734-003: AAQ003\n"
+
+    def test_tcl_scan_changes(self, capsys):
+        """
+        Test concurrent full scan, storing results and only showing changes.
+        """
+        prddict = {"KEYone": ["PRD-63117-001", "PRD-63117-002"]}
+        stored = {("PRD-63117-001", "AAA000"): "AAQ001", ("PRD-63117-002", "AAA000"): "AAQ000"}
+        with mock.patch("bbarchivist.networkutilstcl.tcl_check", mock.MagicMock(side_effect=lambda curef, session, mode, fvver, export: curef)):
+            with mock.patch("bbarchivist.xmlutilstcl.parse_tcl_check", mock.MagicMock(side_effect=lambda text: ("AAQ{0}".format(text[-3:]), 6, 6, 6, 6))):
+                with mock.patch("bbarchivist.sqlutils.list_tcl_scans", mock.MagicMock(return_value=stored)):
+                    with mock.patch("bbarchivist.sqlutils.insert_tcl_scans", mock.MagicMock()) as inserter:
+                        bs.tcl_mainscan_bootstrap(prddict, store=True, changes=True)
+        assert capsys.readouterr()[0] == "~KEYone~\nPRD-63117-002: AAQ002\n"
+        assert inserter.call_args[0][0][1] == ("PRD-63117-002", "AAA000", ("AAQ002", 6, 6, 6, 6))
+
     def test_tcl_scanprint_ota(self, capsys):
         """
         Test printing scan output, OTA scan.
@@ -200,3 +332,69 @@ class TestClassScriptutilstcl:
         with mock.patch("bbarchivist.networkutilstcl.remote_prd_info", mock.MagicMock(return_value={"PRD-63999-998":"AAZ069"})):
             with pytest.raises(SystemExit):
                 bs.tcl_delta_remote("PRD-63999-999")
+
+    def test_tcl_delta_batch(self, capsys):
+        """
+        Test resolving OTA deltas for several PRDs at once.
+        """
+        remotedict = {"PRD-63117-002": "AAA000", "PRD-63117-001": "AAA000"}
+        checks = lambda curef, session, mode, fvver: None if curef.endswith("2") else curef
+        with mock.patch("bbarchivist.networkutilstcl.tcl_check", mock.MagicMock(side_effect=checks)):
+            with mock.patch("bbarchivist.xmlutilstcl.parse_tcl_check", mock.MagicMock(return_value=("AAQ001", 6, "snek.zip", "1024", "abc"))):
+                with mock.patch("bbarchivist.networkutilstcl.vkhash", mock.MagicMock(return_value=6)):
+                    with mock.patch("bbarchivist.networkutilstcl.tcl_download_request", mock.MagicMock(return_value=6)):
+                        with mock.patch("bbarchivist.xmlutilstcl.parse_tcl_download_request", mock.MagicMock(return_value=("https://snek.snek/update.zip", None))):
+                            with mock.patch("bbarchivist.networkutils.getcode", mock.MagicMock(return_value=200)):
+                                deltas = bs.tcl_delta_batch(remotedict, workers=2)
+        assert deltas == [{"curef": "PRD-63117-001", "fvver": "AAA000", "tvver": "AAQ001", "filename": "snek.zip", "size": 1024, "sha1": "abc", "url": "https://snek.snek/update.zip", "status": 200}]
+        bs.tcl_delta_printer(deltas)
+        assert "PRD-63117-001 AAA000 to AAQ001 [1.00kB] abc" in capsys.readouterr()[0]
+        bs.tcl_delta_printer(deltas, True)
+        assert '"status": 200' in capsys.readouterr()[0]
+
+    def test_tcl_delta_batch_error(self, capsys):
+        """
+        Test resolving OTA deltas for several PRDs at once, with one failing.
+        """
+        remotedict = {"PRD-63117-002": "AAA000", "PRD-63117-001": "AAA000"}
+        def getcode(url, session):
+            """
+            Fail for one PRD only.
+            """
+            if "002" in url:
+                raise ConnectionError("snek")
+            return 200
+        with mock.patch("bbarchivist.networkutilstcl.tcl_check", mock.MagicMock(side_effect=lambda curef, session, mode, fvver: curef)):
+            with mock.patch("bbarchivist.xmlutilstcl.parse_tcl_check", mock.MagicMock(return_value=("AAQ001", 6, "snek.zip", "1024", "abc"))):
+                with mock.patch("bbarchivist.networkutilstcl.vkhash", mock.MagicMock(return_value=6)):
+                    with mock.patch("bbarchivist.networkutilstcl.tcl_download_request", mock.MagicMock(side_effect=lambda curef, *args: curef)):
+                        with mock.patch("bbarchivist.xmlutilstcl.parse_tcl_download_request", mock.MagicMock(side_effect=lambda text, mode: ("https://snek.snek/{0}.zip".format(text[-3:]), None))):
+                            with mock.patch("bbarchivist.networkutils.getcode", mock.MagicMock(side_effect=getcode)):
+                                deltas = bs.tcl_delta_batch(remotedict, workers=2)
+        assert [delta["curef"] for delta in deltas] == ["PRD-63117-001", "PRD-63117-002"]
+        assert deltas[0]["status"] == 200
+        assert deltas[1] == {"curef": "PRD-63117-002", "fvver": "AAA000", "error": "ConnectionError: snek"}
+        bs.tcl_delta_printer(deltas)
+        output = capsys.readouterr()[0]
+        assert "PRD-63117-001 AAA000 to AAQ001 [1.00kB] abc" in output
+        assert "PRD-63117-002 AAA000 ERROR: ConnectionError: snek" in output
+        bs.tcl_delta_printer(deltas, True)
+        assert '"error": "ConnectionError: snek"' in capsys.readouterr()[0]
+
+    def test_tcl_delta_batch_interrupt(self):
+        """
+        Test resolving OTA deltas for several PRDs at once, interrupted.
+        """
+        def resolve(curef, fvver, session):
+            """
+            Interrupt on the second PRD, slowly resolve the rest.
+            """
+            if curef.endswith("001"):
+                raise KeyboardInterrupt
+            time.sleep(0.01)
+            return {"curef": curef}
+        remotedict = {"PRD-63117-{0:03}".format(tail): "AAA000" for tail in range(500)}
+        with mock.patch("bbarchivist.scriptutilstcl.tcl_delta_resolve", mock.MagicMock(side_effect=resolve)) as resolver:
+            deltas = bs.tcl_delta_batch(remotedict, workers=2)
+        assert deltas == [{"curef": "PRD-63117-000"}]
+        assert resolver.call_count < 100
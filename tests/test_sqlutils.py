@@ -259,3 +259,27 @@ class TestClassSQLUtils:
             with mock.patch("os.path.exists", mock.MagicMock(return_value=False)):
                 with pytest.raises(SystemExit):
                     bs.list_sw_releases()
+
+    def test_tcl_scans(self):
+        """
+        Test storing and listing TCL scan results.
+        """
+        apath = os.path.abspath(os.getcwd())
+        with mock.patch('bbarchivist.iniconfig.config_homepath', mock.MagicMock(return_value=apath)):
+            bs.insert_tcl_scans([("PRD-63117-001", "AAA000", ("AAQ302", "123", "snek.zip", 69, "abcdef"))], 4, "2018-01-01 00:00:00")
+            bs.insert_tcl_scans([("PRD-63117-001", "AAA000", ("AAR001", "124", "snek.zip", 69, "abcdef")), ("PRD-63117-002", "AAA000", ("AAQ302", "123", "snek.zip", 69, "abcdef"))])
+            bs.insert_tcl_scans([("PRD-63117-001", "AAQ302", ("AAR001", "125", "snekota.zip", 6, "fedcba"))], 2)
+            assert bs.list_tcl_scans() == {("PRD-63117-001", "AAA000"): "AAR001", ("PRD-63117-002", "AAA000"): "AAQ302"}
+            assert bs.list_tcl_scans(2) == {("PRD-63117-001", "AAQ302"): "AAR001"}
+        with mock.patch("sqlite3.connect", mock.MagicMock(side_effect=sqlite3.Error)):
+            assert bs.list_tcl_scans() is None
+
+    def test_tcl_prds(self):
+        """
+        Test recording and listing discovered TCL PRDs.
+        """
+        apath = os.path.abspath(os.getcwd())
+        with mock.patch('bbarchivist.iniconfig.config_homepath', mock.MagicMock(return_value=apath)):
+            bs.insert_tcl_prds([("PRD-63117-034", "AAQ302"), ("PRD-63117-035", "AAQ302")])
+            bs.insert_tcl_prds([("PRD-63117-034", "AAR001")])
+            assert sorted(bs.list_tcl_prds()) == ["PRD-63117-034", "PRD-63117-035"]
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 """Test the utilities module."""
 
+import io
+import json
 import os
 import sys
 from platform import system
@@ -434,6 +436,44 @@ class TestClassUtilities:
                 spin = bu.Spinner()
                 spin.after()
 
+    def test_transfer_monitor_log(self):
+        """
+        Test transfer telemetry, not on a terminal.
+        """
+        stream = io.StringIO()
+        monitor = bu.TransferMonitor(stream, interval=60)
+        monitor.begin("a.bar", 100)
+        monitor.begin("b.bar", 300)
+        monitor.start()
+        monitor.update("a.bar", 100)
+        monitor.update("b.bar", 150)
+        monitor.fail("c.bar")
+        monitor.stop()
+        line = json.loads(stream.getvalue().splitlines()[-1])
+        assert line["event"] == "transfer"
+        assert line["bytes"] == 250
+        assert line["total"] == 400
+        assert line["files"] == 1
+        assert line["count"] == 2
+        assert line["active"] == 1
+        assert line["failed"] == 1
+
+    def test_transfer_monitor_tty(self):
+        """
+        Test transfer telemetry, on a terminal.
+        """
+        stream = io.StringIO()
+        stream.isatty = lambda: True
+        monitor = bu.TransferMonitor(stream, interval=60)
+        monitor.begin("a.bar", 1024)
+        monitor.start()
+        monitor.update("a.bar", 512)
+        monitor.stop()
+        output = stream.getvalue()
+        assert output.startswith("\r[0/1] 512.00B/1.00kB")
+        assert "a.bar 50%" in output
+        assert output.endswith("\n")
+
     def test_prepends(self):
         """
         Test checking the start and end of a string.
@@ -477,6 +517,13 @@ class TestClassUtilities:
         """
         assert bu.one_and_none(None, "snek")
 
+    def test_cond_args(self):
+        """
+        Test picking the arguments that conditional execution would use.
+        """
+        assert bu.cond_args(["a", "b", "c", "d"], True, True, False) == ["a", "b", "c", "d"]
+        assert bu.cond_args(["a", "b", "c", "d"], False, True, True) == ["a"]
+
 
 class TestClassUtilitiesUrls:
     """